@@ -0,0 +1,156 @@
+import base64
+import json
+
+from django.conf import settings
+from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ORDER_VAR, ChangeList
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+
+CURSOR_VAR = 'cursor'
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    A paginator that never counts more than ADMIN_EXACT_COUNT_LIMIT rows.
+
+    PostgreSQL answers from the planner's row estimate, counting exactly
+    only when that estimate is small. Other databases count up to the limit
+    and stop there, so a huge table reads as "limit + 1" rows. ``estimated``
+    says whether ``count`` is exact.
+    """
+    estimated = False
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list.order_by()
+        limit = settings.ADMIN_EXACT_COUNT_LIMIT
+        if connections[queryset.db].vendor == 'postgresql':
+            plan = json.loads(queryset.explain(format='json'))
+            estimate = int(plan[0]['Plan']['Plan Rows'])
+            if estimate > limit:
+                self.estimated = True
+                return estimate
+            return queryset.count()
+        count = queryset.values('pk')[:limit + 1].count()
+        self.estimated = count > limit
+        return count
+
+
+class KeysetChangeList(ChangeList):
+    """
+    A changelist that pages by key instead of by offset.
+
+    While the list is in the admin's default ordering, "next" and "previous"
+    links carry the sort key of the last or first row shown. Each page is
+    then an index range read, however deep into the list it is. Once a
+    column header is clicked, the list falls back to numbered pages.
+    """
+
+    def get_filters_params(self, params=None):
+        lookup_params = super().get_filters_params(params)
+        lookup_params.pop(CURSOR_VAR, None)
+        return lookup_params
+
+    def get_results(self, request):
+        cursor = self.filter_params.pop(CURSOR_VAR, [None])[-1]
+        self.params.pop(CURSOR_VAR, None)
+        self.sort_fields = None
+        if ORDER_VAR not in self.params:
+            self.sort_fields = self.get_sort_fields(self.get_ordering(request, self.queryset))
+        self.keyset = self.sort_fields is not None
+        if not self.keyset:
+            return super().get_results(request)
+
+        backwards, values = self.decode_cursor(cursor) if cursor else (False, None)
+        queryset = self.queryset
+        if backwards:
+            queryset = queryset.reverse()
+        if values is not None:
+            queryset = queryset.filter(self.after(values, backwards))
+        rows = list(queryset[:self.list_per_page + 1])
+        more, rows = len(rows) > self.list_per_page, rows[:self.list_per_page]
+        if backwards:
+            rows.reverse()
+
+        self.paginator = self.model_admin.get_paginator(request, self.queryset,
+                                                        self.list_per_page)
+        self.result_count = self.paginator.count
+        self.full_result_count = None
+        self.show_full_result_count = False
+        self.show_admin_actions = True
+        self.result_list = rows
+        self.can_show_all = False
+        self.first_url = self.get_query_string() if cursor else None
+        self.previous_url = self.next_url = None
+        if rows and (more if backwards else cursor):
+            self.previous_url = self.get_query_string({CURSOR_VAR: self.encode_cursor(rows[0], True)})
+        if rows and (cursor if backwards else more):
+            self.next_url = self.get_query_string({CURSOR_VAR: self.encode_cursor(rows[-1], False)})
+        self.multi_page = bool(self.previous_url or self.next_url)
+
+    def get_sort_fields(self, ordering):
+        """(field, descending) pairs for ``ordering``, if it is all local columns."""
+        sort_fields = []
+        for name in ordering:
+            if not isinstance(name, str):
+                return None
+            try:
+                field = (self.lookup_opts.pk if name.lstrip('-') == 'pk'
+                         else self.lookup_opts.get_field(name.lstrip('-')))
+            except FieldDoesNotExist:
+                return None
+            if not field.concrete or field.null:
+                return None
+            sort_fields.append((field, name.startswith('-')))
+        return sort_fields
+
+    def after(self, values, backwards):
+        """
+        Rows sorting after ``values``, or before them when ``backwards``.
+
+        The leading ``>=``/``<=`` bound is redundant, but it lets the database
+        read the first sort column's index as a single range in order.
+        """
+        condition, equal = Q(), Q()
+        for (field, descending), value in zip(self.sort_fields, values):
+            lookup = 'lt' if descending != backwards else 'gt'
+            condition |= equal & Q(**{f'{field.attname}__{lookup}': value})
+            equal &= Q(**{field.attname: value})
+        (field, descending), value = self.sort_fields[0], values[0]
+        bound = 'lte' if descending != backwards else 'gte'
+        return Q(**{f'{field.attname}__{bound}': value}) & condition
+
+    def encode_cursor(self, obj, backwards):
+        values = [field.value_to_string(obj) for field, _ in self.sort_fields]
+        payload = json.dumps(['p' if backwards else 'n', *values]).encode()
+        return base64.urlsafe_b64encode(payload).decode()
+
+    def decode_cursor(self, cursor):
+        try:
+            direction, *values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            values = [field.to_python(value)
+                      for (field, _), value in zip(self.sort_fields, values, strict=True)]
+        except (ValueError, TypeError, ValidationError):
+            raise IncorrectLookupParameters
+        return direction == 'p', values
+
+
+class LargeTableAdminMixin:
+    """
+    ModelAdmin defaults for tables too big to count or page by offset.
+
+    Combine with ``list_select_related`` and prefix (``^``) or exact (``=``)
+    ``search_fields``, so that every part of the changelist can use an index.
+    """
+    paginator              = EstimatedCountPaginator
+    show_full_result_count = False
+    show_facets            = admin.ShowFacets.NEVER
+    change_list_template   = 'admin/keyset_change_list.html'
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
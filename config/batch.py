@@ -0,0 +1,159 @@
+import io
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.core.handlers.asgi import ASGIRequest
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connections
+from django.http import Http404, StreamingHttpResponse
+from django.urls import Resolver404, resolve, reverse
+from rest_framework import permissions, serializers, status
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+logger = logging.getLogger(__name__)
+
+# Sub-request headers that describe the outer request, not the sub-request
+_DROPPED_META = ('HTTP_AUTHORIZATION', 'HTTP_COOKIE', 'HTTP_IDEMPOTENCY_KEY',
+                 'HTTP_IF_NONE_MATCH', 'HTTP_IF_MATCH', 'CONTENT_TYPE', 'CONTENT_LENGTH')
+_RETURNED_HEADERS = ('Location', 'ETag', 'Retry-After', 'Idempotent-Replayed')
+
+
+class SubRequestSerializer(serializers.Serializer):
+    id      = serializers.CharField(required=False, max_length=100)
+    method  = serializers.ChoiceField(choices=['GET', 'POST', 'PUT', 'PATCH', 'DELETE'],
+                                      default='GET')
+    url     = serializers.CharField(max_length=2000)
+    body    = serializers.JSONField(required=False)
+    headers = serializers.DictField(child=serializers.CharField(), required=False)
+
+    def validate_url(self, value):
+        parts = urlsplit(value)
+        if parts.scheme or parts.netloc or not parts.path.startswith('/api/'):
+            raise serializers.ValidationError('Must be a path under /api/.')
+        if parts.path.startswith(reverse('batch')):
+            raise serializers.ValidationError('Batches cannot be nested.')
+        return value
+
+
+class BatchSerializer(serializers.Serializer):
+    requests = SubRequestSerializer(many=True, allow_empty=False)
+    parallel = serializers.BooleanField(default=False)
+
+    def validate_requests(self, value):
+        if len(value) > settings.BATCH_MAX_REQUESTS:
+            raise serializers.ValidationError(
+                f'At most {settings.BATCH_MAX_REQUESTS} requests per batch.'
+            )
+        return value
+
+
+class BatchView(APIView):
+    """
+    POST {"requests": [{"id", "method", "url", "body", "headers"}, ...], "parallel": false}
+
+    Run several API calls in one round trip. The batch is authenticated once
+    and each sub-request is dispatched straight to its view as that user,
+    without running the middleware stack again. Sub-requests run in order,
+    and each gets its own status, so one failing doesn't fail the rest. Every
+    response comes back with the id, status, selected headers and body.
+
+    With ``"parallel": true`` under ASGI, a batch of reads runs on a thread
+    pool of BATCH_MAX_CONCURRENCY workers, each with its own connection. A
+    batch containing writes, or a batch served over WSGI, runs in order.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        batch = BatchSerializer(data=request.data)
+        batch.is_valid(raise_exception=True)
+        subrequests = batch.validated_data['requests']
+
+        parallel = (
+            batch.validated_data['parallel']
+            and isinstance(request._request, ASGIRequest)
+            and all(sub['method'] in SAFE_METHODS for sub in subrequests)
+        )
+        if parallel:
+            with ThreadPoolExecutor(max_workers=settings.BATCH_MAX_CONCURRENCY) as pool:
+                results = list(pool.map(lambda sub: self._run_in_thread(request, sub),
+                                        subrequests))
+        else:
+            results = [self._run(request, sub) for sub in subrequests]
+        return Response({'responses': results})
+
+    def _run_in_thread(self, request, sub):
+        try:
+            return self._run(request, sub)
+        finally:
+            # The pool's threads end with the batch, and so do their connections
+            connections.close_all()
+
+    def _run(self, request, sub):
+        result = {'id': sub.get('id')} if 'id' in sub else {}
+        parts = urlsplit(sub['url'])
+        try:
+            match = resolve(parts.path)
+        except Resolver404:
+            return dict(result, status=status.HTTP_404_NOT_FOUND, headers={},
+                        body={'detail': 'Not found.'})
+
+        try:
+            response = match.func(self._build(request, sub, parts), *match.args, **match.kwargs)
+            if hasattr(response, 'render'):
+                response.render()
+        except Http404:
+            return dict(result, status=status.HTTP_404_NOT_FOUND, headers={},
+                        body={'detail': 'Not found.'})
+        except PermissionDenied:
+            return dict(result, status=status.HTTP_403_FORBIDDEN, headers={},
+                        body={'detail': 'Permission denied.'})
+        except Exception:
+            logger.exception('Batched %s %s failed', sub['method'], sub['url'])
+            return dict(result, status=status.HTTP_500_INTERNAL_SERVER_ERROR, headers={},
+                        body={'detail': 'Internal server error.'})
+
+        headers = {name: response[name] for name in _RETURNED_HEADERS if response.has_header(name)}
+        if isinstance(response, StreamingHttpResponse):
+            response.close()
+            return dict(result, status=status.HTTP_406_NOT_ACCEPTABLE, headers=headers,
+                        body={'detail': 'Streaming responses cannot be batched.'})
+        if hasattr(response, 'data'):
+            body = response.data
+        elif response.get('Content-Type', '').startswith('application/json'):
+            body = json.loads(response.content or b'null')
+        else:
+            body = response.content.decode(response.charset or 'utf-8')
+        return dict(result, status=response.status_code, headers=headers, body=body)
+
+    def _build(self, request, sub, parts):
+        """A WSGI request for ``sub``, carrying the batch's already-authenticated user."""
+        content = b'' if 'body' not in sub else json.dumps(sub['body']).encode()
+        meta = {key: value for key, value in request.META.items()
+                if key not in _DROPPED_META and key != 'wsgi.input'}
+        meta.update({
+            'wsgi.url_scheme': request.scheme,
+            'REQUEST_METHOD': sub['method'],
+            'PATH_INFO': parts.path,
+            'SCRIPT_NAME': '',
+            'QUERY_STRING': parts.query,
+            'wsgi.input': io.BytesIO(content),
+            'CONTENT_LENGTH': str(len(content)),
+        })
+        if content:
+            meta['CONTENT_TYPE'] = 'application/json'
+        for name, value in sub.get('headers', {}).items():
+            key = 'HTTP_' + name.upper().replace('-', '_')
+            if key not in ('HTTP_AUTHORIZATION', 'HTTP_COOKIE', 'HTTP_HOST'):
+                meta[key] = value
+
+        subrequest = WSGIRequest(meta)
+        # DRF's Request honours these instead of running the authenticators
+        subrequest._force_auth_user = request.user
+        subrequest._force_auth_token = request.auth
+        return subrequest
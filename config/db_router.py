@@ -0,0 +1,87 @@
+"""
+Read-replica routing.
+
+Reads go to the primary unless a view has opted in for the current request
+through ``ReplicaReadMixin``; writes and migrations always use ``default``.
+"""
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+
+_use_replica = ContextVar('use_replica', default=False)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        replicas = settings.DATABASE_REPLICAS
+        if replicas and _use_replica.get():
+            return random.choice(replicas)
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db not in settings.DATABASE_REPLICAS
+
+
+@contextmanager
+def reading_from_replica():
+    token = _use_replica.set(True)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def _sticky_key(user):
+    return f'db-sticky:{user.pk}'
+
+
+def mark_recent_write(user):
+    cache.set(_sticky_key(user), True, settings.REPLICA_STICKY_SECONDS)
+
+
+def has_recent_write(user):
+    return bool(user.is_authenticated and cache.get(_sticky_key(user)))
+
+
+class ReplicaReadMixin:
+    """
+    Serve safe-method ``replica_actions`` of a viewset from a read replica.
+
+    A user who wrote recently is kept on the primary for
+    ``REPLICA_STICKY_SECONDS`` so they always read their own writes.
+    """
+    replica_actions = ('list', 'retrieve')
+
+    def dispatch(self, request, *args, **kwargs):
+        # Scope the routing decision to this request, however it ends
+        token = _use_replica.set(False)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            _use_replica.reset(token)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if (settings.DATABASE_REPLICAS
+                and request.method in SAFE_METHODS
+                and self.action in self.replica_actions
+                and not has_recent_write(request.user)):
+            _use_replica.set(True)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if (request.method not in SAFE_METHODS
+                and response.status_code < 400
+                and request.user.is_authenticated):
+            mark_recent_write(request.user)
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -0,0 +1,108 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+
+HEADER = 'Idempotency-Key'
+# Statuses that say "try again" rather than describing the outcome
+_NOT_STORED = {status.HTTP_409_CONFLICT, status.HTTP_429_TOO_MANY_REQUESTS}
+
+
+class IdempotencyConflict(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'A request with this Idempotency-Key is still in progress.'
+    default_code = 'idempotency_conflict'
+
+
+class IdempotencyKeyReused(APIException):
+    status_code = status.HTTP_422_UNPROCESSABLE_ENTITY
+    default_detail = 'This Idempotency-Key was already used for a different request.'
+    default_code = 'idempotency_key_reused'
+
+
+class _Replay(Exception):
+    def __init__(self, stored):
+        self.stored = stored
+
+
+class IdempotencyMixin:
+    """
+    Honour an ``Idempotency-Key`` header on a viewset's unsafe methods.
+
+    The first response for a key (per user) is kept in the cache for
+    IDEMPOTENCY_TTL seconds, and a retry of the same request gets it back
+    before any validation or database write runs. While the first request
+    is still running, a retry waits up to IDEMPOTENCY_WAIT_SECONDS for it to
+    finish and then gets a 409. Reusing a key for a different method, path
+    or body is a 422. Server errors aren't stored, so they can be retried.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        self._idempotency = None
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            # finalize_response is skipped when DRF re-raises an error as a
+            # 500; the lock must still go, or retries get 409s until it expires
+            if self._idempotency is not None:
+                cache.delete(self._idempotency['lock_key'])
+                self._idempotency = None
+
+    def initial(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if key and request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            # Read before DRF parses the stream; Django keeps the bytes
+            fingerprint = hashlib.sha256(
+                b'%s %s\n%s' % (request.method.encode(), request.path.encode(),
+                                request._request.body)
+            ).hexdigest()
+        super().initial(request, *args, **kwargs)  # authenticates the user
+        if key and request.method not in ('GET', 'HEAD', 'OPTIONS'):
+            self._idempotency = self._claim(request, key, fingerprint)
+
+    def _claim(self, request, key, fingerprint):
+        user = request.user.pk if request.user.is_authenticated else 'anon'
+        digest = hashlib.sha256(key.encode()).hexdigest()
+        result_key, lock_key = f'idempotency:{user}:{digest}', f'idempotency-lock:{user}:{digest}'
+
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+        while True:
+            stored = cache.get(result_key)
+            if stored is not None:
+                if stored['fingerprint'] != fingerprint:
+                    raise IdempotencyKeyReused()
+                raise _Replay(stored)
+            if cache.add(lock_key, fingerprint, settings.IDEMPOTENCY_LOCK_TIMEOUT):
+                return {'result_key': result_key, 'lock_key': lock_key,
+                        'fingerprint': fingerprint}
+            if cache.get(lock_key) not in (None, fingerprint):
+                raise IdempotencyKeyReused()
+            if time.monotonic() >= deadline:
+                raise IdempotencyConflict()
+            time.sleep(0.05)
+
+    def handle_exception(self, exc):
+        if isinstance(exc, _Replay):
+            stored = exc.stored
+            return Response(stored['data'], status=stored['status'],
+                            headers=dict(stored['headers'], **{'Idempotent-Replayed': 'true'}))
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        claim = getattr(self, '_idempotency', None)
+        if claim is not None:
+            self._idempotency = None
+            if response.status_code < 500 and response.status_code not in _NOT_STORED:
+                cache.set(claim['result_key'], {
+                    'fingerprint': claim['fingerprint'],
+                    'status': response.status_code,
+                    'data': getattr(response, 'data', None),
+                    'headers': {name: response[name] for name in ('Location',)
+                                if response.has_header(name)},
+                }, settings.IDEMPOTENCY_TTL)
+            cache.delete(claim['lock_key'])
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from corsheaders.defaults import default_headers
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -42,11 +45,13 @@ INSTALLED_APPS = [
     'users',
     'tasks',
     'projects',
+    'jobs',
     'django_filters',
 ]
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'config.static.StaticAssetMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -61,7 +66,7 @@ ROOT_URLCONF = 'config.urls'
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
-        'DIRS': [BASE_DIR / 'frontend' / 'dist'],
+        'DIRS': [BASE_DIR / 'frontend' / 'dist', BASE_DIR / 'config' / 'templates'],
         'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
@@ -79,18 +84,91 @@ WSGI_APPLICATION = 'config.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
+#
+# Configured from the environment. DB_ENGINE accepts a full backend path or
+# a short name such as "postgresql" or "sqlite3". Connections are kept open
+# for DB_CONN_MAX_AGE seconds and health-checked before reuse; DB_POOL=true
+# switches to psycopg 3's connection pool instead (Django 5.1+).
+# DB_REPLICA_HOSTS is a comma-separated list of read replicas, each added as
+# "replica_N" with the same credentials, and used by config.db_router.
+
+def env(name, default=None):
+    return os.environ.get(name, default)
+
+
+def env_bool(name, default=False):
+    return env(name, str(default)).lower() in ('1', 'true', 'yes', 'on')
+
+
+def database_config(host=None):
+    engine = env('DB_ENGINE', 'postgresql')
+    if '.' not in engine:
+        engine = f'django.db.backends.{engine}'
+    config = {
+        'ENGINE': engine,
+        'NAME': env('DB_NAME', 'taskflow'),
+        'USER': env('DB_USER', 'saq'),
+        'PASSWORD': env('DB_PASSWORD', 'password'),
+        'HOST': host or env('DB_HOST', 'localhost'),
+        'PORT': env('DB_PORT', '5432'),
+        'CONN_MAX_AGE': int(env('DB_CONN_MAX_AGE', '60')),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {},
+    }
+    if env_bool('DB_POOL'):
+        # Pooled connections replace persistent ones
+        config['CONN_MAX_AGE'] = 0
+        config['OPTIONS']['pool'] = {
+            'min_size': int(env('DB_POOL_MIN_SIZE', '2')),
+            'max_size': int(env('DB_POOL_MAX_SIZE', '10')),
+        }
+    return config
+
 
 DATABASES = {
+    'default': database_config(),
+}
+
+DATABASE_REPLICAS = []
+for index, replica_host in enumerate(filter(None, env('DB_REPLICA_HOSTS', '').split(',')), 1):
+    alias = f'replica_{index}'
+    DATABASES[alias] = dict(database_config(replica_host.strip()), TEST={'MIRROR': 'default'})
+    DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ['config.db_router.ReplicaRouter']
+
+# After a user writes, their reads stay on the primary for this long so
+# they never see replication lag on their own changes.
+REPLICA_STICKY_SECONDS = int(env('DB_REPLICA_STICKY_SECONDS', '5'))
+
+
+# Caches default to per-process memory; point CACHE_BACKEND/CACHE_LOCATION at
+# a shared cache (e.g. Redis) so throttles, idempotency keys and replica
+# stickiness hold across workers.
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
-        'NAME': 'taskflow',      
-        'USER': 'saq',      
-        'PASSWORD': 'password',
-        'HOST': 'localhost',           
-        'PORT': '5432',                
-    }
+        'BACKEND': env('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': env('CACHE_LOCATION', ''),
+        'OPTIONS': {'MAX_ENTRIES': int(env('CACHE_MAX_ENTRIES', '10000'))},
+    },
 }
 
+# Responses to requests carrying an Idempotency-Key are kept this long
+# (config.idempotency). A retry arriving while the first request runs
+# waits up to IDEMPOTENCY_WAIT_SECONDS before getting a 409.
+IDEMPOTENCY_TTL = int(env('IDEMPOTENCY_TTL', str(24 * 60 * 60)))
+IDEMPOTENCY_WAIT_SECONDS = float(env('IDEMPOTENCY_WAIT_SECONDS', '5'))
+IDEMPOTENCY_LOCK_TIMEOUT = 60
+
+# /api/batch/ (config.batch): sub-requests per batch, and threads used for
+# a parallel batch of reads under ASGI.
+BATCH_MAX_REQUESTS = int(env('BATCH_MAX_REQUESTS', '20'))
+BATCH_MAX_CONCURRENCY = int(env('BATCH_MAX_CONCURRENCY', '4'))
+
+# Admin changelists over big tables (config.admin_paging) stop counting
+# exactly past this many rows and use the planner's estimate instead.
+ADMIN_EXACT_COUNT_LIMIT = int(env('ADMIN_EXACT_COUNT_LIMIT', '10000'))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -124,7 +202,24 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    # Number of trusted proxies in front of the app. Clients are identified
+    # by the X-Forwarded-For entry they add; with none, by REMOTE_ADDR.
+    'NUM_PROXIES': int(env('NUM_PROXIES', '0')),
+}
+
+# Budgets for the password-hashing endpoints (users.throttling), per client
+# IP and per submitted username. "local" keeps buckets in each process;
+# "cache" shares them through the default cache.
+AUTH_THROTTLE_BACKEND = env('AUTH_THROTTLE_BACKEND', 'local')
+AUTH_THROTTLE_RATES = {
+    'login': {'ip': '20/min', 'username': '5/min'},
+    'token': {'ip': '20/min', 'username': '5/min'},
+    'signup': {'ip': '10/hour'},
 }
+# At most this many requests hash passwords at once in a process; others
+# wait up to AUTH_HASH_WAIT_SECONDS and then get a 503.
+AUTH_MAX_CONCURRENT_HASHES = int(env('AUTH_MAX_CONCURRENT_HASHES', max(1, (os.cpu_count() or 2) // 2)))
+AUTH_HASH_WAIT_SECONDS = float(env('AUTH_HASH_WAIT_SECONDS', '1.0'))
 
 
 # Internationalization
@@ -150,6 +245,28 @@ STATICFILES_DIRS = [
 
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# collectstatic adds content hashes to names and writes .gz/.br variants;
+# config.static.StaticAssetMiddleware serves them with long cache lifetimes.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'config.static.CompressedManifestStaticFilesStorage',
+    },
+}
+
+# Task attachments (tasks.attachments) are written to MEDIA_ROOT through the
+# default storage, which must be a local filesystem: uploads are appended in
+# place and downloads use sendfile. They are served by the API's permission
+# checked download endpoint, never straight from MEDIA_URL.
+MEDIA_ROOT = env('MEDIA_ROOT', str(BASE_DIR / 'media'))
+MEDIA_URL = 'media/'
+ATTACHMENT_MAX_SIZE = int(env('ATTACHMENT_MAX_SIZE', str(2 * 1024 ** 3)))
+
+# Where the Vite build's index.html expects its assets
+SPA_ASSETS_URL = '/assets/'
+
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
@@ -172,4 +289,6 @@ CORS_ALLOWED_ORIGINS = [
 
 CORS_ALLOW_CREDENTIALS = True
 
+CORS_ALLOW_HEADERS = (*default_headers, 'idempotency-key')
+
 CORS_ALLOW_ALL_ORIGINS = False
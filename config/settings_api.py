@@ -0,0 +1,44 @@
+"""
+API-only settings for autoscaled workers.
+
+Serves just the ``/api/`` routes: no admin, sessions, messages, templates,
+static files or SPA catch-all, and JSON in and out only. Select it with
+``DJANGO_SETTINGS_MODULE=config.settings_api``; management commands that
+need the full stack (collectstatic, the admin) keep using config.settings.
+"""
+
+from .settings import *  # noqa: F401,F403
+
+INSTALLED_APPS = [
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'rest_framework',
+    'corsheaders',
+    'users',
+    'tasks',
+    'projects',
+    'jobs',
+    'django_filters',
+]
+
+# Authentication is JWT through DRF, so there is no session or CSRF state
+MIDDLEWARE = [
+    'django.middleware.security.SecurityMiddleware',
+    'corsheaders.middleware.CorsMiddleware',
+    'django.middleware.common.CommonMiddleware',
+]
+
+ROOT_URLCONF = 'config.urls_api'
+
+TEMPLATES = []
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,  # noqa: F405
+    'DEFAULT_RENDERER_CLASSES': (
+        'rest_framework.renderers.JSONRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'rest_framework.parsers.JSONParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+}
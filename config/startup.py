@@ -0,0 +1,105 @@
+"""
+Measure one cold start of the WSGI or ASGI application.
+
+Meant to run in a fresh interpreter, which is how benchmark_startup uses
+it::
+
+    DJANGO_SETTINGS_MODULE=config.settings_api python -m config.startup asgi
+
+Prints a JSON object with the time to import the entry module (which sets
+Django up), each app's ``ready()`` time and the time to serve the first
+request.
+"""
+import io
+import json
+import os
+import sys
+import time
+from importlib import import_module
+
+
+def _wsgi_request(application, path):
+    environ = {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': '',
+        'SERVER_NAME': 'localhost', 'SERVER_PORT': '80', 'HTTP_HOST': 'localhost',
+        'SERVER_PROTOCOL': 'HTTP/1.1', 'wsgi.url_scheme': 'http',
+        'wsgi.input': io.BytesIO(), 'wsgi.errors': sys.stderr,
+    }
+    status = []
+    body = b''.join(application(environ, lambda s, headers: status.append(s)))
+    return int(status[0].split()[0]), len(body)
+
+
+def _asgi_request(application, path):
+    # Imported here so WSGI measurements don't include asyncio
+    import asyncio
+
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': 'GET', 'scheme': 'http', 'path': path, 'raw_path': path.encode(),
+        'query_string': b'', 'headers': [(b'host', b'localhost')],
+        'server': ('localhost', 80), 'client': ('127.0.0.1', 0),
+    }
+    messages = []
+    pending = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+
+    async def receive():
+        if pending:
+            return pending.pop()
+        # No disconnect: Django stops listening once it has responded
+        await asyncio.Event().wait()
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(application(scope, receive, send))
+    start = next(m for m in messages if m['type'] == 'http.response.start')
+    body = b''.join(m.get('body', b'') for m in messages if m['type'] == 'http.response.body')
+    return start['status'], len(body)
+
+
+def profile(entry='wsgi', path='/api/tasks/'):
+    began = time.perf_counter()
+    from django.apps.config import AppConfig
+
+    ready_ms = {}
+    create = AppConfig.create.__func__
+
+    def timed_create(cls, app_name):
+        app_config = create(cls, app_name)
+        ready = app_config.ready
+
+        def timed_ready():
+            started = time.perf_counter()
+            ready()
+            ready_ms[app_config.label] = (time.perf_counter() - started) * 1000
+
+        app_config.ready = timed_ready
+        return app_config
+
+    AppConfig.create = classmethod(timed_create)
+    module = import_module(f'config.{entry}')
+    loaded = time.perf_counter()
+
+    request = _wsgi_request if entry == 'wsgi' else _asgi_request
+    status, size = request(module.application, path)
+    answered = time.perf_counter()
+
+    return {
+        'settings': os.environ.get('DJANGO_SETTINGS_MODULE'),
+        'entry': entry,
+        'import_ms': (loaded - began) * 1000,
+        'ready_ms': ready_ms,
+        'first_response_ms': (answered - loaded) * 1000,
+        'total_ms': (answered - began) * 1000,
+        'status': status,
+        'response_bytes': size,
+        'modules': len(sys.modules),
+    }
+
+
+if __name__ == '__main__':
+    entry = sys.argv[1] if len(sys.argv) > 1 else 'wsgi'
+    path = sys.argv[2] if len(sys.argv) > 2 else '/api/tasks/'
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    print(json.dumps(profile(entry, path)))
@@ -0,0 +1,211 @@
+"""
+Serving for the built frontend: the SPA's index.html and static assets.
+
+``collectstatic`` writes gzip (and, with the ``brotli`` package, brotli)
+variants next to every compressible file, and ``StaticAssetMiddleware``
+serves whichever variant the client accepts, straight from STATIC_ROOT
+with ``FileResponse`` so WSGI servers can use ``sendfile``. Content-hashed
+names never change, so they are cached by browsers for a year.
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+import threading
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.template.loader import get_template
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from django.views import View
+
+try:
+    import brotli
+except ImportError:  # optional: only gzip variants are written without it
+    brotli = None
+
+COMPRESSIBLE_EXTENSIONS = {
+    '.css', '.js', '.mjs', '.json', '.map', '.svg', '.html', '.txt', '.xml', '.ico',
+}
+# Smaller files aren't worth the extra request header and disk lookup
+MIN_COMPRESS_SIZE = 512
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+DEFAULT_CACHE_CONTROL = 'public, max-age=3600'
+
+# Vite names its output "<name>-<8 char hash>.<ext>"
+_VITE_HASHED = re.compile(r'-[A-Za-z0-9_-]{8}\.[a-z0-9]+$')
+
+
+def accepted_encoding(header, offered):
+    """
+    The coding in ``offered`` that an ``Accept-Encoding`` header prefers, or
+    None for the identity body. Codings with ``q=0``, or missing when
+    there's no ``*``, are refused; ties go to the order of ``offered``.
+    """
+    weights = {}
+    for part in header.split(','):
+        coding, _, params = part.strip().partition(';')
+        coding, q = coding.strip().lower(), 1.0
+        match = re.search(r'\bq=([0-9.]+)', params)
+        if match:
+            try:
+                q = float(match.group(1))
+            except ValueError:
+                q = 0.0
+        if coding:
+            weights[coding] = q
+    best = None
+    for coding in offered:
+        q = weights.get(coding, weights.get('*', 0.0))
+        if q > 0 and (best is None or q > best[1]):
+            best = (coding, q)
+    return best and best[0]
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Manifest storage that also writes ``.gz``/``.br`` copies of text assets."""
+    manifest_strict = False
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+        if dry_run:
+            return
+        for name in {*paths, *self.hashed_files.values()}:
+            if os.path.splitext(name)[1].lower() in COMPRESSIBLE_EXTENSIONS:
+                self.compress(name)
+
+    def compress(self, name):
+        with self.open(name) as fh:
+            data = fh.read()
+        if len(data) < MIN_COMPRESS_SIZE:
+            return
+        variants = {'.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            variants['.br'] = brotli.compress(data)
+        for suffix, compressed in variants.items():
+            # Only keep variants that save a meaningful amount
+            if len(compressed) < len(data) * 0.95:
+                if self.exists(name + suffix):
+                    self.delete(name + suffix)
+                self._save(name + suffix, ContentFile(compressed))
+
+
+class StaticAssetMiddleware:
+    """
+    Serve ``STATIC_URL`` (and the SPA's ``/assets/``) from STATIC_ROOT.
+
+    Sits at the top of the middleware stack so asset requests skip the rest
+    of it. The lookup for each path is cached after the first request.
+    """
+    ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.root = os.path.realpath(settings.STATIC_ROOT)
+        self.prefixes = [
+            '/' + settings.STATIC_URL.strip('/') + '/',
+            getattr(settings, 'SPA_ASSETS_URL', '/assets/'),
+        ]
+        self._files = {}
+        self._immutable = None
+
+    def __call__(self, request):
+        if request.method in ('GET', 'HEAD'):
+            for prefix in self.prefixes:
+                if request.path.startswith(prefix):
+                    entry = self.lookup(request.path[len(prefix):])
+                    if entry is not None:
+                        return self.serve(request, entry)
+        return self.get_response(request)
+
+    def immutable_names(self):
+        if self._immutable is None:
+            storage = CompressedManifestStaticFilesStorage(location=self.root)
+            self._immutable = set(storage.hashed_files.values())
+        return self._immutable
+
+    def lookup(self, name):
+        try:
+            return self._files[name]
+        except KeyError:
+            pass
+        path = os.path.realpath(os.path.join(self.root, name))
+        # Misses aren't cached, so arbitrary 404 paths can't grow the cache
+        if not path.startswith(self.root + os.sep) or not os.path.isfile(path):
+            return None
+        content_type, _ = mimetypes.guess_type(path)
+        entry = {
+            'path': path,
+            'content_type': content_type or 'application/octet-stream',
+            'variants': [(enc, path + ext) for enc, ext in self.ENCODINGS
+                         if os.path.isfile(path + ext)],
+            'cache_control': (
+                IMMUTABLE_CACHE_CONTROL
+                if name in self.immutable_names() or _VITE_HASHED.search(name)
+                else DEFAULT_CACHE_CONTROL
+            ),
+        }
+        if not settings.DEBUG:
+            self._files[name] = entry
+        return entry
+
+    def serve(self, request, entry):
+        variants = dict(entry['variants'])
+        encoding = accepted_encoding(request.headers.get('Accept-Encoding', ''), variants)
+        path = variants[encoding] if encoding else entry['path']
+
+        if request.method == 'HEAD':
+            response = HttpResponse(content_type=entry['content_type'])
+            response['Content-Length'] = os.path.getsize(path)
+        else:
+            # FileResponse hands the file to wsgi.file_wrapper (sendfile)
+            response = FileResponse(open(path, 'rb'), content_type=entry['content_type'])
+        if encoding:
+            response['Content-Encoding'] = encoding
+        response['Cache-Control'] = entry['cache_control']
+        if entry['variants']:
+            patch_vary_headers(response, ['Accept-Encoding'])
+        return response
+
+
+class SPAIndexView(View):
+    """
+    The frontend's index.html, rendered once and kept in memory.
+
+    Browsers revalidate it on every load (it names the current asset hashes)
+    and get a 304 while it's unchanged.
+    """
+    template_name = 'index.html'
+    _cache = {}
+    _lock = threading.Lock()
+
+    def get_page(self):
+        page = self._cache.get(self.template_name)
+        if page is None or settings.DEBUG:
+            with self._lock:
+                body = get_template(self.template_name).render().encode()
+                page = {
+                    'body': body,
+                    'gzip': gzip.compress(body, mtime=0),
+                    'etag': '"%s"' % hashlib.md5(body, usedforsecurity=False).hexdigest(),
+                }
+                self._cache[self.template_name] = page
+        return page
+
+    def get(self, request, *args, **kwargs):
+        page = self.get_page()
+        if page['etag'] in parse_etags(request.headers.get('If-None-Match', '')):
+            response = HttpResponseNotModified()
+        elif accepted_encoding(request.headers.get('Accept-Encoding', ''), ['gzip']):
+            response = HttpResponse(page['gzip'], content_type='text/html; charset=utf-8')
+            response['Content-Encoding'] = 'gzip'
+        else:
+            response = HttpResponse(page['body'], content_type='text/html; charset=utf-8')
+        response['ETag'] = page['etag']
+        response['Cache-Control'] = 'no-cache'
+        patch_vary_headers(response, ['Accept-Encoding'])
+        return response
@@ -0,0 +1,355 @@
+import hashlib
+import importlib.util
+import os
+import shutil
+import tempfile
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from unittest import mock, skipUnless
+
+from django.db import connection, connections
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+from config.batch import BatchView
+from config.settings import database_config
+from config.static import SPAIndexView
+from projects.models import Project
+from tasks.admin import TaskAdmin
+from tasks.models import Task
+from users.models import User
+
+SCRIPT = 'export function render() { return "%s"; }\n' % ('hello world ' * 200)
+
+
+class StaticServingTest(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.mkdtemp()
+        source, cls.root = os.path.join(cls.tmp, 'src'), os.path.join(cls.tmp, 'root')
+        os.makedirs(source)
+        with open(os.path.join(source, 'app.js'), 'w') as fh:
+            fh.write(SCRIPT)
+        with open(os.path.join(cls.tmp, 'index.html'), 'w') as fh:
+            fh.write('<html><body><div id="root"></div></body></html>')
+        templates = [dict(settings.TEMPLATES[0], DIRS=[cls.tmp])]
+        cls.settings = override_settings(STATICFILES_DIRS=[source], STATIC_ROOT=cls.root,
+                                         TEMPLATES=templates)
+        cls.settings.enable()
+        call_command('collectstatic', interactive=False, verbosity=0)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        cls.settings.disable()
+        shutil.rmtree(cls.tmp)
+
+    def hashed_name(self):
+        return next(name for name in os.listdir(self.root)
+                    if name.startswith('app.') and name.endswith('.js') and name != 'app.js')
+
+    def test_collectstatic_writes_compressed_variants(self):
+        files = os.listdir(self.root)
+        name = self.hashed_name()
+        self.assertIn(name + '.gz', files)
+        self.assertIn(name + '.br', files)
+
+    def test_hashed_asset_is_precompressed_and_immutable(self):
+        response = self.client.get(f'/static/{self.hashed_name()}',
+                                   HTTP_ACCEPT_ENCODING='gzip, deflate, br')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+
+    def test_refused_encodings_are_not_sent(self):
+        url = f'/static/{self.hashed_name()}'
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='br;q=0, gzip;q=0.5')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip;q=0, br;q=0')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(b''.join(response.streaming_content).decode(), SCRIPT)
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='*, br;q=0')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+        SPAIndexView._cache.clear()
+        response = self.client.get('/projects/42/', HTTP_ACCEPT_ENCODING='gzip;q=0')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertContains(response, 'id="root"')
+
+    def test_unhashed_asset_is_served_plain_with_short_lifetime(self):
+        response = self.client.get('/static/app.js')
+        self.assertEqual(b''.join(response.streaming_content).decode(), SCRIPT)
+        self.assertNotIn('immutable', response['Cache-Control'])
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_spa_index_is_cached_and_revalidated(self):
+        SPAIndexView._cache.clear()
+        response = self.client.get('/projects/42/')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'id="root"')
+        self.assertEqual(response['Cache-Control'], 'no-cache')
+
+        response = self.client.get('/projects/42/', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+
+@override_settings(IDEMPOTENCY_WAIT_SECONDS=0)
+class DatabaseConfigTest(SimpleTestCase):
+    @mock.patch.dict(os.environ, {'DB_ENGINE': 'postgresql', 'DB_POOL': 'true',
+                                  'DB_POOL_MAX_SIZE': '4'})
+    def test_pool_replaces_persistent_connections(self):
+        config = database_config()
+        self.assertEqual(config['CONN_MAX_AGE'], 0)
+        self.assertEqual(config['OPTIONS']['pool'], {'min_size': 2, 'max_size': 4})
+
+    @mock.patch.dict(os.environ, {'DB_ENGINE': 'postgresql', 'DB_POOL': 'true'})
+    @skipUnless(importlib.util.find_spec('psycopg_pool'), 'psycopg[pool] is not installed')
+    def test_pool_is_accepted_by_the_backend(self):
+        from django.db.backends.postgresql.base import DatabaseWrapper
+        from psycopg_pool import ConnectionPool
+
+        wrapper = DatabaseWrapper(dict(database_config(), TIME_ZONE=None,
+                                       AUTOCOMMIT=True, ATOMIC_REQUESTS=False), alias='pooled')
+        # The pool is created closed; nothing connects here
+        self.assertIsInstance(wrapper.pool, ConnectionPool)
+        wrapper.close_pool()
+
+
+class IdempotencyKeyTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='alice', email='alice@x.com', password='pass', role='user'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(user=self.user)
+
+    def create(self, key, title='Pay rent'):
+        return self.client.post(
+            reverse('task-list'),
+            {'title': title, 'due_date': '2025-06-01T12:00:00Z', 'assigned_to': self.user.pk},
+            format='json', HTTP_IDEMPOTENCY_KEY=key,
+        )
+
+    def test_retry_replays_first_response(self):
+        first = self.create('abc')
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        with self.assertNumQueries(0):
+            retry = self.create('abc')
+        self.assertEqual(retry.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(retry.data['id'], first.data['id'])
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(Task.objects.count(), 1)
+
+        self.assertEqual(self.create('other').status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Task.objects.count(), 2)
+
+    def test_key_reused_for_different_body(self):
+        self.create('abc')
+        response = self.create('abc', title='Something else')
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+
+    def test_request_in_progress_conflicts(self):
+        # Another worker holds the key for an identical request
+        body = self.client._encode_data(
+            {'title': 'Pay rent', 'due_date': '2025-06-01T12:00:00Z',
+             'assigned_to': self.user.pk}, 'json')[0]
+        fingerprint = hashlib.sha256(b'POST /api/tasks/\n' + body).hexdigest()
+        digest = hashlib.sha256(b'busy').hexdigest()
+        cache.add(f'idempotency-lock:{self.user.pk}:{digest}', fingerprint)
+
+        self.assertEqual(self.create('busy').status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(Task.objects.exists())
+
+    @override_settings(IDEMPOTENCY_WAIT_SECONDS=0.1)
+    def test_server_error_can_be_retried(self):
+        self.client.raise_request_exception = False
+        with mock.patch('tasks.views.TaskViewSet.perform_create', side_effect=RuntimeError):
+            response = self.create('abc')
+        self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
+        self.assertEqual(self.create('abc').status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Task.objects.count(), 1)
+
+
+@mock.patch.object(TaskAdmin, 'list_per_page', 3)
+class KeysetAdminTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_superuser(
+            username='root', email='root@x.com', password='pass', role='admin'
+        )
+        cls.project = Project.objects.create(name='Release train', due_date='2025-02-01',
+                                             owner=cls.admin)
+        for day in range(1, 8):
+            Task.objects.create(title=f'Task {day}', due_date=f'2025-01-0{day}T09:00:00Z',
+                                assigned_to=cls.admin, project=cls.project)
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+
+    def titles(self, response):
+        return [task.title for task in response.context['cl'].result_list]
+
+    def test_pages_by_key_in_due_date_order(self):
+        url = reverse('admin:tasks_task_changelist')
+        first = self.client.get(url)
+        self.assertEqual(self.titles(first), ['Task 1', 'Task 2', 'Task 3'])
+        cl = first.context['cl']
+        self.assertEqual(cl.result_count, 7)
+        self.assertIsNone(cl.previous_url)
+
+        second = self.client.get(url + cl.next_url)
+        self.assertEqual(self.titles(second), ['Task 4', 'Task 5', 'Task 6'])
+        third = self.client.get(url + second.context['cl'].next_url)
+        self.assertEqual(self.titles(third), ['Task 7'])
+        self.assertIsNone(third.context['cl'].next_url)
+
+        back = self.client.get(url + third.context['cl'].previous_url)
+        self.assertEqual(self.titles(back), ['Task 4', 'Task 5', 'Task 6'])
+        self.assertEqual(self.client.get(url + '?cursor=junk').status_code, 302)
+
+    def test_rows_do_not_add_queries(self):
+        url = reverse('admin:tasks_task_changelist')
+        # session, user, one joined page of rows, one capped count; PostgreSQL
+        # asks the planner for an estimate first and counts a table this small
+        if connection.vendor == 'postgresql':
+            with self.assertNumQueries(5) as ctx:
+                self.client.get(url)
+            self.assertTrue(ctx.captured_queries[-2]['sql'].startswith('EXPLAIN'))
+        else:
+            with self.assertNumQueries(4) as ctx:
+                self.client.get(url)
+            self.assertIn('LIMIT 10001', ctx.captured_queries[-1]['sql'])
+
+        sorted_list = self.client.get(url, {'o': '-4'})
+        self.assertFalse(sorted_list.context['cl'].keyset)
+        self.assertEqual(self.titles(sorted_list), ['Task 7', 'Task 6', 'Task 5'])
+
+    def test_prefix_search_and_autocomplete(self):
+        response = self.client.get(reverse('admin:tasks_task_changelist'), {'q': '"task 7"'})
+        self.assertEqual(self.titles(response), ['Task 7'])
+        response = self.client.get(reverse('admin:autocomplete'), {
+            'app_label': 'tasks', 'model_name': 'task', 'field_name': 'project', 'term': 'rel',
+        })
+        self.assertEqual([row['text'] for row in response.json()['results']], ['Release train'])
+
+
+class BatchViewTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='alice', email='alice@x.com', password='pass', role='user'
+        )
+        cls.task = Task.objects.create(title='Pay rent', due_date='2025-06-01T12:00:00Z',
+                                       assigned_to=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(self.user)}')
+
+    def batch(self, *requests, **extra):
+        return self.client.post(reverse('batch'), {'requests': list(requests), **extra},
+                                format='json')
+
+    def test_dashboard_reads_authenticate_once(self):
+        verify = mock.patch.object(JWTAuthentication, 'get_validated_token',
+                                   autospec=True, side_effect=JWTAuthentication.get_validated_token)
+        with verify as get_validated_token:
+            response = self.batch(
+                {'id': 'tasks', 'url': '/api/tasks/?completed=false'},
+                {'id': 'projects', 'url': '/api/projects/'},
+                {'id': 'profile', 'url': '/api/auth/profile/'},
+                parallel=True,
+            )
+        self.assertEqual(get_validated_token.call_count, 1)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data['responses']
+        self.assertEqual([r['id'] for r in results], ['tasks', 'projects', 'profile'])
+        self.assertEqual([r['status'] for r in results], [200, 200, 200])
+        self.assertEqual(results[0]['body'][0]['title'], 'Pay rent')
+        self.assertEqual(results[2]['body']['username'], 'alice')
+
+    def test_each_sub_request_has_its_own_status(self):
+        response = self.batch(
+            {'method': 'POST', 'url': '/api/tasks/', 'headers': {'Idempotency-Key': 'k1'},
+             'body': {'title': 'Buy milk', 'due_date': '2025-06-02T12:00:00Z',
+                      'assigned_to': self.user.pk}},
+            {'method': 'POST', 'url': '/api/tasks/', 'body': {'title': ''}},
+            {'url': '/api/nowhere/'},
+            {'method': 'DELETE', 'url': f'/api/tasks/{self.task.pk}/'},
+        )
+        statuses = [r['status'] for r in response.data['responses']]
+        self.assertEqual(statuses, [201, 400, 404, 204])
+        self.assertEqual(list(Task.objects.values_list('title', flat=True)), ['Buy milk'])
+
+        replay = self.batch({'method': 'POST', 'url': '/api/tasks/',
+                             'headers': {'Idempotency-Key': 'k1'},
+                             'body': {'title': 'Buy milk', 'due_date': '2025-06-02T12:00:00Z',
+                                      'assigned_to': self.user.pk}})
+        self.assertEqual(replay.data['responses'][0]['headers'], {'Idempotent-Replayed': 'true'})
+        self.assertEqual(Task.objects.count(), 1)
+
+    @override_settings(BATCH_MAX_REQUESTS=2)
+    def test_limits_and_validation(self):
+        self.assertEqual(self.batch(*[{'url': '/api/tasks/'}] * 3).status_code,
+                         status.HTTP_400_BAD_REQUEST)
+        for url in ('/admin/', 'https://example.com/api/tasks/', '/api/batch/'):
+            self.assertEqual(self.batch({'url': url}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.client.credentials()
+        self.assertEqual(self.batch({'url': '/api/tasks/'}).status_code,
+                         status.HTTP_401_UNAUTHORIZED)
+
+
+class ParallelBatchTest(TransactionTestCase):
+    """Parallel batches only run under ASGI, with each worker on its own connection."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='alice', email='alice@x.com', password='pass', role='user'
+        )
+        Task.objects.create(title='Pay rent', due_date='2025-06-01T12:00:00Z',
+                            assigned_to=self.user)
+        self.token = str(AccessToken.for_user(self.user))
+
+    async def test_reads_run_on_the_thread_pool(self):
+        workers = []
+        run = BatchView._run
+
+        def record(view, request, sub):
+            workers.append(threading.current_thread().name)
+            return run(view, request, sub)
+
+        requests = [
+            {'id': 'tasks', 'url': '/api/tasks/?completed=false'},
+            {'id': 'projects', 'url': '/api/projects/'},
+            {'id': 'profile', 'url': '/api/auth/profile/'},
+        ]
+        with mock.patch.object(BatchView, '_run', autospec=True, side_effect=record), \
+                mock.patch.object(connections, 'close_all',
+                                  wraps=connections.close_all) as close_all:
+            response = await self.async_client.post(
+                reverse('batch'), {'requests': requests, 'parallel': True},
+                content_type='application/json',
+                headers={'Authorization': f'Bearer {self.token}'},
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.json()['responses']
+        self.assertEqual([r['id'] for r in results], ['tasks', 'projects', 'profile'])
+        self.assertEqual([r['status'] for r in results], [200, 200, 200])
+        self.assertEqual(results[0]['body'][0]['title'], 'Pay rent')
+        self.assertEqual(results[2]['body']['username'], 'alice')
+        self.assertEqual(len(workers), 3)
+        self.assertTrue(all(name.startswith('ThreadPoolExecutor') for name in workers), workers)
+        # Every worker closes the connection it opened
+        self.assertEqual(close_all.call_count, 3)
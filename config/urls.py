@@ -15,24 +15,28 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.urls import path, include, re_path
-from django.views.generic import TemplateView
-from rest_framework_simplejwt.views import (
-    TokenObtainPairView,
-    TokenRefreshView,
-)
+from rest_framework_simplejwt.views import TokenRefreshView
 from django.contrib import admin
 from tasks import urls as tasks_urls
 from users import urls as users_urls
+from users.views import TokenObtainView
 from projects import urls as projects_urls
+from jobs import urls as jobs_urls
+from .static import SPAIndexView
+from .batch import BatchView
+from .views import HealthView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('api/auth/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('api/health/', HealthView.as_view(), name='health'),
+    path('api/batch/', BatchView.as_view(), name='batch'),
+    path('api/auth/token/', TokenObtainView.as_view(), name='token_obtain_pair'),
     path('api/auth/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('api/', include(tasks_urls)),
     path('api/auth/', include(users_urls)),
     path('api/', include(projects_urls)), # Include projects app urls under /api/
+    path('api/', include(jobs_urls)),
 
     # Serve the React frontend
-    re_path(r'^(?!api/).*$', TemplateView.as_view(template_name='index.html')),
+    re_path(r'^(?!api/).*$', SPAIndexView.as_view()),
 ]
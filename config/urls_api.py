@@ -0,0 +1,25 @@
+"""
+URL configuration for the API-only profile (config.settings_api).
+
+The same ``/api/`` routes as config.urls, without the admin or the SPA.
+"""
+from django.urls import path, include
+from rest_framework_simplejwt.views import TokenRefreshView
+from tasks import urls as tasks_urls
+from users import urls as users_urls
+from users.views import TokenObtainView
+from projects import urls as projects_urls
+from jobs import urls as jobs_urls
+from .batch import BatchView
+from .views import HealthView
+
+urlpatterns = [
+    path('api/health/', HealthView.as_view(), name='health'),
+    path('api/batch/', BatchView.as_view(), name='batch'),
+    path('api/auth/token/', TokenObtainView.as_view(), name='token_obtain_pair'),
+    path('api/auth/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('api/', include(tasks_urls)),
+    path('api/auth/', include(users_urls)),
+    path('api/', include(projects_urls)),
+    path('api/', include(jobs_urls)),
+]
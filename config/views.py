@@ -0,0 +1,25 @@
+from django.db import DatabaseError, connections
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+
+class HealthView(APIView):
+    """Report whether every configured database alias answers a trivial query."""
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        databases = {}
+        for alias in connections:
+            try:
+                with connections[alias].cursor() as cursor:
+                    cursor.execute('SELECT 1')
+                databases[alias] = 'ok'
+            except DatabaseError as exc:
+                databases[alias] = f'error: {exc}'
+        healthy = all(state == 'ok' for state in databases.values())
+        return Response(
+            {'status': 'ok' if healthy else 'error', 'databases': databases},
+            status=status.HTTP_200_OK if healthy else status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
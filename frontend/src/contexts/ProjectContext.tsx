@@ -12,6 +12,11 @@ export interface Project {
   status: 'pending' | 'in-progress' | 'completed' | 'archived';
   priority: 'low' | 'medium' | 'high' | 'urgent';
   owner: User;
+  task_count: number;
+  completed_count: number;
+  overdue_count: number;
+  next_due_date: string | null;
+  completion_percentage: number;
   created_at: string;
   updated_at: string;
 }
@@ -0,0 +1,8 @@
+from django.contrib import admin
+from .models import Job
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display  = ('id', 'name', 'status', 'priority', 'attempts', 'progress', 'created_at')
+    list_filter   = ('status', 'name')
+    readonly_fields = ('result', 'error', 'locked_by', 'locked_at', 'finished_at')
@@ -0,0 +1,80 @@
+import os
+import socket
+import threading
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from jobs.queue import heartbeat, requeue_stale, run_next
+
+
+class Command(BaseCommand):
+    help = 'Run background job workers against the database-backed queue.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=2,
+                            help='Number of worker threads.')
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Seconds to sleep when the queue is empty.')
+        parser.add_argument('--burst', action='store_true',
+                            help='Exit once the queue is empty instead of polling.')
+        parser.add_argument('--requeue-interval', type=float, default=60.0,
+                            help='Seconds between checks for jobs held by dead workers.')
+
+    def handle(self, *args, **options):
+        stop = threading.Event()
+        prefix = f'{socket.gethostname()}:{os.getpid()}'
+        self.requeue()
+
+        worker_ids = [f'{prefix}:{n}' for n in range(options['workers'])]
+        threads = [
+            threading.Thread(
+                target=self.work,
+                args=(worker_id, stop, options['poll_interval'], options['burst']),
+                daemon=True,
+            )
+            for worker_id in worker_ids
+        ]
+        for thread in threads:
+            thread.start()
+        self.stdout.write(f'Started {len(threads)} workers.')
+        # Keep our own running jobs fresh, and look for jobs left running by
+        # workers that crashed elsewhere, not just at startup
+        next_requeue = time.monotonic() + options['requeue_interval']
+        try:
+            while any(thread.is_alive() for thread in threads):
+                for thread in threads:
+                    thread.join(timeout=0.5)
+                if time.monotonic() >= next_requeue:
+                    alive = [worker_id for worker_id, thread in zip(worker_ids, threads)
+                             if thread.is_alive()]
+                    close_old_connections()
+                    heartbeat(alive)
+                    self.requeue()
+                    next_requeue = time.monotonic() + options['requeue_interval']
+        except KeyboardInterrupt:
+            self.stdout.write('Stopping after current jobs...')
+            stop.set()
+            for thread in threads:
+                thread.join()
+        self.stdout.write(self.style.SUCCESS('Workers stopped.'))
+
+    def requeue(self):
+        close_old_connections()
+        requeued = requeue_stale()
+        if requeued:
+            self.stdout.write(f'Re-queued {requeued} stale jobs.')
+
+    def work(self, worker_id, stop, poll_interval, burst):
+        # Each thread gets its own database connection; release it on exit
+        try:
+            while not stop.is_set():
+                close_old_connections()
+                if run_next(worker_id):
+                    continue
+                if burst:
+                    break
+                stop.wait(poll_interval)
+        finally:
+            connection.close()
@@ -0,0 +1,69 @@
+from django.db import models
+from django.conf import settings
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """A unit of background work, claimed and run by ``manage.py run_jobs``."""
+    STATUS_QUEUED    = 'queued'
+    STATUS_RUNNING   = 'running'
+    STATUS_SUCCEEDED = 'succeeded'
+    STATUS_FAILED    = 'failed'
+    STATUS_CANCELLED = 'cancelled'
+
+    STATUS_CHOICES = [
+        (STATUS_QUEUED,    'Queued'),
+        (STATUS_RUNNING,   'Running'),
+        (STATUS_SUCCEEDED, 'Succeeded'),
+        (STATUS_FAILED,    'Failed'),
+        (STATUS_CANCELLED, 'Cancelled'),
+    ]
+
+    name             = models.CharField(max_length=100)
+    payload          = models.JSONField(default=dict, blank=True)
+    status           = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    priority         = models.IntegerField(default=0, help_text='Higher runs first.')
+    run_at           = models.DateTimeField(default=timezone.now)
+    attempts         = models.PositiveIntegerField(default=0)
+    max_attempts     = models.PositiveIntegerField(default=3)
+    progress         = models.FloatField(default=0)
+    progress_message = models.CharField(max_length=255, blank=True)
+    result           = models.JSONField(null=True, blank=True)
+    error            = models.TextField(blank=True)
+    locked_by        = models.CharField(max_length=100, blank=True)
+    locked_at        = models.DateTimeField(null=True, blank=True)
+    created_by       = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='jobs'
+    )
+    created_at       = models.DateTimeField(auto_now_add=True)
+    updated_at       = models.DateTimeField(auto_now=True)
+    finished_at      = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            # Matches the claim query: queued jobs, highest priority, oldest first
+            models.Index(fields=['status', '-priority', 'run_at'], name='jobs_job_claim_idx'),
+            models.Index(fields=['created_by']),
+        ]
+
+    def __str__(self):
+        return f"{self.name} #{self.pk} ({self.status})"
+
+    def set_progress(self, progress, message=''):
+        """
+        Record progress (0-100) without touching the rest of the row. Also
+        a heartbeat: it refreshes ``locked_at``, so a long job that reports
+        progress isn't taken for one whose worker died.
+        """
+        now = timezone.now()
+        self.progress = progress
+        self.progress_message = message
+        Job.objects.filter(pk=self.pk).update(
+            progress=progress, progress_message=message, updated_at=now
+        )
+        Job.objects.filter(pk=self.pk, status=self.STATUS_RUNNING).update(locked_at=now)
@@ -0,0 +1,128 @@
+import logging
+import traceback
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+from .registry import get_handler
+
+logger = logging.getLogger(__name__)
+
+RETRY_BASE_DELAY = 10        # seconds; doubles with every attempt
+STALE_LOCK_TIMEOUT = 15 * 60  # seconds a running job may go without a heartbeat
+
+
+def enqueue(name, payload=None, priority=0, run_at=None, max_attempts=3, created_by=None):
+    """Queue a job for the registered handler ``name``."""
+    get_handler(name)  # fail fast on typos rather than in the worker
+    return Job.objects.create(
+        name=name,
+        payload=payload or {},
+        priority=priority,
+        run_at=run_at or timezone.now(),
+        max_attempts=max_attempts,
+        created_by=created_by,
+    )
+
+
+def _due_jobs():
+    return (Job.objects
+            .filter(status=Job.STATUS_QUEUED, run_at__lte=timezone.now())
+            .order_by('-priority', 'run_at', 'id'))
+
+
+def claim(worker_id):
+    """
+    Atomically claim the next due job for ``worker_id``, or return None.
+
+    On databases with ``SKIP LOCKED`` (PostgreSQL) concurrent workers skip
+    rows another worker has locked instead of queueing behind it. Elsewhere
+    (SQLite) a conditional UPDATE acts as compare-and-set on the status.
+    """
+    now = timezone.now()
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            job = _due_jobs().select_for_update(skip_locked=True).first()
+            if job is None:
+                return None
+            Job.objects.filter(pk=job.pk).update(
+                status=Job.STATUS_RUNNING, locked_by=worker_id, locked_at=now,
+                attempts=F('attempts') + 1, updated_at=now,
+            )
+    else:
+        for pk in _due_jobs().values_list('pk', flat=True)[:10]:
+            claimed = Job.objects.filter(pk=pk, status=Job.STATUS_QUEUED).update(
+                status=Job.STATUS_RUNNING, locked_by=worker_id, locked_at=now,
+                attempts=F('attempts') + 1, updated_at=now,
+            )
+            if claimed:
+                job = Job(pk=pk)
+                break
+        else:
+            return None
+    job.refresh_from_db()
+    return job
+
+
+def run(job):
+    """Run a claimed job and record success, a scheduled retry or failure."""
+    try:
+        result = get_handler(job.name)(job)
+    except Exception:
+        error = traceback.format_exc()
+        logger.exception('Job %s failed (attempt %s/%s)', job.pk, job.attempts, job.max_attempts)
+        if job.attempts < job.max_attempts:
+            delay = RETRY_BASE_DELAY * 2 ** (job.attempts - 1)
+            _finish(job, Job.STATUS_QUEUED, error=error, finished=False,
+                    run_at=timezone.now() + timedelta(seconds=delay))
+        else:
+            _finish(job, Job.STATUS_FAILED, error=error)
+        return False
+    _finish(job, Job.STATUS_SUCCEEDED, result=result, progress=100)
+    return True
+
+
+def _finish(job, status, finished=True, **fields):
+    now = timezone.now()
+    fields.update(status=status, locked_by='', locked_at=None, updated_at=now)
+    if finished:
+        fields['finished_at'] = now
+    # Only the worker holding the lock may finish it; a cancelled or
+    # re-queued job is left alone.
+    Job.objects.filter(pk=job.pk, status=Job.STATUS_RUNNING,
+                       locked_by=job.locked_by).update(**fields)
+
+
+def heartbeat(worker_ids):
+    """Refresh ``locked_at`` of the jobs these live workers are running."""
+    return Job.objects.filter(status=Job.STATUS_RUNNING, locked_by__in=worker_ids).update(
+        locked_at=timezone.now(),
+    )
+
+
+def requeue_stale(timeout=STALE_LOCK_TIMEOUT):
+    """
+    Put jobs whose worker died mid-run (no heartbeat for ``timeout``
+    seconds) back on the queue, or fail them once they have used up their
+    attempts, so a job that kills its worker isn't retried forever.
+    """
+    now = timezone.now()
+    stale = Job.objects.filter(status=Job.STATUS_RUNNING,
+                               locked_at__lt=now - timedelta(seconds=timeout))
+    stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.STATUS_FAILED, locked_by='', locked_at=None, updated_at=now,
+        finished_at=now, error='The worker running this job stopped responding.',
+    )
+    return stale.update(status=Job.STATUS_QUEUED, locked_by='', locked_at=None, updated_at=now)
+
+
+def run_next(worker_id):
+    """Claim and run one job. Returns False when the queue is empty."""
+    job = claim(worker_id)
+    if job is None:
+        return False
+    run(job)
+    return True
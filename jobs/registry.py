@@ -0,0 +1,43 @@
+from django.utils.module_loading import autodiscover_modules
+
+_handlers = {}
+_discovered = False
+
+
+def discover():
+    """
+    Import every installed app's ``jobs`` module so its handlers register.
+
+    Done on first lookup rather than at startup: web processes only need a
+    handler when they enqueue one, so they don't pay for importing them all.
+    """
+    global _discovered
+    if not _discovered:
+        autodiscover_modules('jobs')
+        _discovered = True
+
+
+def register(name):
+    """
+    Register a job handler under ``name``.
+
+    The handler is called with the ``Job`` instance and may return any
+    JSON-serialisable value, which is stored as the job's result.
+    """
+    def decorator(func):
+        _handlers[name] = func
+        return func
+    return decorator
+
+
+def get_handler(name):
+    discover()
+    try:
+        return _handlers[name]
+    except KeyError:
+        raise LookupError(f'No job handler registered as {name!r}')
+
+
+def registered_names():
+    discover()
+    return sorted(_handlers)
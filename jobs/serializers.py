@@ -0,0 +1,13 @@
+from rest_framework import serializers
+from .models import Job
+
+
+class JobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Job
+        fields = [
+            'id', 'name', 'status', 'priority', 'attempts', 'max_attempts',
+            'progress', 'progress_message', 'result', 'error',
+            'run_at', 'created_at', 'updated_at', 'finished_at',
+        ]
+        read_only_fields = fields
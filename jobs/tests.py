@@ -0,0 +1,158 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from django.test import TransactionTestCase
+from rest_framework.test import APITestCase
+from users.models import User
+from projects.models import Project
+from tasks.models import Task
+from jobs.models import Job
+from jobs.queue import claim, enqueue, heartbeat, requeue_stale, run, run_next
+from jobs.registry import register
+
+calls = []
+
+
+@register('tests.record')
+def record(job):
+    calls.append(job.payload['n'])
+    job.set_progress(50, 'half way')
+    return {'n': job.payload['n']}
+
+
+@register('tests.explode')
+def explode(job):
+    raise RuntimeError('boom')
+
+
+class JobQueueTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = User.objects.create_user(
+            username='alice', email='alice@x.com', password='pass', role='user'
+        )
+        cls.bob = User.objects.create_user(
+            username='bob', email='bob@x.com', password='pass', role='user'
+        )
+
+    def setUp(self):
+        calls.clear()
+
+    def test_claims_by_priority_then_age(self):
+        enqueue('tests.record', {'n': 1})
+        enqueue('tests.record', {'n': 2}, priority=5)
+        enqueue('tests.record', {'n': 3}, run_at=timezone.now() + timezone.timedelta(hours=1))
+        while run_next('w1'):
+            pass
+        self.assertEqual(calls, [2, 1])
+        job = Job.objects.get(payload__n=2)
+        self.assertEqual(job.status, Job.STATUS_SUCCEEDED)
+        self.assertEqual(job.result, {'n': 2})
+        self.assertEqual(job.progress, 100)
+
+    def test_claimed_job_is_not_claimed_twice(self):
+        enqueue('tests.record', {'n': 1})
+        self.assertIsNotNone(claim('w1'))
+        self.assertIsNone(claim('w2'))
+
+    def test_failures_retry_then_fail(self):
+        job = enqueue('tests.explode', max_attempts=2)
+        run(claim('w1'))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_QUEUED)
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertIn('boom', job.error)
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        run(claim('w1'))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_FAILED)
+        self.assertEqual(job.attempts, 2)
+
+    def test_stale_jobs_are_requeued_until_out_of_attempts(self):
+        long_ago = timezone.now() - timezone.timedelta(hours=1)
+        alive, dead = enqueue('tests.record', {'n': 1}), enqueue('tests.record', {'n': 2})
+        spent = enqueue('tests.record', {'n': 3}, max_attempts=1)
+        for worker in ('w1', 'w2', 'w3'):
+            claim(worker)
+        Job.objects.update(locked_at=long_ago)
+        # w1 still reports in; the others' workers are gone
+        self.assertEqual(heartbeat(['w1']), 1)
+        Job.objects.get(pk=dead.pk).set_progress(10)
+        self.assertGreater(Job.objects.get(pk=dead.pk).locked_at, long_ago)
+        Job.objects.filter(pk=dead.pk).update(locked_at=long_ago)
+
+        self.assertEqual(requeue_stale(), 1)
+        statuses = dict(Job.objects.values_list('pk', 'status'))
+        self.assertEqual(statuses, {alive.pk: Job.STATUS_RUNNING, dead.pk: Job.STATUS_QUEUED,
+                                    spent.pk: Job.STATUS_FAILED})
+
+    def test_unknown_handler_is_rejected(self):
+        with self.assertRaises(LookupError):
+            enqueue('tests.missing')
+
+    def test_project_delete_runs_in_background(self):
+        project = Project.objects.create(name='P', due_date='2030-01-01', owner=self.alice)
+        task = Task.objects.create(title='t', due_date='2030-01-01T00:00:00Z',
+                                   assigned_to=self.alice, project=project)
+        self.client.force_authenticate(user=self.alice)
+        resp = self.client.delete(reverse('project-detail', args=[project.id]))
+        self.assertEqual(resp.status_code, status.HTTP_202_ACCEPTED)
+        self.assertTrue(Project.objects.filter(pk=project.pk).exists())
+
+        # Hidden and read-only at once; asking again returns the same job
+        url = reverse('project-detail', args=[project.id])
+        self.assertEqual(self.client.get(reverse('project-list')).data, [])
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.patch(url, {'name': 'Q'}).status_code,
+                         status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.delete(url).data['id'], resp.data['id'])
+        self.assertEqual(Job.objects.count(), 1)
+
+        run_next('w1')
+        self.assertFalse(Project.objects.filter(pk=project.pk).exists())
+        task.refresh_from_db()
+        self.assertIsNone(task.project)
+
+        job = self.client.get(reverse('job-detail', args=[resp.data['id']]))
+        self.assertEqual(job.data['status'], Job.STATUS_SUCCEEDED)
+        self.assertEqual(job.data['result'], {'detached_tasks': 1})
+
+    def test_cancelled_project_delete_can_be_retried(self):
+        project = Project.objects.create(name='P', due_date='2030-01-01', owner=self.alice)
+        self.client.force_authenticate(user=self.alice)
+        url = reverse('project-detail', args=[project.id])
+        first = self.client.delete(url).data['id']
+        self.client.post(reverse('job-cancel', args=[first]))
+        second = self.client.delete(url).data['id']
+        self.assertNotEqual(first, second)
+        project.refresh_from_db()
+        self.assertEqual(project.deletion_job_id, second)
+
+    def test_status_api_is_scoped_and_cancel_works(self):
+        job = enqueue('tests.record', {'n': 1}, created_by=self.alice)
+        self.client.force_authenticate(user=self.bob)
+        self.assertEqual(self.client.get(reverse('job-list')).data, [])
+
+        self.client.force_authenticate(user=self.alice)
+        resp = self.client.post(reverse('job-cancel', args=[job.id]))
+        self.assertEqual(resp.data['status'], Job.STATUS_CANCELLED)
+        resp = self.client.post(reverse('job-cancel', args=[job.id]))
+        self.assertEqual(resp.status_code, status.HTTP_409_CONFLICT)
+
+
+class RunJobsCommandTest(TransactionTestCase):
+    # Worker threads use their own connections, so data must be committed
+
+    def setUp(self):
+        calls.clear()
+
+    def test_worker_command_drains_queue(self):
+        for n in range(5):
+            enqueue('tests.record', {'n': n})
+        call_command('run_jobs', workers=2, burst=True, stdout=StringIO())
+        self.assertEqual(sorted(calls), [0, 1, 2, 3, 4])
+        self.assertFalse(Job.objects.exclude(status=Job.STATUS_SUCCEEDED).exists())
@@ -0,0 +1,31 @@
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from .models import Job
+from .serializers import JobSerializer
+
+
+class JobViewSet(viewsets.ReadOnlyModelViewSet):
+    """Status of background jobs started by the current user (all jobs for admins)."""
+    queryset = Job.objects.all()
+    serializer_class = JobSerializer
+    permission_classes = [IsAuthenticated]
+    filterset_fields = ['status', 'name']
+
+    def get_queryset(self):
+        if self.request.user.is_admin():
+            return Job.objects.all()
+        return Job.objects.filter(created_by=self.request.user)
+
+    @action(detail=True, methods=['post'])
+    def cancel(self, request, pk=None):
+        job = self.get_object()
+        cancelled = Job.objects.filter(pk=job.pk, status=Job.STATUS_QUEUED).update(
+            status=Job.STATUS_CANCELLED
+        )
+        if not cancelled:
+            return Response({'detail': 'Only queued jobs can be cancelled.'},
+                            status=status.HTTP_409_CONFLICT)
+        job.refresh_from_db()
+        return Response(self.get_serializer(job).data)
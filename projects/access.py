@@ -0,0 +1,94 @@
+"""
+Upkeep of the denormalized ``ProjectAccess`` table.
+
+Every change to a project's owner or memberships recomputes the access
+rows of just the users involved, in the same transaction as the change.
+Queryset ``update()``, ``bulk_create()`` and raw SQL skip these signals;
+call ``rebuild_access`` (or ``manage.py rebuild_project_access``) after
+changing owners or memberships that way.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Project, ProjectAccess, ProjectMembership
+
+BATCH_SIZE = 5000
+
+
+def refresh_access(project_id, user_ids):
+    """Recompute the access rows of ``user_ids`` on one project."""
+    user_ids = {pk for pk in user_ids if pk is not None}
+    if not user_ids:
+        return
+    owner_id = Project.objects.filter(pk=project_id).values_list('owner_id', flat=True).first()
+    levels = {
+        user_id: ProjectAccess.ROLE_PERMISSIONS[role]
+        for user_id, role in ProjectMembership.objects
+        .filter(project_id=project_id, user_id__in=user_ids).values_list('user_id', 'role')
+    }
+    if owner_id in user_ids:
+        levels[owner_id] = ProjectAccess.PERMISSION_MANAGE
+
+    with transaction.atomic():
+        ProjectAccess.objects.filter(project_id=project_id, user_id__in=user_ids).delete()
+        ProjectAccess.objects.bulk_create([
+            ProjectAccess(user_id=user_id, project_id=project_id, permission=permission)
+            for user_id, permission in levels.items()
+        ])
+
+
+def _expected_rows(projects):
+    """(user_id, project_id) -> permission for ``projects``, from owners and memberships."""
+    rows = {}
+    for user_id, project_id, role in (
+        ProjectMembership.objects.filter(project__in=projects)
+        .values_list('user_id', 'project_id', 'role')
+    ):
+        rows[user_id, project_id] = ProjectAccess.ROLE_PERMISSIONS[role]
+    for project_id, owner_id in projects.values_list('pk', 'owner_id'):
+        rows[owner_id, project_id] = ProjectAccess.PERMISSION_MANAGE
+    return rows
+
+
+def rebuild_access(project_ids=None, batch_size=BATCH_SIZE):
+    """
+    Rebuild the access rows of ``project_ids`` (every project if None), a
+    batch of projects per transaction. Returns the number of rows written.
+    """
+    projects = Project.objects.order_by('pk')
+    if project_ids is not None:
+        projects = projects.filter(pk__in=project_ids)
+    written, last_id = 0, 0
+    while True:
+        ids = list(projects.filter(pk__gt=last_id).values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return written
+        rows = _expected_rows(Project.objects.filter(pk__in=ids))
+        with transaction.atomic():
+            ProjectAccess.objects.filter(project_id__in=ids).delete()
+            ProjectAccess.objects.bulk_create([
+                ProjectAccess(user_id=user_id, project_id=project_id, permission=permission)
+                for (user_id, project_id), permission in rows.items()
+            ], batch_size=batch_size)
+        written += len(rows)
+        last_id = ids[-1]
+
+
+@receiver(post_save, sender=Project)
+def project_saved(sender, instance, created, **kwargs):
+    previous = None if created else getattr(instance, '_loaded_owner_id', None)
+    if created or previous != instance.owner_id:
+        # A project not loaded from the database may have changed hands from
+        # anyone, so rebuild it whole
+        if not created and previous is None:
+            rebuild_access([instance.pk])
+        else:
+            refresh_access(instance.pk, {previous, instance.owner_id})
+    instance._loaded_owner_id = instance.owner_id
+
+
+@receiver(post_save, sender=ProjectMembership)
+@receiver(post_delete, sender=ProjectMembership)
+def membership_changed(sender, instance, **kwargs):
+    refresh_access(instance.project_id, {instance.user_id})
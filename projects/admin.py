@@ -1,3 +1,20 @@
 from django.contrib import admin
+from config.admin_paging import LargeTableAdminMixin
+from .models import Project, ProjectMembership
 
-# Register your models here.
+
+class ProjectMembershipInline(admin.TabularInline):
+    model                = ProjectMembership
+    autocomplete_fields  = ('user',)
+    extra                = 0
+
+
+@admin.register(Project)
+class ProjectAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display         = ('name', 'owner', 'status', 'priority', 'due_date')
+    list_select_related  = ('owner',)
+    list_filter          = ('status', 'priority')
+    search_fields        = ('^name',)
+    autocomplete_fields  = ('owner',)
+    ordering             = ('name',)
+    inlines              = (ProjectMembershipInline,)
@@ -0,0 +1,16 @@
+import django_filters
+
+from .models import Project
+
+
+class ProjectFilter(django_filters.FilterSet):
+    """Filters on project fields and the task aggregates annotated by the view."""
+    task_count = django_filters.RangeFilter()
+    completed_count = django_filters.RangeFilter()
+    overdue_count = django_filters.RangeFilter()
+    completion_percentage = django_filters.RangeFilter()
+    next_due_date = django_filters.IsoDateTimeFromToRangeFilter()
+
+    class Meta:
+        model = Project
+        fields = ['status', 'priority']
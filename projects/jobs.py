@@ -0,0 +1,27 @@
+from jobs.registry import register
+from tasks.models import ArchivedTask, Task
+from .models import Project
+
+
+@register('projects.delete_project')
+def delete_project(job):
+    """
+    Detach a project's tasks in batches, then delete the project.
+
+    Doing the SET_NULL ourselves keeps each UPDATE short instead of one
+    statement touching every task of a large project.
+    """
+    project_id = job.payload['project_id']
+    batch_size = job.payload.get('batch_size', 1000)
+    total = Task.objects.filter(project_id=project_id).count() or 1
+    detached = 0
+    while True:
+        ids = list(Task.objects.filter(project_id=project_id)
+                   .values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            break
+        detached += Task.objects.filter(pk__in=ids).update(project=None)
+        job.set_progress(min(99, detached * 100 / total), f'Detached {detached} tasks')
+    ArchivedTask.objects.filter(project_id=project_id).update(project=None)
+    Project.objects.filter(pk=project_id).delete()
+    return {'detached_tasks': detached}
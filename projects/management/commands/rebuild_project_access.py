@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from projects.access import BATCH_SIZE, rebuild_access
+
+
+class Command(BaseCommand):
+    help = ('Recompute the project access table from owners and memberships, after '
+            'changing them with bulk operations or raw SQL. Each batch commits on its own.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--project', type=int, action='append', dest='projects',
+                            help='Only rebuild this project (repeatable).')
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        rows = rebuild_access(options['projects'], batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Wrote {rows} access rows.'))
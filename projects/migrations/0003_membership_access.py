@@ -0,0 +1,63 @@
+# Generated by Django 5.2.4 on 2026-10-19 11:15
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+BATCH_SIZE = 10000
+PERMISSION_MANAGE = 3
+
+
+def backfill_owner_access(apps, schema_editor):
+    # Before memberships existed, owners were the only users with access
+    Project = apps.get_model('projects', 'Project')
+    ProjectAccess = apps.get_model('projects', 'ProjectAccess')
+    last_id = 0
+    while True:
+        rows = list(Project.objects.filter(pk__gt=last_id).order_by('pk')
+                    .values_list('pk', 'owner_id')[:BATCH_SIZE])
+        if not rows:
+            break
+        ProjectAccess.objects.bulk_create([
+            ProjectAccess(project_id=project_id, user_id=owner_id, permission=PERMISSION_MANAGE)
+            for project_id, owner_id in rows
+        ])
+        last_id = rows[-1][0]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0002_project_color'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProjectAccess',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('permission', models.PositiveSmallIntegerField(choices=[(1, 'View'), (2, 'Edit'), (3, 'Manage')])),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='access', to='projects.project')),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='project_access', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'permission', 'project'], name='projects_access_user_idx')],
+                'constraints': [models.UniqueConstraint(fields=('user', 'project'), name='projects_access_unique')],
+            },
+        ),
+        migrations.CreateModel(
+            name='ProjectMembership',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('role', models.CharField(choices=[('viewer', 'Viewer'), ('editor', 'Editor'), ('manager', 'Manager')], default='viewer', max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='memberships', to='projects.project')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='project_memberships', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('project', 'user'), name='projects_membership_unique')],
+            },
+        ),
+        migrations.RunPython(backfill_owner_access, migrations.RunPython.noop),
+    ]
@@ -1,5 +1,71 @@
+from django.apps import apps
 from django.db import models
+from django.db.models import (
+    Case, Count, F, FloatField, Min, OuterRef, Q, Subquery, Value, When,
+)
+from django.db.models.functions import Cast, Coalesce
 from django.conf import settings
+from django.utils import timezone
+
+class ProjectQuerySet(models.QuerySet):
+    def visible_to(self, user, include_deleting=False):
+        """
+        Projects ``user`` owns or is a member of; admins see everything.
+        Projects waiting to be deleted are left out unless
+        ``include_deleting`` is set.
+
+        Joined through the ``ProjectAccess`` table, whose ``(user, permission,
+        project)`` index yields the user's projects directly, however many
+        there are in total.
+        """
+        return self.accessible_to(user, ProjectAccess.PERMISSION_VIEW, include_deleting)
+
+    def editable_by(self, user):
+        """Projects whose details and tasks ``user`` may change."""
+        return self.accessible_to(user, ProjectAccess.PERMISSION_EDIT)
+
+    def accessible_to(self, user, permission, include_deleting=False):
+        queryset = self if include_deleting else self.filter(deleting_at__isnull=True)
+        if user.is_admin():
+            return queryset
+        # (user, project) is unique, so the join never duplicates a project
+        return queryset.filter(access__user=user, access__permission__gte=permission)
+
+    def with_permission(self, user):
+        """Annotate ``permission``, the access level ``user`` has on each project."""
+        if user.is_admin():
+            return self.annotate(permission=Value(ProjectAccess.PERMISSION_MANAGE))
+        return self.annotate(permission=ProjectAccess.objects.level(user, OuterRef('pk')))
+
+    def with_task_stats(self):
+        """
+        Annotate task counts, overdue count, next due date and completion
+        percentage using conditional aggregates over a single join.
+
+        Tasks moved to ``ArchivedTask`` still count, as completed ones (only
+        completed tasks are archived), through a subquery on the archive's
+        project index.
+        """
+        ArchivedTask = apps.get_model('tasks', 'ArchivedTask')
+        archived = Coalesce(Subquery(
+            ArchivedTask.objects.filter(project=OuterRef('pk')).order_by()
+            .values('project').annotate(count=Count('pk')).values('count')
+        ), 0)
+        now = timezone.now()
+        open_tasks = Q(tasks__completed=False)
+        return self.annotate(
+            task_count=Count('tasks') + archived,
+            completed_count=Count('tasks', filter=Q(tasks__completed=True)) + archived,
+            overdue_count=Count('tasks', filter=open_tasks & Q(tasks__due_date__lt=now)),
+            next_due_date=Min('tasks__due_date', filter=open_tasks & Q(tasks__due_date__gte=now)),
+        ).annotate(
+            completion_percentage=Case(
+                When(task_count=0, then=Value(0.0)),
+                default=Cast('completed_count', FloatField()) * 100 / F('task_count'),
+                output_field=FloatField(),
+            ),
+        )
+
 
 class Project(models.Model):
     STATUS_CHOICES = [
@@ -29,7 +95,112 @@ class Project(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Set when deletion is requested: the project is hidden from then on,
+    # until ``deletion_job`` (projects.delete_project) removes it
+    deleting_at = models.DateTimeField(null=True, blank=True)
+    deletion_job = models.ForeignKey(
+        'jobs.Job',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+
+    objects = ProjectQuerySet.as_manager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets the access table follow ownership changes (see projects.access)
+        instance._loaded_owner_id = instance.__dict__.get('owner_id')
+        return instance
 
     def __str__(self):
         return self.name
 
+
+class ProjectMembership(models.Model):
+    """A user the project is shared with, and what they may do in it."""
+    ROLE_VIEWER  = 'viewer'
+    ROLE_EDITOR  = 'editor'
+    ROLE_MANAGER = 'manager'
+
+    ROLE_CHOICES = [
+        (ROLE_VIEWER,  'Viewer'),
+        (ROLE_EDITOR,  'Editor'),
+        (ROLE_MANAGER, 'Manager'),
+    ]
+
+    project    = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='memberships')
+    user       = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='project_memberships'
+    )
+    role       = models.CharField(max_length=10, choices=ROLE_CHOICES, default=ROLE_VIEWER)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['project', 'user'], name='projects_membership_unique'),
+        ]
+
+    def __str__(self):
+        return f'{self.user} in {self.project} ({self.role})'
+
+
+class ProjectAccessQuerySet(models.QuerySet):
+    def granting(self, user, permission):
+        """Ids of the projects where ``user`` has at least ``permission``."""
+        return self.filter(user=user, permission__gte=permission).values('project')
+
+    def level(self, user, project):
+        """``user``'s permission on ``project`` (an id or OuterRef) as a subquery; None if none."""
+        return Subquery(self.filter(user=user, project=project).values('permission')[:1])
+
+
+class ProjectAccess(models.Model):
+    """
+    Denormalized permission of every user on every project they can reach:
+    owners get PERMISSION_MANAGE, members the level of their role.
+
+    Rebuilt from ``Project.owner`` and ``ProjectMembership`` by the signals in
+    projects.access, so visibility and write checks are a single indexed
+    lookup instead of walking ownership and memberships per object.
+    """
+    PERMISSION_VIEW   = 1
+    PERMISSION_EDIT   = 2
+    PERMISSION_MANAGE = 3
+
+    PERMISSION_CHOICES = [
+        (PERMISSION_VIEW,   'View'),
+        (PERMISSION_EDIT,   'Edit'),
+        (PERMISSION_MANAGE, 'Manage'),
+    ]
+
+    ROLE_PERMISSIONS = {
+        ProjectMembership.ROLE_VIEWER:  PERMISSION_VIEW,
+        ProjectMembership.ROLE_EDITOR:  PERMISSION_EDIT,
+        ProjectMembership.ROLE_MANAGER: PERMISSION_MANAGE,
+    }
+
+    user       = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='project_access',
+        db_index=False,
+    )
+    project    = models.ForeignKey(Project, on_delete=models.CASCADE, related_name='access')
+    permission = models.PositiveSmallIntegerField(choices=PERMISSION_CHOICES)
+
+    objects = ProjectAccessQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'project'], name='projects_access_unique'),
+        ]
+        indexes = [
+            # Answers "which projects can this user see/edit" from the index alone
+            models.Index(fields=['user', 'permission', 'project'], name='projects_access_user_idx'),
+        ]
+
@@ -0,0 +1,24 @@
+from rest_framework import permissions
+from .models import ProjectAccess
+
+
+class HasProjectPermission(permissions.BasePermission):
+    """
+    Write access by project permission: editors and up may change the
+    project, managers (and the owner) may delete it and manage members.
+    Members may always remove themselves.
+
+    Read visibility is enforced by ``Project.objects.visible_to``; the view
+    annotates ``permission`` for writes, so this needs no query.
+    """
+    MANAGE_ACTIONS = ('destroy', 'members', 'member')
+
+    def has_object_permission(self, request, view, obj):
+        if request.method in permissions.SAFE_METHODS or request.user.is_admin():
+            return True
+        if (view.action == 'member' and request.method == 'DELETE'
+                and view.kwargs.get('user_id') == str(request.user.pk)):
+            return True
+        required = (ProjectAccess.PERMISSION_MANAGE if view.action in self.MANAGE_ACTIONS
+                    else ProjectAccess.PERMISSION_EDIT)
+        return (getattr(obj, 'permission', None) or 0) >= required
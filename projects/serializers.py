@@ -1,8 +1,39 @@
 from rest_framework import serializers
-from .models import Project
+from .models import Project, ProjectMembership
 
 class ProjectSerializer(serializers.ModelSerializer):
+    # Annotated by ProjectQuerySet.with_task_stats()
+    task_count = serializers.IntegerField(read_only=True)
+    completed_count = serializers.IntegerField(read_only=True)
+    overdue_count = serializers.IntegerField(read_only=True)
+    next_due_date = serializers.DateTimeField(read_only=True)
+    completion_percentage = serializers.FloatField(read_only=True)
+
     class Meta:
         model = Project
-        fields = ['id', 'name', 'description', 'due_date', 'status', 'priority', 'owner', 'created_at', 'updated_at']
+        fields = [
+            'id', 'name', 'description', 'due_date', 'status', 'priority', 'owner',
+            'task_count', 'completed_count', 'overdue_count',
+            'next_due_date', 'completion_percentage',
+            'created_at', 'updated_at',
+        ]
         read_only_fields = ['owner', 'created_at', 'updated_at']
+
+
+class ProjectMembershipSerializer(serializers.ModelSerializer):
+    username = serializers.CharField(source='user.username', read_only=True)
+
+    class Meta:
+        model = ProjectMembership
+        fields = ['id', 'user', 'username', 'role', 'created_at']
+        read_only_fields = ['id', 'created_at']
+
+    def validate_user(self, value):
+        project = self.context['project']
+        if self.instance is not None and value != self.instance.user:
+            raise serializers.ValidationError('The member cannot be changed.')
+        if value.pk == project.owner_id:
+            raise serializers.ValidationError('The owner already has full access.')
+        if self.instance is None and project.memberships.filter(user=value).exists():
+            raise serializers.ValidationError('Already a member of this project.')
+        return value
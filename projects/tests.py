@@ -1,3 +1,199 @@
-from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from users.models import User
+from projects.models import Project, ProjectAccess, ProjectMembership
+from tasks.archive import archive_tasks
+from tasks.models import Task
 
-# Create your tests here.
+
+class ProjectVisibilityTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            username='admin', email='admin@x.com', password='pass', role='admin'
+        )
+        cls.alice = User.objects.create_user(
+            username='alice', email='alice@x.com', password='pass', role='user'
+        )
+        cls.bob = User.objects.create_user(
+            username='bob', email='bob@x.com', password='pass', role='user'
+        )
+        cls.p_alice = Project.objects.create(
+            name='Alpha', due_date='2025-09-01', owner=cls.alice
+        )
+        cls.p_bob = Project.objects.create(
+            name='Beta', due_date='2025-09-01', owner=cls.bob
+        )
+
+    def test_user_lists_only_owned_projects(self):
+        self.client.force_authenticate(user=self.alice)
+        resp = self.client.get(reverse('project-list'))
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual([p['id'] for p in resp.data], [self.p_alice.id])
+
+    def test_admin_lists_all_projects(self):
+        self.client.force_authenticate(user=self.admin)
+        resp = self.client.get(reverse('project-list'))
+        self.assertEqual(len(resp.data), 2)
+
+    def test_other_users_project_is_not_found(self):
+        self.client.force_authenticate(user=self.alice)
+        resp = self.client.get(reverse('project-detail', args=[self.p_bob.id]))
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ProjectTaskStatsTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = User.objects.create_user(
+            username='alice', email='alice@x.com', password='pass', role='user'
+        )
+        cls.busy = Project.objects.create(
+            name='Busy', due_date='2030-01-01', owner=cls.alice
+        )
+        cls.empty = Project.objects.create(
+            name='Empty', due_date='2030-01-01', owner=cls.alice
+        )
+        past, future = '2000-01-01T00:00:00Z', '2100-01-01T00:00:00Z'
+        for due, done in [(past, True), (past, False), (past, False), (future, False)]:
+            Task.objects.create(
+                title='t', due_date=due, completed=done,
+                assigned_to=cls.alice, project=cls.busy,
+            )
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.alice)
+
+    def test_aggregates_are_annotated(self):
+        resp = self.client.get(reverse('project-detail', args=[self.busy.id]))
+        self.assertEqual(resp.data['task_count'], 4)
+        self.assertEqual(resp.data['completed_count'], 1)
+        self.assertEqual(resp.data['overdue_count'], 2)
+        self.assertEqual(resp.data['completion_percentage'], 25.0)
+        self.assertTrue(resp.data['next_due_date'].startswith('2100-01-01'))
+
+        resp = self.client.get(reverse('project-detail', args=[self.empty.id]))
+        self.assertEqual(resp.data['task_count'], 0)
+        self.assertEqual(resp.data['completion_percentage'], 0.0)
+        self.assertIsNone(resp.data['next_due_date'])
+
+    def test_archived_tasks_still_count(self):
+        url = reverse('project-detail', args=[self.busy.id])
+        before = self.client.get(url).data
+        self.assertEqual(archive_tasks(), 1)
+        after = self.client.get(url).data
+        for field in ('task_count', 'completed_count', 'overdue_count',
+                      'completion_percentage', 'next_due_date'):
+            self.assertEqual(after[field], before[field], field)
+
+    def test_list_is_a_single_query(self):
+        with self.assertNumQueries(1):
+            resp = self.client.get(reverse('project-list'))
+        self.assertEqual(len(resp.data), 2)
+
+    def test_order_and_filter_on_annotations(self):
+        url = reverse('project-list')
+        resp = self.client.get(url, {'ordering': '-overdue_count'})
+        self.assertEqual([p['name'] for p in resp.data], ['Busy', 'Empty'])
+
+        resp = self.client.get(url, {'overdue_count_min': 1})
+        self.assertEqual([p['name'] for p in resp.data], ['Busy'])
+
+    def test_create_returns_stats(self):
+        resp = self.client.post(reverse('project-list'),
+                                {'name': 'New', 'due_date': '2030-01-01'},
+                                format='json')
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(resp.data['task_count'], 0)
+
+
+class ProjectSharingTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice, cls.bob, cls.carol = (
+            User.objects.create_user(username=name, email=f'{name}@x.com', password='pass',
+                                     role='user')
+            for name in ('alice', 'bob', 'carol')
+        )
+        cls.project = Project.objects.create(name='Shared', due_date='2030-01-01',
+                                             owner=cls.alice)
+        cls.task = Task.objects.create(title='t', due_date='2030-01-01T00:00:00Z',
+                                       assigned_to=cls.alice, project=cls.project)
+
+    def share(self, user, role):
+        self.client.force_authenticate(user=self.alice)
+        resp = self.client.post(reverse('project-members', args=[self.project.pk]),
+                                {'user': user.pk, 'role': role}, format='json')
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        self.client.force_authenticate(user=user)
+
+    def access(self):
+        return dict(ProjectAccess.objects.filter(project=self.project)
+                    .values_list('user__username', 'permission'))
+
+    def test_access_table_follows_owner_and_memberships(self):
+        self.assertEqual(self.access(), {'alice': ProjectAccess.PERMISSION_MANAGE})
+        self.share(self.bob, ProjectMembership.ROLE_EDITOR)
+        self.assertEqual(self.access()['bob'], ProjectAccess.PERMISSION_EDIT)
+
+        membership = ProjectMembership.objects.get(user=self.bob)
+        membership.role = ProjectMembership.ROLE_VIEWER
+        membership.save()
+        self.assertEqual(self.access()['bob'], ProjectAccess.PERMISSION_VIEW)
+
+        project = Project.objects.get(pk=self.project.pk)
+        project.owner = self.carol
+        project.save()
+        self.assertEqual(self.access(), {'bob': ProjectAccess.PERMISSION_VIEW,
+                                         'carol': ProjectAccess.PERMISSION_MANAGE})
+        membership.delete()
+        self.assertEqual(self.access(), {'carol': ProjectAccess.PERMISSION_MANAGE})
+
+    def test_viewers_read_and_editors_write(self):
+        task_url = reverse('task-detail', args=[self.task.pk])
+        self.client.force_authenticate(user=self.bob)
+        self.assertEqual(self.client.get(task_url).status_code, status.HTTP_404_NOT_FOUND)
+
+        self.share(self.bob, ProjectMembership.ROLE_VIEWER)
+        self.assertEqual([p['id'] for p in self.client.get(reverse('project-list')).data],
+                         [self.project.pk])
+        self.assertEqual(self.client.get(task_url).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.patch(task_url, {'title': 'x'}, format='json').status_code,
+                         status.HTTP_403_FORBIDDEN)
+        resp = self.client.post(reverse('task-list'), {
+            'title': 'Mine', 'due_date': '2030-01-01T00:00:00Z', 'assigned_to': self.bob.pk,
+            'project': self.project.pk,
+        }, format='json')
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+        self.share(self.carol, ProjectMembership.ROLE_EDITOR)
+        # The write check reads the annotated permission, not another query;
+        # the third reads the task's attachments for the response
+        with self.assertNumQueries(3):
+            resp = self.client.patch(task_url, {'title': 'x'}, format='json')
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        resp = self.client.delete(reverse('project-detail', args=[self.project.pk]))
+        self.assertEqual(resp.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_managing_members(self):
+        self.share(self.bob, ProjectMembership.ROLE_EDITOR)
+        members_url = reverse('project-members', args=[self.project.pk])
+        resp = self.client.post(members_url, {'user': self.carol.pk}, format='json')
+        self.assertEqual(resp.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(user=self.alice)
+        resp = self.client.post(members_url, {'user': self.alice.pk}, format='json')
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        resp = self.client.post(members_url, {'user': self.bob.pk}, format='json')
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+        bob_url = reverse('project-member', args=[self.project.pk, self.bob.pk])
+        resp = self.client.patch(bob_url, {'role': ProjectMembership.ROLE_MANAGER},
+                                 format='json')
+        self.assertEqual(resp.data['role'], ProjectMembership.ROLE_MANAGER)
+        self.assertEqual([m['username'] for m in self.client.get(members_url).data], ['bob'])
+
+        # Members may leave on their own
+        self.client.force_authenticate(user=self.bob)
+        self.assertEqual(self.client.delete(bob_url).status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(self.access(), {'alice': ProjectAccess.PERMISSION_MANAGE})
@@ -1,12 +1,148 @@
-from rest_framework import viewsets, permissions
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import viewsets, permissions, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.generics import get_object_or_404
+from rest_framework.response import Response
+from rest_framework import filters
+from django_filters.rest_framework import DjangoFilterBackend
+from config.db_router import ReplicaReadMixin
+from config.idempotency import IdempotencyMixin
 from .models import Project
-from .serializers import ProjectSerializer
+from .filters import ProjectFilter
+from .permissions import HasProjectPermission
+from .serializers import ProjectMembershipSerializer, ProjectSerializer
+from jobs.models import Job
+from jobs.queue import enqueue
+from jobs.serializers import JobSerializer
+from tasks.dependencies import DependencyCycleError, project_schedule
+from tasks.metrics import chart
+from tasks.serializers import ChartParamsSerializer
 
-class ProjectViewSet(viewsets.ModelViewSet):
+class ProjectViewSet(IdempotencyMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     queryset = Project.objects.all()
     serializer_class = ProjectSerializer
-    permission_classes = [permissions.IsAuthenticated]
+    permission_classes = [permissions.IsAuthenticated, HasProjectPermission]
+
+    filter_backends = [
+        DjangoFilterBackend,
+        filters.OrderingFilter,
+        filters.SearchFilter,
+    ]
+    filterset_class = ProjectFilter
+
+    # Task aggregates are annotations, so they order in the same query
+    ordering_fields = [
+        'name', 'due_date', 'created_at', 'updated_at',
+        'task_count', 'completed_count', 'overdue_count',
+        'next_due_date', 'completion_percentage',
+    ]
+    search_fields = ['name', 'description']
+
+    def get_queryset(self):
+        # Only a repeated DELETE can still reach a project being deleted
+        queryset = Project.objects.visible_to(self.request.user,
+                                              include_deleting=self.action == 'destroy')
+        if self.request.method not in permissions.SAFE_METHODS:
+            # Lets HasProjectPermission decide writes without another query
+            queryset = queryset.with_permission(self.request.user)
+        return queryset.with_task_stats()
 
     def perform_create(self, serializer):
         serializer.save(owner=self.request.user)
+        self._reload_with_stats(serializer)
+
+    def perform_update(self, serializer):
+        serializer.save()
+        self._reload_with_stats(serializer)
+
+    def destroy(self, request, *args, **kwargs):
+        # Detaching a large project's tasks runs in a background job;
+        # poll /api/jobs/<id>/ for completion. The project is hidden at
+        # once, and repeating the DELETE returns the same job (or queues a
+        # new one if it failed or was cancelled).
+        project = self.get_object()
+        with transaction.atomic():
+            project = Project.objects.select_for_update().get(pk=project.pk)
+            job = project.deletion_job
+            if job is None or job.status in (Job.STATUS_FAILED, Job.STATUS_CANCELLED):
+                job = enqueue('projects.delete_project', {'project_id': project.pk},
+                              created_by=request.user)
+                Project.objects.filter(pk=project.pk).update(deleting_at=timezone.now(),
+                                                             deletion_job=job)
+        return Response(JobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
+    @action(detail=True, methods=['get'])
+    def schedule(self, request, pk=None):
+        """
+        Gantt data: every task's earliest start/finish, latest finish and
+        slack from its estimate and dependencies, plus the critical path.
+        Cached per project until a task or dependency changes.
+        """
+        project = self.get_object()
+        try:
+            schedule = project_schedule(project.pk)
+        except DependencyCycleError as exc:
+            raise ValidationError({'detail': str(exc)})
+        return Response({
+            'project': project.pk,
+            'critical_path': schedule['critical_path'],
+            'tasks': [dict(id=task_id, **schedule['tasks'][task_id])
+                      for task_id in schedule['order']],
+        })
+
+    @action(detail=True, methods=['get'])
+    def burndown(self, request, pk=None):
+        """Open tasks at the end of each period; ``?period=day|week|month&start=&end=``."""
+        return self._chart(request, 'burndown')
+
+    @action(detail=True, methods=['get'])
+    def burnup(self, request, pk=None):
+        """Total and completed tasks at the end of each period."""
+        return self._chart(request, 'burnup')
+
+    @action(detail=True, methods=['get'])
+    def velocity(self, request, pk=None):
+        """Tasks completed per period, with the average over finished periods."""
+        return self._chart(request, 'velocity')
+
+    @action(detail=True, methods=['get', 'post'])
+    def members(self, request, pk=None):
+        """
+        GET lists the users the project is shared with; POST
+        ``{"user", "role"}`` shares it with another user (managers only).
+        """
+        project = self.get_object()
+        if request.method == 'GET':
+            memberships = project.memberships.select_related('user').order_by('id')
+            return Response(ProjectMembershipSerializer(memberships, many=True).data)
+        serializer = ProjectMembershipSerializer(data=request.data, context={'project': project})
+        serializer.is_valid(raise_exception=True)
+        serializer.save(project=project)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @action(detail=True, methods=['patch', 'delete'], url_path=r'members/(?P<user_id>\d+)')
+    def member(self, request, pk=None, user_id=None):
+        """PATCH ``{"role"}`` changes a member's role; DELETE removes them."""
+        project = self.get_object()
+        membership = get_object_or_404(project.memberships.select_related('user'),
+                                       user_id=user_id)
+        if request.method == 'DELETE':
+            membership.delete()
+            return Response(status=status.HTTP_204_NO_CONTENT)
+        serializer = ProjectMembershipSerializer(membership, data=request.data, partial=True,
+                                                 context={'project': project})
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+        return Response(serializer.data)
+
+    def _chart(self, request, kind):
+        project = self.get_object()
+        params = ChartParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        return Response(chart(kind, ('project', project.pk), **params.validated_data))
 
+    def _reload_with_stats(self, serializer):
+        # Saved instances lack the aggregate annotations the serializer reads
+        serializer.instance = self.get_queryset().get(pk=serializer.instance.pk)
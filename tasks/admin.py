@@ -1,8 +1,13 @@
 from django.contrib import admin
+from config.admin_paging import LargeTableAdminMixin
 from .models import Task
 
 @admin.register(Task)
-class TaskAdmin(admin.ModelAdmin):
-    list_display  = ('title', 'assigned_to', 'due_date', 'priority', 'completed')
-    list_filter   = ('priority', 'completed', 'due_date')
-    search_fields = ('title', 'description', 'assigned_to__username')
+class TaskAdmin(LargeTableAdminMixin, admin.ModelAdmin):
+    list_display         = ('title', 'project', 'assigned_to', 'due_date', 'priority', 'completed')
+    list_select_related  = ('project', 'assigned_to')
+    list_filter          = ('priority', 'completed', 'due_date')
+    # Prefix matches, so both use the title/username indexes
+    search_fields        = ('^title', '^assigned_to__username')
+    autocomplete_fields  = ('assigned_to', 'project')
+    ordering             = ('due_date',)
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class TasksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tasks'
+
+    def ready(self):
+        # Connects the signals that keep cached schedules, charts and board
+        # order fresh, and remove deleted attachments' files
+        from . import attachments, dependencies, metrics, ranking  # noqa: F401
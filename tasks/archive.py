@@ -0,0 +1,98 @@
+import heapq
+from datetime import timedelta
+from functools import cmp_to_key
+
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from .models import ArchivedTask, Task, TaskAttachment
+
+DEFAULT_ARCHIVE_AFTER_DAYS = 90
+
+
+def archivable_tasks(older_than_days=DEFAULT_ARCHIVE_AFTER_DAYS):
+    """Completed tasks whose due date is further back than ``older_than_days``."""
+    cutoff = timezone.now() - timedelta(days=older_than_days)
+    # Series and their stored occurrences stay hot: expansion needs them.
+    # So do tasks with attachments, which deleting the hot row would take along
+    return Task.objects.filter(
+        completed=True, due_date__lt=cutoff,
+        recurrence=Task.RECURRENCE_NONE, recurrence_parent__isnull=True,
+    ).exclude(Exists(TaskAttachment.objects.filter(task=OuterRef('pk'))))
+
+
+def archive_tasks(older_than_days=DEFAULT_ARCHIVE_AFTER_DAYS, batch_size=1000,
+                  limit=None, stdout=None):
+    """
+    Move archivable tasks into ``ArchivedTask`` in primary-key order.
+
+    Every batch is copied and deleted in its own transaction, so the mover
+    can be stopped at any point and simply re-run to resume. Returns the
+    number of tasks moved.
+    """
+    moved = 0
+    last_id = 0
+    while limit is None or moved < limit:
+        size = batch_size if limit is None else min(batch_size, limit - moved)
+        with transaction.atomic():
+            rows = list(
+                archivable_tasks(older_than_days)
+                .filter(pk__gt=last_id)
+                .order_by('pk')
+                .values(*ArchivedTask.COPIED_FIELDS)[:size]
+            )
+            if not rows:
+                break
+            # ignore_conflicts keeps a replayed batch from failing on rows a
+            # previous, interrupted run already copied.
+            ArchivedTask.objects.bulk_create(
+                [ArchivedTask(**row) for row in rows], ignore_conflicts=True
+            )
+            Task.objects.filter(pk__in=[row['id'] for row in rows]).delete()
+        last_id = rows[-1]['id']
+        moved += len(rows)
+        if stdout is not None:
+            stdout.write(f'  archived {moved} tasks (up to id {last_id})')
+    return moved
+
+
+def ordering_key(ordering):
+    """
+    Build a sort key for model instances from an ORM ordering list.
+
+    ``None`` sorts first, matching unsaved (virtual) rows without a pk.
+    """
+    fields = [(f.lstrip('-'), f.startswith('-')) for f in ordering]
+
+    def compare(a, b):
+        for name, descending in fields:
+            x, y = getattr(a, name), getattr(b, name)
+            if x == y:
+                continue
+            if x is None or y is None:
+                result = -1 if x is None else 1
+            else:
+                result = -1 if x < y else 1
+            return -result if descending else result
+        return 0
+
+    return cmp_to_key(compare)
+
+
+def merge_ordered(sources, ordering):
+    """
+    Lazily merge iterables of tasks that are each sorted by ``ordering``.
+
+    Querysets are streamed with ``iterator()``, so exports over the full
+    history don't hold either table in memory.
+    """
+    ordering = list(ordering) + ['pk']
+    return heapq.merge(
+        *[
+            source.order_by(*ordering).iterator(chunk_size=1000)
+            if hasattr(source, 'order_by') else source
+            for source in sources
+        ],
+        key=ordering_key(ordering),
+    )
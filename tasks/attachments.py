@@ -0,0 +1,259 @@
+"""
+Resumable uploads and ranged downloads of task attachments.
+
+An attachment is created empty with its declared size, then filled by
+chunks sent as raw request bodies (``PATCH`` with an ``Upload-Offset``
+header, after the tus protocol). Each chunk is copied from the request
+stream to the file on disk BLOCK_SIZE bytes at a time and fsynced before
+``received`` moves on, so an interrupted upload resumes from the last
+stored byte and memory use doesn't depend on the chunk or file size. Once
+every byte has arrived the file's SHA-256 is computed from disk and checked
+against the one declared at creation, if any.
+
+Downloads are ``FileResponse``s over a length-limited view of the open
+file, so WSGI servers with ``wsgi.file_wrapper`` can ``sendfile`` a whole
+file or a single ``Range`` without copying it through Python.
+"""
+import base64
+import hashlib
+import os
+import re
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+from django.http import FileResponse, HttpResponse, HttpResponseNotModified
+from django.utils import timezone
+from django.utils.http import parse_etags
+
+from .models import TaskAttachment
+
+BLOCK_SIZE = 64 * 1024
+# Chunks of one attachment are written one at a time; a writer that dies
+# without releasing its lock holds the attachment for at most this long
+UPLOAD_LOCK_TIMEOUT = 15 * 60
+
+CHECKSUM_ALGORITHMS = ('md5', 'sha1', 'sha256', 'sha512')
+
+_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class UploadError(ValueError):
+    """A chunk that can't be stored; ``status`` is the HTTP status to answer with."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class RangeNotSatisfiable(ValueError):
+    pass
+
+
+def _lock_key(attachment_id):
+    return f'attachment-upload:{attachment_id}'
+
+
+def create_attachment(task, filename, size, content_type, sha256='', uploaded_by=None):
+    """Reserve an empty file for an attachment of ``size`` bytes and save it."""
+    attachment = TaskAttachment(task=task, uploaded_by=uploaded_by, filename=filename,
+                                content_type=content_type, size=size, sha256=sha256.lower())
+    attachment.file.save(filename, ContentFile(b''), save=False)
+    try:
+        attachment.save()
+    except Exception:
+        attachment.file.delete(save=False)
+        raise
+    if size == 0:
+        _finish(attachment)
+    return attachment
+
+
+def parse_checksum(header):
+    """``Upload-Checksum: <algorithm> <base64 digest>`` as (hash object, digest)."""
+    try:
+        algorithm, encoded = header.split()
+        digest = base64.b64decode(encoded, validate=True)
+    except ValueError:
+        algorithm = None
+    if algorithm is None or algorithm.lower() not in CHECKSUM_ALGORITHMS:
+        raise UploadError('Upload-Checksum must be "<algorithm> <base64 digest>", with one '
+                          f'of {", ".join(CHECKSUM_ALGORITHMS)}.')
+    return hashlib.new(algorithm.lower()), digest
+
+
+def write_chunk(attachment, offset, stream, length, checksum=None):
+    """
+    Store ``length`` bytes read from ``stream`` at ``offset``, which must be
+    the attachment's current ``received``. Bytes that arrived before the
+    client went away are kept, unless ``checksum`` (from ``parse_checksum``)
+    was given, in which case the chunk is stored whole or not at all.
+    Completes the attachment when its last byte is stored.
+    """
+    if attachment.is_complete:
+        raise UploadError('The upload is already complete.', 409)
+    if offset + length > attachment.size:
+        raise UploadError('The chunk runs past the declared size.', 413)
+    if not cache.add(_lock_key(attachment.pk), True, UPLOAD_LOCK_TIMEOUT):
+        raise UploadError('Another chunk of this upload is being written.', 409)
+    try:
+        attachment.refresh_from_db(fields=['received', 'status'])
+        if attachment.is_complete:
+            raise UploadError('The upload is already complete.', 409)
+        if offset != attachment.received:
+            raise UploadError(f'The upload continues at offset {attachment.received}.', 409)
+
+        written = 0
+        with open(attachment.file.path, 'r+b') as fh:
+            fh.seek(offset)
+            while written < length:
+                try:
+                    block = stream.read(min(BLOCK_SIZE, length - written))
+                except OSError:
+                    # The client disconnected; keep what made it to disk
+                    break
+                if not block:
+                    break
+                fh.write(block)
+                if checksum is not None:
+                    checksum[0].update(block)
+                written += len(block)
+            rejected = checksum is not None and (written != length
+                                                 or checksum[0].digest() != checksum[1])
+            if rejected:
+                written = 0
+            # Drop anything past the stored bytes, e.g. from a rejected chunk
+            fh.truncate(offset + written)
+            fh.flush()
+            os.fsync(fh.fileno())
+
+        if written:
+            TaskAttachment.objects.filter(pk=attachment.pk).update(received=offset + written)
+            attachment.received = offset + written
+        if rejected:
+            raise UploadError('The chunk does not match its Upload-Checksum.')
+        if attachment.received == attachment.size:
+            _finish(attachment)
+    finally:
+        cache.delete(_lock_key(attachment.pk))
+    return attachment
+
+
+def file_sha256(path):
+    hasher = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        while block := fh.read(BLOCK_SIZE):
+            hasher.update(block)
+    return hasher.hexdigest()
+
+
+def _finish(attachment):
+    """Verify a fully received attachment and mark it complete."""
+    digest = file_sha256(attachment.file.path)
+    if attachment.sha256 and digest != attachment.sha256:
+        # Can't tell which chunk went wrong, so the upload starts over
+        with open(attachment.file.path, 'r+b') as fh:
+            fh.truncate(0)
+        TaskAttachment.objects.filter(pk=attachment.pk).update(received=0)
+        attachment.received = 0
+        raise UploadError('The uploaded file does not match its declared SHA-256; '
+                          'upload it again from offset 0.')
+    attachment.sha256 = digest
+    attachment.status = TaskAttachment.STATUS_COMPLETE
+    attachment.completed_at = timezone.now()
+    attachment.save(update_fields=['sha256', 'status', 'completed_at'])
+
+
+def parse_range(header, size):
+    """
+    The inclusive ``(start, end)`` of a single-range ``Range`` header, or
+    None to send the whole file: malformed headers and multiple ranges are
+    ignored, as RFC 9110 allows.
+    """
+    match = _RANGE.match(header.strip())
+    if not match or match.group(1) == match.group(2) == '':
+        return None
+    first, last = match.groups()
+    if first == '':
+        # A suffix: the last ``last`` bytes
+        if int(last) == 0 or size == 0:
+            raise RangeNotSatisfiable
+        return max(0, size - int(last)), size - 1
+    start = int(first)
+    if last != '' and int(last) < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable
+    return start, size - 1 if last == '' else min(int(last), size - 1)
+
+
+class FileRange:
+    """
+    At most ``length`` bytes of an open file, from its current position.
+
+    ``fileno`` is passed through: servers that ``sendfile`` from
+    ``wsgi.file_wrapper`` start at the file's position and stop at the
+    response's Content-Length, which is set to ``length``.
+    """
+
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size is None or size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size) if size else b''
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def serve(request, attachment):
+    """The attachment's content, or the single byte range the request asks for."""
+    etag = f'"{attachment.sha256}"'
+    if_none_match = parse_etags(request.headers.get('If-None-Match', ''))
+    if etag in if_none_match or '*' in if_none_match:
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+
+    size, byte_range = attachment.size, None
+    # A stale If-Range gets the whole (new) file instead of a piece
+    if 'Range' in request.headers and request.headers.get('If-Range', etag) == etag:
+        try:
+            byte_range = parse_range(request.headers['Range'], size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+    start, end = byte_range or (0, size - 1)
+
+    fh = open(attachment.file.path, 'rb')
+    fh.seek(start)
+    response = FileResponse(FileRange(fh, end - start + 1), as_attachment=True,
+                            filename=attachment.filename, content_type=attachment.content_type)
+    response.block_size = BLOCK_SIZE
+    response['Content-Length'] = end - start + 1
+    if byte_range is not None:
+        response.status_code = 206
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private'
+    return response
+
+
+@receiver(post_delete, sender=TaskAttachment)
+def attachment_deleted(sender, instance, **kwargs):
+    # Only once the row is gone for good; a rolled back delete keeps its file
+    name, storage = instance.file.name, instance.file.storage
+    if name:
+        transaction.on_commit(lambda: storage.delete(name))
@@ -0,0 +1,303 @@
+import json
+import math
+import platform
+import random
+import statistics
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection, reset_queries
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from projects.access import rebuild_access
+from projects.models import Project
+from users.throttling import local_buckets
+from .models import Task
+
+User = get_user_model()
+
+BENCH_USER_PREFIX = 'bench_user_'
+BENCH_PASSWORD = 'bench-pass-123'
+
+# Skewed distributions: most tasks are medium/low, most past-due tasks are done.
+PRIORITY_WEIGHTS = [
+    (Task.PRIORITY_LOW,    0.45),
+    (Task.PRIORITY_MEDIUM, 0.40),
+    (Task.PRIORITY_HIGH,   0.15),
+]
+PROJECT_STATUSES = ['pending', 'in-progress', 'completed', 'archived']
+OPEN_STATUSES = [Task.STATUS_TODO, Task.STATUS_IN_PROGRESS, Task.STATUS_REVIEW]
+PROJECT_PRIORITIES = ['low', 'medium', 'high', 'urgent']
+TITLE_WORDS = [
+    'review', 'deploy', 'design', 'refactor', 'fix', 'document', 'test',
+    'migrate', 'plan', 'release', 'invoice', 'report', 'sync', 'audit',
+]
+
+
+def generate_dataset(users=10, projects_per_user=3, tasks_per_project=50,
+                     seed=0, batch_size=1000, stdout=None):
+    """
+    Bulk-insert a realistic dataset of benchmark users, projects and tasks.
+
+    Returns a dict with the number of rows created per model.
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+    password = make_password(BENCH_PASSWORD)
+
+    start = User.objects.filter(username__startswith=BENCH_USER_PREFIX).count()
+    new_users = [
+        User(
+            username=f'{BENCH_USER_PREFIX}{start + i:06d}',
+            email=f'{BENCH_USER_PREFIX}{start + i:06d}@example.com',
+            password=password,
+            role='admin' if i == 0 and start == 0 else 'user',
+        )
+        for i in range(users)
+    ]
+    User.objects.bulk_create(new_users, batch_size=batch_size)
+    created_users = list(
+        User.objects.filter(username__in=[u.username for u in new_users])
+        .order_by('id')
+    )
+
+    new_projects = [
+        Project(
+            name=f'{rng.choice(TITLE_WORDS).title()} project {owner.id}-{n}',
+            due_date=(now + timedelta(days=rng.randint(-90, 180))).date(),
+            status=rng.choice(PROJECT_STATUSES),
+            priority=rng.choice(PROJECT_PRIORITIES),
+            owner=owner,
+        )
+        for owner in created_users
+        for n in range(projects_per_user)
+    ]
+    Project.objects.bulk_create(new_projects, batch_size=batch_size)
+    created_projects = list(
+        Project.objects.filter(owner__in=created_users).select_related('owner')
+    )
+    # bulk_create() skips the signals that grant owners access
+    rebuild_access([project.pk for project in created_projects])
+
+    priorities, weights = zip(*PRIORITY_WEIGHTS)
+    task_count = 0
+    batch = []
+    # Tasks arrive interleaved across projects, as they do in real use, so
+    # the heap isn't ordered by project
+    for n in range(tasks_per_project):
+        for project in created_projects:
+            # Due dates cluster around "now", with a longer tail into the past.
+            offset = rng.triangular(-365, 90, 7)
+            due_date = now + timedelta(days=offset, hours=rng.randint(0, 23))
+            done_probability = 0.85 if offset < 0 else 0.1
+            # Most tasks belong to the project owner, some to other users.
+            assignee = (
+                project.owner if rng.random() < 0.8
+                else rng.choice(created_users)
+            )
+            batch.append(Task(
+                project=project,
+                title=f'{rng.choice(TITLE_WORDS).title()} {rng.choice(TITLE_WORDS)} #{n}',
+                description=' '.join(rng.choices(TITLE_WORDS, k=rng.randint(0, 12))),
+                due_date=due_date,
+                priority=rng.choices(priorities, weights)[0],
+                assigned_to=assignee,
+                completed=rng.random() < done_probability,
+            ))
+            # bulk_create() skips the signals that set these; creation order
+            # doubles as board order, one RANK_STEP apart within the project
+            batch[-1].rank = n + 1
+            if batch[-1].completed:
+                batch[-1].completed_at = min(due_date, now)
+                batch[-1].status = Task.STATUS_COMPLETED
+            else:
+                batch[-1].status = rng.choice(OPEN_STATUSES)
+            if len(batch) >= batch_size:
+                Task.objects.bulk_create(batch, batch_size=batch_size)
+                task_count += len(batch)
+                batch = []
+                if stdout is not None:
+                    stdout.write(f'  {task_count} tasks...')
+    if batch:
+        Task.objects.bulk_create(batch, batch_size=batch_size)
+        task_count += len(batch)
+
+    return {
+        'users': len(created_users),
+        'projects': len(created_projects),
+        'tasks': task_count,
+    }
+
+
+def generate_history(user, count, seed=0, batch_size=1000):
+    """
+    Bulk-insert ``count`` completed tasks for ``user`` that are long past due,
+    i.e. exactly the rows the archiver moves out of the hot table.
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+    project = Project.objects.filter(owner=user).first()
+    tasks = []
+    for n in range(count):
+        title = f'{rng.choice(TITLE_WORDS).title()} history #{n}'
+        due_date = now - timedelta(days=rng.randint(120, 3 * 365))
+        tasks.append(Task(
+            project=project,
+            title=title,
+            due_date=due_date,
+            priority=rng.choices(*zip(*PRIORITY_WEIGHTS))[0],
+            assigned_to=user,
+            completed=True,
+            completed_at=due_date,
+            status=Task.STATUS_COMPLETED,
+        ))
+    Task.objects.bulk_create(tasks, batch_size=batch_size)
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not values:
+        return None
+    rank = math.ceil(pct / 100 * len(values))
+    return values[max(0, min(len(values), rank) - 1)]
+
+
+def default_scenarios(username, password):
+    """The endpoints exercised by a benchmark run, as (name, method, path, data)."""
+    tasks_url = '/api/tasks/'
+    scenarios = [
+        ('login', 'post', '/api/auth/login/', {'username': username, 'password': password}),
+        ('token_refresh', 'post', '/api/auth/token/refresh/', None),
+        ('task_list', 'get', tasks_url, {}),
+        ('task_filter_priority', 'get', tasks_url, {'priority': Task.PRIORITY_HIGH}),
+        ('task_filter_completed', 'get', tasks_url, {'completed': 'false'}),
+        ('task_filter_due_before', 'get', tasks_url, {'due_date__lt': timezone.now().isoformat()}),
+        ('task_filter_due_after', 'get', tasks_url, {'due_date__gt': timezone.now().isoformat()}),
+        ('task_filter_assignee', 'get', tasks_url, {'assigned_to__username': username}),
+        ('task_filter_assignee_icontains', 'get', tasks_url, {'assigned_to__username__icontains': username[-3:]}),
+        ('task_filter_project', 'get', tasks_url, None),
+        ('task_board_column', 'get', tasks_url, None),
+        ('task_search', 'get', tasks_url, {'search': 'deploy'}),
+        ('profile', 'get', '/api/auth/profile/', {}),
+        ('project_list', 'get', '/api/projects/', {}),
+    ]
+    for field in ('due_date', 'priority', 'created_at', 'updated_at'):
+        for prefix in ('', '-'):
+            name = f'task_order_{"desc_" if prefix else ""}{field}'
+            scenarios.append((name, 'get', tasks_url, {'ordering': f'{prefix}{field}'}))
+    return scenarios
+
+
+def measure(send, iterations=20, warmup=2):
+    """Call ``send()`` repeatedly and summarise latency, queries and status codes."""
+    timings, queries, statuses = [], [], {}
+    for i in range(warmup + iterations):
+        # Keep the bounded query log from wrapping around mid-request.
+        reset_queries()
+        with CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            response = send()
+            elapsed = (time.perf_counter() - started) * 1000
+        if i < warmup:
+            continue
+        timings.append(elapsed)
+        queries.append(len(ctx.captured_queries))
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    timings.sort()
+    return {
+        'iterations': iterations,
+        'p50_ms': round(percentile(timings, 50), 3),
+        'p95_ms': round(percentile(timings, 95), 3),
+        'p99_ms': round(percentile(timings, 99), 3),
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'queries_mean': round(statistics.fmean(queries), 2),
+        'queries_max': max(queries),
+        'status_codes': {str(code): count for code, count in statuses.items()},
+    }
+
+
+def run_benchmark(username, password, iterations=20, warmup=2, only=None,
+                  host='localhost'):
+    """
+    Drive the main API endpoints in-process and collect latency and query counts.
+
+    The login throttle is lifted for the run, so repeated logins are measured
+    rather than their 429s. Returns a dict of per-scenario statistics
+    suitable for dumping as JSON.
+    """
+    unthrottled = {scope: {kind: '1000000/s' for kind in budgets}
+                   for scope, budgets in settings.AUTH_THROTTLE_RATES.items()}
+    local_buckets.clear()
+    with override_settings(AUTH_THROTTLE_RATES=unthrottled):
+        return _run_scenarios(username, password, iterations, warmup, only, host)
+
+
+def _run_scenarios(username, password, iterations, warmup, only, host):
+    client = APIClient(HTTP_HOST=host)
+    login = client.post('/api/auth/login/',
+                        {'username': username, 'password': password},
+                        format='json')
+    if login.status_code != 200:
+        raise ValueError(f'Could not log in as {username!r}: {login.status_code}')
+    access, refresh = login.data['access'], login.data['refresh']
+    user = User.objects.get(username=username)
+    project = Project.objects.filter(owner=user).first()
+
+    results = {}
+    for name, method, path, data in default_scenarios(username, password):
+        if only and name not in only:
+            continue
+        if name == 'token_refresh':
+            data = {'refresh': refresh}
+        elif name == 'task_filter_project':
+            data = {'project': project.id if project else 0}
+        elif name == 'task_board_column':
+            data = {'project': project.id if project else 0, 'status': Task.STATUS_TODO,
+                    'ordering': 'rank'}
+
+        if method == 'post':
+            client.credentials()
+        else:
+            client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        if method == 'post':
+            stats = measure(lambda: client.post(path, data, format='json'), iterations, warmup)
+        else:
+            stats = measure(lambda: client.get(path, data), iterations, warmup)
+        results[name] = {'method': method.upper(), 'path': path, **stats}
+    return results
+
+
+def environment_info():
+    """Metadata stored next to results so runs are comparable."""
+    return {
+        'timestamp': timezone.now().isoformat(),
+        'python': platform.python_version(),
+        'database': connection.vendor,
+        'rows': {
+            'users': User.objects.count(),
+            'projects': Project.objects.count(),
+            'tasks': Task.objects.count(),
+        },
+    }
+
+
+def load_results(path):
+    with open(path) as fh:
+        return json.load(fh)
+
+
+def compare_results(baseline, current, metric='p95_ms'):
+    """Yield (scenario, before, after, change_pct) for scenarios present in both runs."""
+    before = baseline.get('results', {})
+    for name, stats in current.get('results', {}).items():
+        if name not in before:
+            continue
+        old, new = before[name][metric], stats[metric]
+        change = ((new - old) / old * 100) if old else 0.0
+        yield name, old, new, change
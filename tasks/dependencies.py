@@ -0,0 +1,246 @@
+import heapq
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from projects.models import Project
+from .models import Task, TaskDependency
+
+# Results are dropped when a project's edges, or its tasks' due dates or
+# estimates, change; the timeout only bounds how long an idle project's
+# schedule stays in memory.
+CACHE_TIMEOUT = 60 * 60
+
+
+class DependencyCycleError(ValueError):
+    pass
+
+
+def _order_key(project_id):
+    return f'task-order:{project_id}'
+
+
+def _schedule_key(project_id):
+    return f'task-schedule:{project_id}'
+
+
+def invalidate_schedule(project_id, keep_order=False):
+    """Forget the cached schedule (and topological order unless still valid)."""
+    if project_id is None:
+        return
+    keys = [_schedule_key(project_id)]
+    if not keep_order:
+        keys.append(_order_key(project_id))
+    cache.delete_many(keys)
+
+
+def _load_edges(project_id):
+    return list(TaskDependency.objects.filter(project_id=project_id)
+                .values_list('blocker_id', 'blocked_id'))
+
+
+def would_create_cycle(project_id, blocker_id, blocked_id):
+    """
+    True if adding ``blocker -> blocked`` would close a cycle, i.e. if
+    ``blocker`` can be reached from ``blocked`` over the stored edges. The
+    cached topological order isn't consulted: it may be another process's,
+    or stale.
+    """
+    if blocker_id == blocked_id:
+        return True
+    successors = defaultdict(list)
+    for a, b in _load_edges(project_id):
+        successors[a].append(b)
+    stack, seen = [blocked_id], {blocked_id}
+    while stack:
+        node = stack.pop()
+        if node == blocker_id:
+            return True
+        for nxt in successors[node]:
+            if nxt not in seen:
+                seen.add(nxt)
+                stack.append(nxt)
+    return False
+
+
+def add_dependency(blocker, blocked):
+    """
+    Create ``blocker -> blocked`` after checking both tasks and for cycles.
+
+    Edges of one project are added one at a time under a lock on the
+    project row, and checked against the stored edges: two concurrent
+    requests adding A -> B and B -> A would each pass a check that can't
+    see the other's edge.
+    """
+    if blocker.project_id is None or blocker.project_id != blocked.project_id:
+        raise ValueError('Both tasks must belong to the same project.')
+    with transaction.atomic():
+        Project.objects.select_for_update().only('pk').get(pk=blocker.project_id)
+        if would_create_cycle(blocker.project_id, blocker.pk, blocked.pk):
+            raise DependencyCycleError(f'Task {blocked.pk} already leads to task {blocker.pk}.')
+        return TaskDependency.objects.create(
+            project_id=blocker.project_id, blocker=blocker, blocked=blocked
+        )
+
+
+@receiver(post_save, sender=TaskDependency)
+def _dependency_saved(sender, instance, **kwargs):
+    # An edge going forward in the cached order leaves it valid; only the
+    # timings need recomputing.
+    order = cache.get(_order_key(instance.project_id)) or []
+    position = {task_id: i for i, task_id in enumerate(order)}
+    forward = position.get(instance.blocker_id, len(order)) < \
+        position.get(instance.blocked_id, -1)
+    invalidate_schedule(instance.project_id, keep_order=forward)
+
+
+@receiver(post_delete, sender=TaskDependency)
+def _dependency_deleted(sender, instance, **kwargs):
+    # Removing an edge never breaks a topological order
+    invalidate_schedule(instance.project_id, keep_order=True)
+
+
+@receiver(post_save, sender=Task)
+def _task_saved(sender, instance, created, **kwargs):
+    new = tuple(getattr(instance, f) for f in Task.SCHEDULE_FIELDS)
+    old = None if created else getattr(instance, '_loaded_schedule', None)
+    if old is None:
+        # New, or not loaded from the database so what changed is unknown
+        invalidate_schedule(instance.project_id)
+    elif old[0] != new[0]:
+        # Edges are within one project, so a task moving out takes its edges
+        # off the old project's schedule (their deletion invalidates it too)
+        invalidate_schedule(old[0])
+        invalidate_schedule(instance.project_id)
+        (TaskDependency.objects.filter(Q(blocker=instance) | Q(blocked=instance))
+         .exclude(project_id=instance.project_id).delete())
+    elif old != new:
+        # Timings move, but the edges and so the order stay as they were
+        invalidate_schedule(instance.project_id, keep_order=True)
+    instance._loaded_schedule = new
+
+
+@receiver(post_delete, sender=Task)
+def _task_deleted(sender, instance, **kwargs):
+    invalidate_schedule(instance.project_id)
+
+
+def topological_order(tasks, edges):
+    """Kahn's algorithm; ties are broken by due date so the order reads naturally."""
+    successors = defaultdict(list)
+    indegree = dict.fromkeys(tasks, 0)
+    for a, b in edges:
+        successors[a].append(b)
+        indegree[b] += 1
+    ready = [(tasks[t]['due_date'], t) for t, d in indegree.items() if d == 0]
+    heapq.heapify(ready)
+    order = []
+    while ready:
+        _, task_id = heapq.heappop(ready)
+        order.append(task_id)
+        for nxt in successors[task_id]:
+            indegree[nxt] -= 1
+            if indegree[nxt] == 0:
+                heapq.heappush(ready, (tasks[nxt]['due_date'], nxt))
+    if len(order) != len(tasks):
+        raise DependencyCycleError('Dependencies contain a cycle.')
+    return order
+
+
+def compute_schedule(tasks, edges, order=None):
+    """
+    Critical-path schedule for ``tasks`` ({id: {'due_date', 'estimate'}}).
+
+    The forward pass gives each task's earliest start/finish from its
+    estimate and its blockers; the backward pass gives its latest finish,
+    bounded by its own due date and by when its blocked tasks must start.
+    Slack is latest minus earliest finish (negative means the due date
+    can't be met). The critical path follows the least-slack chain of tasks
+    that start exactly when their blocker finishes.
+
+    Runs in O(tasks + edges).
+    """
+    if not tasks:
+        return {'order': [], 'critical_path': [], 'tasks': {}}
+    order = order or topological_order(tasks, edges)
+    predecessors, successors = defaultdict(list), defaultdict(list)
+    for a, b in edges:
+        predecessors[b].append(a)
+        successors[a].append(b)
+
+    # Time zero is when the first unblocked task has to start to be on time
+    origin = min(t['due_date'] - t['estimate']
+                 for k, t in tasks.items() if not predecessors[k])
+    estimate = {k: t['estimate'].total_seconds() for k, t in tasks.items()}
+    deadline = {k: (t['due_date'] - origin).total_seconds() for k, t in tasks.items()}
+
+    start, finish = {}, {}
+    for task_id in order:
+        start[task_id] = max((finish[p] for p in predecessors[task_id]), default=0.0)
+        finish[task_id] = start[task_id] + estimate[task_id]
+
+    latest = {}
+    for task_id in reversed(order):
+        latest[task_id] = min(
+            [deadline[task_id]] + [latest[s] - estimate[s] for s in successors[task_id]]
+        )
+    slack = {k: latest[k] - finish[k] for k in order}
+
+    least = min(slack.values())
+    on_path = {k for k, v in slack.items() if v == least}
+    path = []
+    for task_id in order:
+        if task_id not in on_path or any(
+            p in on_path and finish[p] == start[task_id] for p in predecessors[task_id]
+        ):
+            continue
+        chain = [task_id]
+        while True:
+            nxt = [s for s in successors[chain[-1]]
+                   if s in on_path and start[s] == finish[chain[-1]]]
+            if not nxt:
+                break
+            chain.append(min(nxt, key=lambda s: tasks[s]['due_date']))
+        if len(chain) > len(path):
+            path = chain
+
+    return {
+        'order': order,
+        'critical_path': path,
+        'tasks': {
+            task_id: {
+                'earliest_start': origin + timedelta(seconds=start[task_id]),
+                'earliest_finish': origin + timedelta(seconds=finish[task_id]),
+                'latest_finish': origin + timedelta(seconds=latest[task_id]),
+                'slack_hours': round(slack[task_id] / 3600, 2),
+            }
+            for task_id in order
+        },
+    }
+
+
+def project_schedule(project_id):
+    """The cached schedule for a project, recomputed only after a change."""
+    schedule = cache.get(_schedule_key(project_id))
+    if schedule is not None:
+        return schedule
+    tasks = {
+        pk: {'due_date': due_date, 'estimate': estimate}
+        for pk, due_date, estimate in Task.objects.filter(project_id=project_id)
+        .values_list('pk', 'due_date', 'estimate')
+    }
+    edges = [(a, b) for a, b in _load_edges(project_id) if a in tasks and b in tasks]
+    order = cache.get(_order_key(project_id))
+    if order is not None and set(order) != set(tasks):
+        order = None
+    schedule = compute_schedule(tasks, edges, order)
+    cache.set_many({
+        _schedule_key(project_id): schedule,
+        _order_key(project_id): schedule['order'],
+    }, CACHE_TIMEOUT)
+    return schedule
@@ -0,0 +1,26 @@
+from datetime import timedelta
+
+from jobs.registry import register
+from .ranking import rebalance_column
+from .scanner import DEFAULT_REMINDER_LEAD, scan_due_tasks
+
+
+@register('tasks.scan_due')
+def scan_due(job):
+    """Run one pass of the due-date scanner for the shard in the payload."""
+    lead = timedelta(hours=job.payload['lead_hours']) if 'lead_hours' in job.payload \
+        else DEFAULT_REMINDER_LEAD
+    result = scan_due_tasks(job.payload.get('shard', 0), job.payload.get('shards', 1), lead=lead)
+    return {
+        'since': result['since'].isoformat(),
+        'until': result['until'].isoformat(),
+        'reminders': result['reminders'],
+        'overdue': result['overdue'],
+    }
+
+
+@register('tasks.rebalance_ranks')
+def rebalance_ranks(job):
+    """Re-space the ranks of the board column in the payload."""
+    return {'tasks': rebalance_column(job.payload['project_id'], job.payload['assigned_to_id'],
+                                      job.payload['status'])}
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+
+from tasks.archive import DEFAULT_ARCHIVE_AFTER_DAYS, archive_tasks, archivable_tasks
+
+
+class Command(BaseCommand):
+    help = ('Move completed tasks past their due date into the archive table. '
+            'Safe to interrupt and re-run; each batch commits on its own.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int, default=DEFAULT_ARCHIVE_AFTER_DAYS,
+                            help='Archive completed tasks due more than this many days ago.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--limit', type=int,
+                            help='Stop after moving this many tasks.')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Only report how many tasks would be archived.')
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            count = archivable_tasks(options['older_than_days']).count()
+            self.stdout.write(f'{count} tasks would be archived.')
+            return
+
+        moved = archive_tasks(
+            older_than_days=options['older_than_days'],
+            batch_size=options['batch_size'],
+            limit=options['limit'],
+            stdout=self.stdout,
+        )
+        self.stdout.write(self.style.SUCCESS(f'Archived {moved} tasks.'))
@@ -0,0 +1,66 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.benchmarks import (
+    BENCH_PASSWORD, BENCH_USER_PREFIX, User,
+    compare_results, environment_info, load_results, run_benchmark,
+)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the main API endpoints and report p50/p95/p99 latency and queries per request.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username',
+                            help='User to benchmark as (defaults to the first seeded regular user).')
+        parser.add_argument('--password', default=BENCH_PASSWORD)
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--only', nargs='*', help='Only run these scenarios.')
+        parser.add_argument('--output', help='Write results as JSON to this file.')
+        parser.add_argument('--compare', help='Compare against a previous JSON result file.')
+
+    def handle(self, *args, **options):
+        username = options['username']
+        if not username:
+            user = (User.objects.filter(username__startswith=BENCH_USER_PREFIX, role='user')
+                    .order_by('id').first())
+            if user is None:
+                raise CommandError('No benchmark users found; run "manage.py seed_data" first.')
+            username = user.username
+
+        try:
+            results = run_benchmark(
+                username, options['password'],
+                iterations=options['iterations'],
+                warmup=options['warmup'],
+                only=options['only'],
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        report = {
+            'environment': environment_info(),
+            'username': username,
+            'results': results,
+        }
+
+        self.stdout.write(f'{"scenario":<36}{"p50":>9}{"p95":>9}{"p99":>9}{"queries":>9}  status')
+        for name, stats in results.items():
+            self.stdout.write(
+                f'{name:<36}{stats["p50_ms"]:>9.2f}{stats["p95_ms"]:>9.2f}'
+                f'{stats["p99_ms"]:>9.2f}{stats["queries_mean"]:>9.1f}  '
+                + ','.join(stats['status_codes'])
+            )
+
+        if options['compare']:
+            self.stdout.write('')
+            self.stdout.write(f'p95 compared to {options["compare"]}:')
+            for name, before, after, change in compare_results(load_results(options['compare']), report):
+                self.stdout.write(f'{name:<36}{before:>9.2f}{after:>9.2f}{change:>+9.1f}%')
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(report, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Results written to {options["output"]}'))
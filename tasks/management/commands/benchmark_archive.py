@@ -0,0 +1,68 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.archive import archive_tasks
+from tasks.benchmarks import (
+    BENCH_PASSWORD, BENCH_USER_PREFIX, User,
+    environment_info, generate_history, run_benchmark,
+)
+from tasks.models import ArchivedTask, Task
+
+SCENARIOS = ['task_list', 'task_filter_completed', 'task_search']
+
+
+class Command(BaseCommand):
+    help = ('Grow completed-task history step by step and compare hot-path '
+            'latency with the history in the hot table and after archiving it.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username',
+                            help='User to benchmark as (defaults to the first seeded regular user).')
+        parser.add_argument('--password', default=BENCH_PASSWORD)
+        parser.add_argument('--steps', type=int, default=4)
+        parser.add_argument('--history-per-step', type=int, default=2000)
+        parser.add_argument('--iterations', type=int, default=10)
+        parser.add_argument('--output', help='Write results as JSON to this file.')
+
+    def handle(self, *args, **options):
+        users = User.objects.filter(role='user')
+        if options['username']:
+            users = users.filter(username=options['username'])
+        else:
+            users = users.filter(username__startswith=BENCH_USER_PREFIX).order_by('id')
+        user = users.first()
+        if user is None:
+            raise CommandError('No benchmark user found; run "manage.py seed_data" first.')
+
+        def measure():
+            results = run_benchmark(user.username, options['password'],
+                                    iterations=options['iterations'], only=SCENARIOS)
+            return {name: stats['p95_ms'] for name, stats in results.items()}
+
+        steps = []
+        self.stdout.write(f'{"history":>9}  {"scenario":<24}{"unarchived p95":>16}{"archived p95":>14}')
+        for step in range(1, options['steps'] + 1):
+            generate_history(user, options['history_per_step'], seed=step)
+            unarchived = measure()
+            archive_tasks(older_than_days=30)
+            archived = measure()
+
+            history = ArchivedTask.objects.filter(assigned_to=user).count()
+            steps.append({
+                'history_rows': history,
+                'hot_rows': Task.objects.filter(assigned_to=user).count(),
+                'p95_ms_without_archive': unarchived,
+                'p95_ms_with_archive': archived,
+            })
+            for name in SCENARIOS:
+                self.stdout.write(
+                    f'{history:>9}  {name:<24}{unarchived[name]:>16.2f}{archived[name]:>14.2f}'
+                )
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump({'environment': environment_info(),
+                           'username': user.username,
+                           'steps': steps}, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Results written to {options["output"]}'))
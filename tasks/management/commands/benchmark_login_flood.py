@@ -0,0 +1,90 @@
+import json
+import random
+import threading
+
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+from rest_framework.test import APIClient
+
+from tasks.benchmarks import BENCH_USER_PREFIX, User, environment_info, measure
+from users.throttling import local_buckets
+
+# Limits high enough that neither the throttle nor the hashing cap ever kicks in
+UNPROTECTED = {
+    'AUTH_THROTTLE_RATES': {'login': {'ip': '1000000/s', 'username': '1000000/s'}},
+    'AUTH_MAX_CONCURRENT_HASHES': 1000,
+}
+
+
+class Command(BaseCommand):
+    help = ('Measure task-list latency while other threads flood /api/auth/login/ '
+            'with bad credentials, with and without the login protection.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--attackers', type=int, default=8)
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--spoof', action='store_true',
+                            help='Send each attempt from a new address and username, '
+                                 'so only the hashing cap can help.')
+        parser.add_argument('--output', help='Write results as JSON to this file.')
+
+    def handle(self, *args, **options):
+        user, _ = User.objects.get_or_create(
+            username=f'{BENCH_USER_PREFIX}flood',
+            defaults={'email': f'{BENCH_USER_PREFIX}flood@example.com'},
+        )
+        client = APIClient(HTTP_HOST='localhost')
+        client.force_authenticate(user=user)
+
+        def send():
+            return client.get('/api/tasks/')
+
+        results = {'baseline': {'api': measure(send, options['iterations'])}}
+        with override_settings(**UNPROTECTED):
+            results['flood_unprotected'] = self.flood(send, options)
+        local_buckets.clear()
+        results['flood_protected'] = self.flood(send, options)
+
+        self.stdout.write(f'{"phase":<20}{"p50":>9}{"p95":>9}{"p99":>9}  login statuses')
+        for phase, stats in results.items():
+            api = stats['api']
+            self.stdout.write(f'{phase:<20}{api["p50_ms"]:>9.2f}{api["p95_ms"]:>9.2f}'
+                              f'{api["p99_ms"]:>9.2f}  {stats.get("logins", "")}')
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump({'environment': environment_info(), 'options': {
+                    k: options[k] for k in ('attackers', 'iterations', 'spoof')
+                }, 'results': results}, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Results written to {options["output"]}'))
+
+    def flood(self, send, options):
+        stop = threading.Event()
+        statuses, lock = {}, threading.Lock()
+
+        def attack(n):
+            rng = random.Random(n)
+            attacker = APIClient(HTTP_HOST='localhost', REMOTE_ADDR=f'10.0.{n}.1')
+            while not stop.is_set():
+                extra = {}
+                username = f'{BENCH_USER_PREFIX}flood'
+                if options['spoof']:
+                    extra['REMOTE_ADDR'] = f'10.{rng.randint(1, 250)}.{rng.randint(1, 250)}.{n}'
+                    username = f'guess{rng.randint(0, 10**9)}'
+                code = attacker.post('/api/auth/login/',
+                                     {'username': username, 'password': 'wrong'},
+                                     format='json', **extra).status_code
+                with lock:
+                    statuses[code] = statuses.get(code, 0) + 1
+
+        threads = [threading.Thread(target=attack, args=(n,), daemon=True)
+                   for n in range(options['attackers'])]
+        for thread in threads:
+            thread.start()
+        try:
+            api = measure(send, options['iterations'])
+        finally:
+            stop.set()
+            for thread in threads:
+                thread.join()
+        return {'api': api, 'logins': {str(k): v for k, v in sorted(statuses.items())}}
@@ -0,0 +1,167 @@
+import json
+import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from projects.access import rebuild_access
+from projects.models import Project, ProjectAccess, ProjectMembership
+from tasks import typeahead
+from tasks.benchmarks import BENCH_USER_PREFIX, TITLE_WORDS, User, environment_info, measure
+from tasks.models import Task
+
+ROLES = [ProjectMembership.ROLE_VIEWER, ProjectMembership.ROLE_EDITOR,
+         ProjectMembership.ROLE_MANAGER]
+
+
+class _Counted:
+    """Stands in for a response when timing a bare query with ``measure``."""
+    status_code = 200
+
+    def __init__(self, rows):
+        self.rows = rows
+
+
+class Command(BaseCommand):
+    help = ('Time visibility and write checks for users who belong to thousands of '
+            'shared projects, plus the cost of keeping the access table current.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--projects', type=int, default=20000)
+        parser.add_argument('--members', type=int, default=20,
+                            help='Users sharing the projects.')
+        parser.add_argument('--memberships', type=int, default=5000,
+                            help='Projects each member belongs to.')
+        parser.add_argument('--tasks-per-project', type=int, default=5)
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help='Write results as JSON to this file.')
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        owner, members = self.seed(rng, options)
+        member = members[0]
+        levels = dict(ProjectAccess.objects.filter(user=member)
+                      .values_list('project_id', 'permission'))
+        self.stdout.write(f'{Project.objects.count()} projects, {Task.objects.count()} tasks, '
+                          f'{ProjectAccess.objects.count()} access rows; {member.username} '
+                          f'can see {len(levels)} projects ({connection.vendor})')
+
+        editable = Task.objects.filter(
+            project__access__user=member,
+            project__access__permission__gte=ProjectAccess.PERMISSION_EDIT,
+        ).exclude(assigned_to=member).first()
+        read_only = Task.objects.filter(
+            project__access__user=member, project__access__permission=ProjectAccess.PERMISSION_VIEW,
+        ).exclude(assigned_to=member).first()
+        outsider = Project.objects.exclude(pk__in=levels).first()
+
+        client = APIClient(HTTP_HOST='localhost')
+        client.force_authenticate(user=member)
+
+        def users_typeahead():
+            typeahead.cache.clear()
+            return client.get('/api/typeahead/', {'q': BENCH_USER_PREFIX[:4], 'types': 'user'})
+
+        def counted(queryset):
+            # The visibility query alone, without serializing thousands of rows
+            return lambda: _Counted(queryset.count())
+
+        scenarios = {
+            'visible_projects_count': counted(Project.objects.visible_to(member)),
+            'visible_tasks_count': counted(Task.objects.visible_to(member)),
+            'project_list': lambda: client.get('/api/projects/'),
+            'project_detail': lambda: client.get(f'/api/projects/{editable.project_id}/'),
+            'project_not_shared': lambda: client.get(f'/api/projects/{outsider.pk}/'),
+            'task_filter_project': lambda: client.get('/api/tasks/',
+                                                      {'project': editable.project_id}),
+            'task_update_editor': lambda: client.patch(f'/api/tasks/{editable.pk}/',
+                                                       {'priority': Task.PRIORITY_HIGH},
+                                                       format='json'),
+            'task_update_viewer': lambda: client.patch(f'/api/tasks/{read_only.pk}/',
+                                                       {'priority': Task.PRIORITY_HIGH},
+                                                       format='json'),
+            'typeahead_users': users_typeahead,
+        }
+        results = {name: measure(send, options['iterations'])
+                   for name, send in scenarios.items()}
+        results['membership_add_remove'] = measure(
+            lambda: self.add_and_remove(client, owner, outsider, members[-1], member),
+            options['iterations'],
+        )
+
+        self.stdout.write(f'{"scenario":<26}{"p50":>9}{"p95":>9}{"queries":>9}  status')
+        for name, stats in results.items():
+            self.stdout.write(f'{name:<26}{stats["p50_ms"]:>9.2f}{stats["p95_ms"]:>9.2f}'
+                              f'{stats["queries_mean"]:>9.1f}  '
+                              + ','.join(stats['status_codes']))
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump({'environment': environment_info(),
+                           'member_projects': len(levels),
+                           'access_rows': ProjectAccess.objects.count(),
+                           'results': results}, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Results written to {options["output"]}'))
+
+    def add_and_remove(self, client, owner, project, user, member):
+        """Share ``project`` with ``user`` and take it back, as its owner."""
+        client.force_authenticate(user=owner)
+        try:
+            client.post(f'/api/projects/{project.pk}/members/',
+                        {'user': user.pk, 'role': ProjectMembership.ROLE_EDITOR}, format='json')
+            return client.delete(f'/api/projects/{project.pk}/members/{user.pk}/')
+        finally:
+            client.force_authenticate(user=member)
+
+    def seed(self, rng, options, batch_size=5000):
+        owner, _ = User.objects.get_or_create(
+            username=f'{BENCH_USER_PREFIX}share_owner',
+            defaults={'email': f'{BENCH_USER_PREFIX}share_owner@example.com'},
+        )
+        members = []
+        for n in range(options['members']):
+            user, _ = User.objects.get_or_create(
+                username=f'{BENCH_USER_PREFIX}share_{n:04d}',
+                defaults={'email': f'{BENCH_USER_PREFIX}share_{n:04d}@example.com'},
+            )
+            members.append(user)
+
+        missing = options['projects'] - Project.objects.filter(owner=owner).count()
+        if missing > 0:
+            self.stdout.write(f'Seeding {missing} projects...')
+            now = timezone.now()
+            for start in range(0, missing, batch_size):
+                projects = Project.objects.bulk_create([
+                    Project(name=f'{rng.choice(TITLE_WORDS).title()} shared {n}', owner=owner,
+                            due_date=(now + timedelta(days=rng.randint(-30, 180))).date())
+                    for n in range(start, min(start + batch_size, missing))
+                ])
+                Task.objects.bulk_create([
+                    Task(title=f'{rng.choice(TITLE_WORDS).title()} {rng.choice(TITLE_WORDS)}',
+                         project=project, assigned_to=owner,
+                         due_date=now + timedelta(days=rng.randint(-30, 60)))
+                    for project in projects
+                    for _ in range(options['tasks_per_project'])
+                ], batch_size=batch_size)
+
+            project_ids = list(Project.objects.filter(owner=owner).values_list('pk', flat=True))
+            ProjectMembership.objects.filter(project__owner=owner).delete()
+            per_member = min(options['memberships'], len(project_ids))
+            ProjectMembership.objects.bulk_create([
+                ProjectMembership(project_id=project_id, user=user, role=rng.choice(ROLES))
+                for user in members
+                for project_id in rng.sample(project_ids, per_member)
+            ], batch_size=batch_size)
+            # bulk_create() skips the signals that maintain the access table
+            began = time.perf_counter()
+            rows = rebuild_access(project_ids)
+            self.stdout.write(f'Rebuilt {rows} access rows in '
+                              f'{time.perf_counter() - began:.1f} s')
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+        return owner, members
@@ -0,0 +1,75 @@
+import json
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from tasks.benchmarks import BENCH_USER_PREFIX, User, environment_info, measure
+from tasks.models import Task
+from tasks.recurrence import occurrence_dates
+
+RECURRENCES = [Task.RECURRENCE_WEEKLY, Task.RECURRENCE_WEEKLY, Task.RECURRENCE_MONTHLY]
+
+
+class Command(BaseCommand):
+    help = ('Compare calendar queries for a user with recurring series against '
+            'a user with the same occurrences stored as plain tasks.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--series', type=int, default=1000)
+        parser.add_argument('--iterations', type=int, default=5)
+        parser.add_argument('--output', help='Write results as JSON to this file.')
+
+    def handle(self, *args, **options):
+        now = timezone.now().replace(microsecond=0)
+        year_start, year_end = now - timedelta(days=182), now + timedelta(days=183)
+
+        recurring = self.fresh_user(f'{BENCH_USER_PREFIX}recurring')
+        plain = self.fresh_user(f'{BENCH_USER_PREFIX}plain')
+
+        series = Task.objects.bulk_create([
+            Task(title=f'Chore {n}', due_date=year_start + timedelta(hours=n),
+                 assigned_to=recurring, recurrence=RECURRENCES[n % len(RECURRENCES)])
+            for n in range(options['series'])
+        ])
+        # The same occurrences pre-created as rows, the way they used to be stored
+        rows = [
+            Task(title=s.title, due_date=when, assigned_to=plain)
+            for s in series
+            for when in occurrence_dates(s, year_start, year_end)
+        ]
+        Task.objects.bulk_create(rows, batch_size=2000)
+        self.stdout.write(f'{len(series)} series vs {len(rows)} plain tasks')
+
+        windows = {
+            'week': (now, now + timedelta(days=7)),
+            'month': (now, now + timedelta(days=30)),
+            'year': (year_start, year_end),
+        }
+        results = {}
+        self.stdout.write(f'{"window":<8}{"user":<12}{"p50":>10}{"p95":>10}{"queries":>9}')
+        for window, (start, end) in windows.items():
+            for label, user in (('recurring', recurring), ('plain', plain)):
+                client = APIClient(HTTP_HOST='localhost')
+                client.force_authenticate(user=user)
+                params = {'start': start.isoformat(), 'end': end.isoformat()}
+                stats = measure(lambda: client.get('/api/tasks/', params),
+                                iterations=options['iterations'], warmup=1)
+                results[f'{window}_{label}'] = stats
+                self.stdout.write(f'{window:<8}{label:<12}{stats["p50_ms"]:>10.2f}'
+                                  f'{stats["p95_ms"]:>10.2f}{stats["queries_mean"]:>9.1f}')
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump({'environment': environment_info(),
+                           'series': len(series), 'plain_rows': len(rows),
+                           'results': results}, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Results written to {options["output"]}'))
+
+    def fresh_user(self, username):
+        user, _ = User.objects.get_or_create(
+            username=username, defaults={'email': f'{username}@example.com'}
+        )
+        user.tasks.all().delete()
+        return user
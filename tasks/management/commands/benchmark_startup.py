@@ -0,0 +1,79 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.benchmarks import environment_info
+
+
+class Command(BaseCommand):
+    help = ('Measure cold start of config.wsgi and config.asgi under each settings '
+            'profile: import time, per-app ready() time and first response.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--settings-modules', nargs='+',
+                            default=['config.settings', 'config.settings_api'])
+        parser.add_argument('--entries', nargs='+', default=['wsgi', 'asgi'],
+                            choices=['wsgi', 'asgi'])
+        parser.add_argument('--runs', type=int, default=5)
+        parser.add_argument('--path', default='/api/tasks/',
+                            help='Request served as the first response.')
+        parser.add_argument('--output', help='Write results as JSON to this file.')
+
+    def handle(self, *args, **options):
+        results = {}
+        self.stdout.write(f'{"profile":<22}{"entry":<6}{"process":>10}{"import":>10}'
+                          f'{"first req":>11}{"modules":>9}')
+        for module in options['settings_modules']:
+            for entry in options['entries']:
+                runs = [self.cold_start(module, entry, options['path'])
+                        for _ in range(options['runs'])]
+                summary = self.summarise(runs)
+                results[f'{module}:{entry}'] = summary
+                self.stdout.write(
+                    f'{module:<22}{entry:<6}{summary["process_ms"]:>10.1f}'
+                    f'{summary["import_ms"]:>10.1f}{summary["first_response_ms"]:>11.1f}'
+                    f'{summary["modules"]:>9}'
+                )
+                slowest = sorted(summary['ready_ms'].items(), key=lambda item: -item[1])[:3]
+                self.stdout.write('    slowest ready(): ' + ', '.join(
+                    f'{label} {ms:.1f}ms' for label, ms in slowest))
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump({'environment': environment_info(), 'runs': options['runs'],
+                           'results': results}, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Results written to {options["output"]}'))
+
+    def cold_start(self, module, entry, path):
+        """Start a fresh interpreter and return its measurements (medians are taken later)."""
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=module)
+        began = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, '-m', 'config.startup', entry, path],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        elapsed = (time.perf_counter() - began) * 1000
+        if proc.returncode:
+            raise CommandError(f'{module} {entry} failed:\n{proc.stderr}')
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        result['process_ms'] = elapsed
+        return result
+
+    def summarise(self, runs):
+        median = lambda key: statistics.median(run[key] for run in runs)  # noqa: E731
+        labels = runs[0]['ready_ms']
+        return {
+            'process_ms': median('process_ms'),
+            'import_ms': median('import_ms'),
+            'first_response_ms': median('first_response_ms'),
+            'ready_ms': {label: statistics.median(run['ready_ms'][label] for run in runs)
+                         for label in labels},
+            'status': runs[0]['status'],
+            'modules': runs[0]['modules'],
+        }
@@ -0,0 +1,66 @@
+import json
+import random
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from tasks import typeahead
+from tasks.benchmarks import BENCH_USER_PREFIX, TITLE_WORDS, User, environment_info, measure
+from tasks.models import Task
+
+PREFIXES = ['re', 'dep', 'refa', 'audit 12', 'zzz']
+
+
+class Command(BaseCommand):
+    help = 'Time /api/typeahead/ against a large task table, with and without the LRU cache.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=1_000_000)
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', help='Write results as JSON to this file.')
+
+    def handle(self, *args, **options):
+        user, _ = User.objects.get_or_create(
+            username=f'{BENCH_USER_PREFIX}typeahead', defaults={'role': 'admin'},
+        )
+        existing = Task.objects.count()
+        if existing < options['tasks']:
+            self.seed(user, options['tasks'] - existing, options['seed'])
+        self.stdout.write(f'{Task.objects.count()} tasks ({connection.vendor})')
+
+        client = APIClient(HTTP_HOST='localhost')
+        client.force_authenticate(user=user)
+        results = {}
+        self.stdout.write(f'{"q":<12}{"cold p50":>10}{"cold p95":>10}{"cached p50":>12}')
+        for q in PREFIXES:
+            def cold():
+                typeahead.cache.clear()
+                return client.get('/api/typeahead/', {'q': q})
+
+            def warm():
+                return client.get('/api/typeahead/', {'q': q})
+
+            results[q] = {'cold': measure(cold, options['iterations']),
+                          'cached': measure(warm, options['iterations'])}
+            self.stdout.write(f'{q:<12}{results[q]["cold"]["p50_ms"]:>10.2f}'
+                              f'{results[q]["cold"]["p95_ms"]:>10.2f}'
+                              f'{results[q]["cached"]["p50_ms"]:>12.2f}')
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump({'environment': environment_info(),
+                           'tasks': Task.objects.count(), 'results': results}, fh, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Results written to {options["output"]}'))
+
+    def seed(self, user, count, seed, batch_size=5000):
+        rng = random.Random(seed)
+        now = timezone.now()
+        for start in range(0, count, batch_size):
+            Task.objects.bulk_create([
+                Task(title=f'{rng.choice(TITLE_WORDS)} {rng.choice(TITLE_WORDS)} {n}',
+                     due_date=now, assigned_to=user)
+                for n in range(start, min(start + batch_size, count))
+            ])
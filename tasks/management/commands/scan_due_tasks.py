@@ -0,0 +1,35 @@
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.scanner import scan_due_tasks
+
+
+class Command(BaseCommand):
+    help = ('Create due-date reminders and flag overdue tasks that crossed a '
+            'threshold since the last run. Run one process per shard.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--shard', type=int, default=0)
+        parser.add_argument('--shards', type=int, default=1)
+        parser.add_argument('--lead-hours', type=float, default=24,
+                            help='Remind this many hours before a task is due.')
+        parser.add_argument('--loop', action='store_true',
+                            help='Keep scanning every --interval seconds.')
+        parser.add_argument('--interval', type=float, default=60)
+
+    def handle(self, *args, **options):
+        if not 0 <= options['shard'] < options['shards']:
+            raise CommandError('--shard must be between 0 and --shards - 1.')
+        lead = timedelta(hours=options['lead_hours'])
+        while True:
+            result = scan_due_tasks(options['shard'], options['shards'], lead=lead)
+            self.stdout.write(
+                f'[{options["shard"]}/{options["shards"]}] {result["since"]:%Y-%m-%d %H:%M:%S} → '
+                f'{result["until"]:%Y-%m-%d %H:%M:%S}: '
+                f'{result["reminders"]} reminders, {result["overdue"]} overdue'
+            )
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
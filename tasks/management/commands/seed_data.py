@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from tasks.benchmarks import BENCH_PASSWORD, BENCH_USER_PREFIX, generate_dataset
+
+
+class Command(BaseCommand):
+    help = 'Bulk-generate benchmark users, projects and tasks with realistic distributions.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument('--projects-per-user', type=int, default=3)
+        parser.add_argument('--tasks-per-project', type=int, default=50)
+        parser.add_argument('--seed', type=int, default=0,
+                            help='Random seed, so datasets are reproducible.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            counts = generate_dataset(
+                users=options['users'],
+                projects_per_user=options['projects_per_user'],
+                tasks_per_project=options['tasks_per_project'],
+                seed=options['seed'],
+                batch_size=options['batch_size'],
+                stdout=self.stdout,
+            )
+        self.stdout.write(self.style.SUCCESS(
+            'Created {users} users, {projects} projects and {tasks} tasks.'.format(**counts)
+        ))
+        self.stdout.write(
+            f'Users are named {BENCH_USER_PREFIX}NNNNNN with password "{BENCH_PASSWORD}".'
+        )
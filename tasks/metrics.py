@@ -0,0 +1,218 @@
+import uuid
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.core.cache import cache
+from django.db.models import Count, DateField
+from django.db.models.functions import Trunc
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import ArchivedTask, Task
+
+PERIODS = ('day', 'week', 'month')
+CHARTS = ('burndown', 'burnup', 'velocity')
+DEFAULT_PERIODS_SHOWN = 12
+MAX_BUCKETS = 400
+# Closed periods only change when history is edited, which moves the scope
+# to a new cache version; the timeout just bounds memory for idle scopes.
+CACHE_TIMEOUT = 7 * 24 * 60 * 60
+
+SCOPE_FIELDS = {'project': 'project_id', 'user': 'assigned_to_id'}
+
+
+def period_start(day, period):
+    """First day of the ``period`` containing ``day``; weeks start on Monday."""
+    if period == 'week':
+        return day - timedelta(days=day.weekday())
+    if period == 'month':
+        return day.replace(day=1)
+    return day
+
+
+def next_period(start, period):
+    if period == 'week':
+        return start + timedelta(days=7)
+    if period == 'month':
+        return (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return start + timedelta(days=1)
+
+
+def periods_between(start, end, period):
+    """Start dates of every ``period`` from the one holding ``start`` to the one holding ``end``."""
+    buckets, current = [], period_start(start, period)
+    while current <= end:
+        buckets.append(current)
+        current = next_period(current, period)
+    return buckets
+
+
+def _midnight(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _version(scope):
+    key = f'metrics-version:{scope[0]}:{scope[1]}'
+    return cache.get_or_set(key, lambda: uuid.uuid4().hex, None)
+
+
+def invalidate(scope):
+    """Drop every cached period for ``scope``, a ``('project'|'user', id)`` pair."""
+    cache.set(f'metrics-version:{scope[0]}:{scope[1]}', uuid.uuid4().hex, None)
+
+
+def _count_by_period(scope, field, since, until, period):
+    """{period start: rows} over both tiers for ``field`` in [since, until)."""
+    counts = defaultdict(int)
+    for model in (Task, ArchivedTask):
+        rows = (
+            model.objects.filter(**{SCOPE_FIELDS[scope[0]]: scope[1],
+                                    f'{field}__gte': _midnight(since),
+                                    f'{field}__lt': _midnight(until)})
+            .order_by()
+            .annotate(bucket=Trunc(field, period, output_field=DateField()))
+            .values('bucket').annotate(rows=Count('pk')).values_list('bucket', 'rows')
+        )
+        for bucket, n in rows:
+            counts[bucket] += n
+    return counts
+
+
+def _count_before(scope, field, until):
+    lookup = {SCOPE_FIELDS[scope[0]]: scope[1], f'{field}__lt': _midnight(until)}
+    return sum(model.objects.filter(**lookup).count() for model in (Task, ArchivedTask))
+
+
+def completion_series(scope, period, start, end):
+    """
+    Tasks created and completed in each ``period`` from ``start`` to ``end``,
+    plus the totals before the first period.
+
+    Periods are grouped in the database with a date truncation over the
+    ``(project|assigned_to, completed_at)`` indexes. Periods that ended
+    before today are cached and only the current one is counted on every
+    call, so a long range costs one cache read. Archived tasks are included.
+    """
+    buckets = periods_between(start, end, period)
+    today = timezone.localdate()
+    version = _version(scope)
+    prefix = f'metrics:{scope[0]}:{scope[1]}:{version}:{period}'
+    closed = [b for b in buckets if next_period(b, period) <= today]
+    cached = cache.get_many([f'{prefix}:{b.isoformat()}' for b in closed])
+
+    counts = {}
+    missing = [b for b in closed if f'{prefix}:{b.isoformat()}' not in cached]
+    for b in closed:
+        counts[b] = cached.get(f'{prefix}:{b.isoformat()}')
+    spans = []
+    if missing:
+        spans.append((missing[0], next_period(missing[-1], period), True))
+    if len(closed) < len(buckets):
+        spans.append((buckets[len(closed)], next_period(buckets[-1], period), False))
+    for since, until, store in spans:
+        created = _count_by_period(scope, 'created_at', since, until, period)
+        completed = _count_by_period(scope, 'completed_at', since, until, period)
+        fresh = {b: (created.get(b, 0), completed.get(b, 0))
+                 for b in buckets if since <= b < until}
+        counts.update(fresh)
+        if store:
+            cache.set_many({f'{prefix}:{b.isoformat()}': value for b, value in fresh.items()},
+                           CACHE_TIMEOUT)
+
+    before_key = f'{prefix}:before:{buckets[0].isoformat()}'
+    before = cache.get(before_key)
+    if before is None:
+        before = (_count_before(scope, 'created_at', buckets[0]),
+                  _count_before(scope, 'completed_at', buckets[0]))
+        if buckets[0] <= today:
+            cache.set(before_key, before, CACHE_TIMEOUT)
+
+    return {
+        'created_before': before[0],
+        'completed_before': before[1],
+        'periods': [{'date': b, 'created': counts[b][0], 'completed': counts[b][1]}
+                    for b in buckets],
+    }
+
+
+def chart(kind, scope, period='week', start=None, end=None):
+    """Burndown, burnup or velocity data for ``scope`` (see completion_series)."""
+    end = min(end or timezone.localdate(), timezone.localdate())
+    if start is None:
+        start = period_start(end, period)
+        for _ in range(DEFAULT_PERIODS_SHOWN - 1):
+            start = period_start(start - timedelta(days=1), period)
+    if start > end:
+        series = {'created_before': 0, 'completed_before': 0, 'periods': []}
+    else:
+        series = completion_series(scope, period, start, end)
+
+    points = []
+    total, done = series['created_before'], series['completed_before']
+    for row in series['periods']:
+        total += row['created']
+        done += row['completed']
+        if kind == 'burndown':
+            points.append({'date': row['date'], 'remaining': total - done})
+        elif kind == 'burnup':
+            points.append({'date': row['date'], 'scope': total, 'completed': done})
+        else:
+            points.append({'date': row['date'], 'completed': row['completed']})
+
+    result = {scope[0]: scope[1], 'chart': kind, 'period': period, 'series': points}
+    if kind == 'velocity':
+        today = timezone.localdate()
+        closed = [p['completed'] for p in points if next_period(p['date'], period) <= today]
+        result['average'] = round(sum(closed) / len(closed), 2) if closed else None
+    return result
+
+
+# Completion stamping and cache invalidation. Queryset update() and
+# bulk_create() skip these, so set ``completed_at`` yourself there.
+
+@receiver(pre_save, sender=Task)
+def stamp_completion(sender, instance, **kwargs):
+    if not instance.completed:
+        instance.completed_at = None
+    elif instance.completed_at is None:
+        instance.completed_at = timezone.now()
+
+
+def _history(values):
+    """The (scope, event) points a task contributes to closed periods."""
+    project_id, user_id, created_at, completed_at = values
+    before = _midnight(timezone.localdate())
+    points = set()
+    for event, stamp in (('created', created_at), ('completed', completed_at)):
+        if stamp is not None and stamp < before:
+            points.add((project_id, user_id, event, stamp))
+    return points
+
+
+def _invalidate_points(points):
+    scopes = set()
+    for project_id, user_id, _, _ in points:
+        if project_id is not None:
+            scopes.add(('project', project_id))
+        scopes.add(('user', user_id))
+    for scope in scopes:
+        invalidate(scope)
+
+
+@receiver(post_save, sender=Task)
+def task_saved(sender, instance, created, **kwargs):
+    new = tuple(getattr(instance, f) for f in Task.METRICS_FIELDS)
+    old = () if created else getattr(instance, '_loaded_metrics', None)
+    if old is None:
+        # Not loaded from the database, so what changed is unknown
+        _invalidate_points({(new[0], new[1], None, None)})
+    elif old != new:
+        before = _history(old) if old else set()
+        _invalidate_points(before ^ _history(new))
+    instance._loaded_metrics = new
+
+
+@receiver(post_delete, sender=Task)
+def task_deleted(sender, instance, **kwargs):
+    _invalidate_points(_history(tuple(getattr(instance, f) for f in Task.METRICS_FIELDS)))
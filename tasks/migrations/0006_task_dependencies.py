@@ -0,0 +1,35 @@
+# Generated by Django 5.2.4 on 2026-10-19 10:29
+
+import datetime
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0002_project_color'),
+        ('tasks', '0005_due_scanner'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='estimate',
+            field=models.DurationField(default=datetime.timedelta(days=1)),
+        ),
+        migrations.CreateModel(
+            name='TaskDependency',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('blocked', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='blocked_by', to='tasks.task')),
+                ('blocker', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='blocking', to='tasks.task')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_dependencies', to='projects.project')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['project'], name='tasks_taskd_project_9ece70_idx')],
+                'constraints': [models.UniqueConstraint(fields=('blocker', 'blocked'), name='tasks_dependency_unique_edge'), models.CheckConstraint(condition=models.Q(('blocker', models.F('blocked')), _negated=True), name='tasks_dependency_no_self_edge')],
+            },
+        ),
+    ]
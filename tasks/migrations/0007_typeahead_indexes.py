@@ -0,0 +1,47 @@
+from django.db import migrations
+
+# Typeahead columns: (table, column, index prefix)
+COLUMNS = [
+    ('tasks_task', 'title', 'tasks_task_title'),
+    ('projects_project', 'name', 'projects_project_name'),
+    ('users_user', 'username', 'users_user_username'),
+]
+
+
+def create_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        # UPPER(col::text) is the expression Django's icontains/istartswith
+        # compare against, so the same indexes serve the task filters too.
+        for table, column, name in COLUMNS:
+            schema_editor.execute(
+                f'CREATE INDEX IF NOT EXISTS {name}_trgm ON {table} '
+                f'USING gin (UPPER({column}::text) gin_trgm_ops)'
+            )
+    elif vendor == 'sqlite':
+        # SQLite's case-insensitive LIKE 'abc%' can use a NOCASE index
+        for table, column, name in COLUMNS:
+            schema_editor.execute(
+                f'CREATE INDEX IF NOT EXISTS {name}_prefix ON {table} ({column} COLLATE NOCASE)'
+            )
+
+
+def drop_indexes(apps, schema_editor):
+    suffix = {'postgresql': 'trgm', 'sqlite': 'prefix'}.get(schema_editor.connection.vendor)
+    if suffix:
+        for _, _, name in COLUMNS:
+            schema_editor.execute(f'DROP INDEX IF EXISTS {name}_{suffix}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0002_project_color'),
+        ('tasks', '0006_task_dependencies'),
+        ('users', '0002_user_avatar'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
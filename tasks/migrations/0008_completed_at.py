@@ -0,0 +1,62 @@
+# Generated by Django 5.2.4 on 2026-10-19 11:00
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+BATCH_SIZE = 10000
+
+
+def backfill_completed_at(apps, schema_editor):
+    # The last edit is the best record we have of when a task was finished.
+    # Batches by id keep each UPDATE (and its locks) short on big tables.
+    for name in ('Task', 'ArchivedTask'):
+        model = apps.get_model('tasks', name)
+        done = model.objects.filter(completed=True, completed_at__isnull=True)
+        last_id = 0
+        while True:
+            ids = list(done.filter(pk__gt=last_id).order_by('pk')
+                       .values_list('pk', flat=True)[:BATCH_SIZE])
+            if not ids:
+                break
+            model.objects.filter(pk__in=ids).update(completed_at=F('updated_at'))
+            last_id = ids[-1]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0002_project_color'),
+        ('tasks', '0007_typeahead_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedtask',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='completed_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(backfill_completed_at, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='archivedtask',
+            index=models.Index(fields=['project', 'completed_at'], name='tasks_archive_project_done_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedtask',
+            index=models.Index(fields=['assigned_to', 'completed_at'], name='tasks_archive_user_done_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['project', 'completed_at'], name='tasks_task_project_done_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['assigned_to', 'completed_at'], name='tasks_task_user_done_idx'),
+        ),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.4 on 2026-10-19 11:08
+
+from django.conf import settings
+from django.db import migrations, models
+
+BATCH_SIZE = 10000
+RANK_STEP = 1.0
+
+
+def backfill_board(apps, schema_editor):
+    # Finished tasks start in the last column, and every column starts in
+    # due-date order, the order boards showed before ranks existed.
+    Task = apps.get_model('tasks', 'Task')
+    Task.objects.filter(completed=True).update(status='completed')
+    columns = set()
+    for project_id, assigned_to_id, status in (
+        Task.objects.order_by().values_list('project_id', 'assigned_to_id', 'status').distinct()
+    ):
+        # Tasks without a project are ordered on their assignee's board
+        columns.add((project_id, None if project_id else assigned_to_id, status))
+    for project_id, assigned_to_id, status in columns:
+        lookup = ({'project_id': project_id} if project_id is not None
+                  else {'project__isnull': True, 'assigned_to_id': assigned_to_id})
+        ids = list(Task.objects.filter(status=status, **lookup).order_by('due_date', 'pk')
+                   .values_list('pk', flat=True))
+        for start in range(0, len(ids), BATCH_SIZE):
+            Task.objects.bulk_update(
+                [Task(pk=pk, rank=(start + i + 1) * RANK_STEP)
+                 for i, pk in enumerate(ids[start:start + BATCH_SIZE])],
+                ['rank'],
+            )
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0002_project_color'),
+        ('tasks', '0008_completed_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedtask',
+            name='rank',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='archivedtask',
+            name='status',
+            field=models.CharField(choices=[('todo', 'To Do'), ('in-progress', 'In Progress'), ('review', 'Review'), ('completed', 'Completed')], default='completed', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='rank',
+            field=models.FloatField(default=0),
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='status',
+            field=models.CharField(choices=[('todo', 'To Do'), ('in-progress', 'In Progress'), ('review', 'Review'), ('completed', 'Completed')], default='todo', max_length=20),
+        ),
+        migrations.RunPython(backfill_board, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['project', 'status', 'rank'], name='tasks_task_board_idx'),
+        ),
+    ]
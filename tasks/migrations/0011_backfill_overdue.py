@@ -0,0 +1,32 @@
+from django.db import migrations
+from django.utils import timezone
+
+BATCH_SIZE = 10000
+
+
+def backfill_overdue(apps, schema_editor):
+    # The scanner only flags tasks whose due date passes after its first
+    # run, so open tasks already past due before then are flagged here.
+    # Batches by id keep each UPDATE (and its locks) short on big tables.
+    Task = apps.get_model('tasks', 'Task')
+    late = Task.objects.filter(completed=False, recurrence='', overdue=False,
+                               due_date__lte=timezone.now())
+    last_id = 0
+    while True:
+        ids = list(late.filter(pk__gt=last_id).order_by('pk')
+                   .values_list('pk', flat=True)[:BATCH_SIZE])
+        if not ids:
+            return
+        Task.objects.filter(pk__in=ids).update(overdue=True)
+        last_id = ids[-1]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0010_task_attachments'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_overdue, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,37 @@
+from django.db import migrations
+
+# Typeahead columns: (table, column, index prefix), as in 0007
+COLUMNS = [
+    ('tasks_task', 'title', 'tasks_task_title'),
+    ('projects_project', 'name', 'projects_project_name'),
+    ('users_user', 'username', 'users_user_username'),
+]
+
+
+def create_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    # GiST trigram indexes return rows nearest first for ORDER BY col <-> 'q',
+    # so typeahead can take the most similar candidates without a full sort
+    for table, column, name in COLUMNS:
+        schema_editor.execute(
+            f'CREATE INDEX IF NOT EXISTS {name}_trgm_gist ON {table} '
+            f'USING gist ({column} gist_trgm_ops)'
+        )
+
+
+def drop_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for _, _, name in COLUMNS:
+            schema_editor.execute(f'DROP INDEX IF EXISTS {name}_trgm_gist')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0011_backfill_overdue'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_indexes, drop_indexes),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.4 on 2026-10-19 12:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0004_project_deletion'),
+        ('tasks', '0012_typeahead_gist_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('project__isnull', True)), fields=['assigned_to', 'status', 'rank'], name='tasks_task_user_board_idx'),
+        ),
+    ]
@@ -1,6 +1,43 @@
+from datetime import timedelta
+
 from django.db import models
 from django.conf import settings
-from projects.models import Project
+from projects.models import Project, ProjectAccess
+
+
+class TaskQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        """
+        Tasks assigned to ``user`` or in projects they own or are a member
+        of; admins see everything.
+
+        Reachable projects come from the ``ProjectAccess`` table. The ids
+        of both branches are collected in a UNION subquery through the
+        ``assigned_to`` and ``project`` indexes, and the tasks fetched by
+        primary key, all in a single statement. A plain OR would let the
+        planner walk a whole index in the requested order instead, reading
+        every task to skip sorting the visible ones.
+        """
+        if user.is_admin():
+            return self
+        projects = ProjectAccess.objects.granting(user, ProjectAccess.PERMISSION_VIEW)
+        # Also used by ArchivedTask, so the ids come from this queryset's model
+        tasks = self.model._default_manager.order_by()
+        ids = (tasks.filter(assigned_to=user).values('pk')
+               .union(tasks.filter(project__in=projects).values('pk')))
+        return self.filter(pk__in=ids)
+
+    def with_project_permission(self, user):
+        """
+        Annotate ``project_permission``, ``user``'s access level on each
+        task's project, for write checks that need no further queries.
+        """
+        if user.is_admin():
+            return self.annotate(project_permission=models.Value(ProjectAccess.PERMISSION_MANAGE))
+        return self.annotate(
+            project_permission=ProjectAccess.objects.level(user, models.OuterRef('project'))
+        )
+
 
 class Task(models.Model):
     """A simple task with priority, assignment and completion status."""
@@ -14,6 +51,19 @@ class Task(models.Model):
         (PRIORITY_HIGH,   'High'),
     ]
 
+    # Board columns; ``completed`` is kept in step with STATUS_COMPLETED
+    STATUS_TODO        = 'todo'
+    STATUS_IN_PROGRESS = 'in-progress'
+    STATUS_REVIEW      = 'review'
+    STATUS_COMPLETED   = 'completed'
+
+    STATUS_CHOICES = [
+        (STATUS_TODO,        'To Do'),
+        (STATUS_IN_PROGRESS, 'In Progress'),
+        (STATUS_REVIEW,      'Review'),
+        (STATUS_COMPLETED,   'Completed'),
+    ]
+
     project      = models.ForeignKey(
         Project,
         on_delete=models.SET_NULL,
@@ -31,10 +81,52 @@ class Task(models.Model):
         on_delete=models.CASCADE,
         related_name='tasks'
     )
+    # Expected effort, used for the project's critical path
+    estimate     = models.DurationField(default=timedelta(days=1))
     completed    = models.BooleanField(default=False)
+    status       = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_TODO)
+    # Manual position within the board column (see tasks.ranking); a move
+    # takes the midpoint of its neighbours, so only the moved row changes
+    rank         = models.FloatField(default=0)
+    # Set when ``completed`` becomes true and cleared when it's undone
+    # (tasks.metrics); feeds the burndown, burnup and velocity charts
+    completed_at = models.DateTimeField(null=True, blank=True)
+    # Set by the due-date scanner (tasks.scanner) once an open task is past due
+    overdue      = models.BooleanField(default=False)
     created_at   = models.DateTimeField(auto_now_add=True)
     updated_at   = models.DateTimeField(auto_now=True)
 
+    # A task with a recurrence is a series: ``due_date`` is its first
+    # occurrence and later ones are expanded on read (see tasks.recurrence).
+    # Only occurrences that were edited or completed are stored, as rows
+    # pointing back at the series through ``recurrence_parent``.
+    RECURRENCE_NONE    = ''
+    RECURRENCE_DAILY   = 'daily'
+    RECURRENCE_WEEKLY  = 'weekly'
+    RECURRENCE_MONTHLY = 'monthly'
+
+    RECURRENCE_CHOICES = [
+        (RECURRENCE_NONE,    'Does not repeat'),
+        (RECURRENCE_DAILY,   'Daily'),
+        (RECURRENCE_WEEKLY,  'Weekly'),
+        (RECURRENCE_MONTHLY, 'Monthly'),
+    ]
+
+    recurrence          = models.CharField(max_length=10, choices=RECURRENCE_CHOICES,
+                                           default=RECURRENCE_NONE, blank=True)
+    recurrence_interval = models.PositiveSmallIntegerField(default=1)
+    recurrence_until    = models.DateTimeField(null=True, blank=True)
+    recurrence_parent   = models.ForeignKey(
+        'self',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='occurrence_overrides'
+    )
+    occurrence_date     = models.DateTimeField(null=True, blank=True)
+
+    objects = TaskQuerySet.as_manager()
+
     class Meta:
         ordering = ['due_date']
         indexes = [
@@ -42,7 +134,257 @@ class Task(models.Model):
             models.Index(fields=['priority']),
             models.Index(fields=['assigned_to']),
             models.Index(fields=['completed']),
+            # Range scans over open tasks by due date (scanner, overdue counts)
+            models.Index(fields=['completed', 'due_date'], name='tasks_task_open_due_idx'),
+            # Small partial index: only series rows, for window lookups
+            models.Index(fields=['due_date'], name='tasks_task_series_idx',
+                         condition=~models.Q(recurrence='')),
+            # Completions per project / per assignee over a date range
+            models.Index(fields=['project', 'completed_at'], name='tasks_task_project_done_idx'),
+            models.Index(fields=['assigned_to', 'completed_at'], name='tasks_task_user_done_idx'),
+            # A board column in manual order; tasks without a project sit in
+            # their assignee's columns
+            models.Index(fields=['project', 'status', 'rank'], name='tasks_task_board_idx'),
+            models.Index(fields=['assigned_to', 'status', 'rank'], name='tasks_task_user_board_idx',
+                         condition=models.Q(project__isnull=True)),
         ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['recurrence_parent', 'occurrence_date'],
+                condition=models.Q(recurrence_parent__isnull=False),
+                name='tasks_task_unique_occurrence',
+            ),
+        ]
+
+    # Stored values the completion charts depend on (see tasks.metrics)
+    METRICS_FIELDS = ('project_id', 'assigned_to_id', 'created_at', 'completed_at')
+    # Board position as loaded, so tasks that change column can be re-placed
+    BOARD_FIELDS = ('project_id', 'assigned_to_id', 'status', 'rank')
+    # Stored values a project's dependency schedule depends on (tasks.dependencies)
+    SCHEDULE_FIELDS = ('project_id', 'due_date', 'estimate')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_metrics = tuple(instance.__dict__.get(f) for f in cls.METRICS_FIELDS)
+        instance._loaded_board = tuple(instance.__dict__.get(f) for f in cls.BOARD_FIELDS)
+        instance._loaded_schedule = tuple(instance.__dict__.get(f) for f in cls.SCHEDULE_FIELDS)
+        return instance
+
+    @property
+    def is_series(self):
+        return self.recurrence != self.RECURRENCE_NONE
 
     def __str__(self):
         return f"{self.title} ({self.get_priority_display()})"
+
+
+class ArchivedTask(models.Model):
+    """
+    Cold-storage copy of a completed, long-past task.
+
+    Rows are moved here by ``manage.py archive_tasks`` and keep their original
+    ``Task`` id, so the hot ``tasks_task`` table (and every index on it) only
+    holds live work.
+    """
+    id           = models.BigIntegerField(primary_key=True)
+    project      = models.ForeignKey(
+        Project,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='archived_tasks'
+    )
+
+    title        = models.CharField(max_length=255)
+    description  = models.TextField(blank=True)
+    due_date     = models.DateTimeField()
+    priority     = models.IntegerField(choices=Task.PRIORITY_CHOICES, default=Task.PRIORITY_MEDIUM)
+    assigned_to  = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='archived_tasks'
+    )
+    completed    = models.BooleanField(default=True)
+    status       = models.CharField(max_length=20, choices=Task.STATUS_CHOICES,
+                                    default=Task.STATUS_COMPLETED)
+    rank         = models.FloatField(default=0)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    created_at   = models.DateTimeField()
+    updated_at   = models.DateTimeField()
+    archived_at  = models.DateTimeField(auto_now_add=True)
+
+    objects = TaskQuerySet.as_manager()
+
+    # Columns copied verbatim between the hot and cold tables.
+    COPIED_FIELDS = [
+        'id', 'project_id', 'title', 'description', 'due_date', 'priority',
+        'assigned_to_id', 'completed', 'status', 'rank', 'completed_at', 'created_at',
+        'updated_at',
+    ]
+
+    class Meta:
+        ordering = ['due_date']
+        indexes = [
+            models.Index(fields=['due_date']),
+            models.Index(fields=['assigned_to']),
+            models.Index(fields=['project', 'completed_at'], name='tasks_archive_project_done_idx'),
+            models.Index(fields=['assigned_to', 'completed_at'], name='tasks_archive_user_done_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.title} ({self.get_priority_display()}, archived)"
+
+
+class Notification(models.Model):
+    """A due-date reminder or overdue notice for one task, created by the scanner."""
+    KIND_REMINDER = 'reminder'
+    KIND_OVERDUE  = 'overdue'
+
+    KIND_CHOICES = [
+        (KIND_REMINDER, 'Due soon'),
+        (KIND_OVERDUE,  'Overdue'),
+    ]
+
+    user        = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='notifications'
+    )
+    task        = models.ForeignKey(
+        Task,
+        on_delete=models.CASCADE,
+        related_name='notifications'
+    )
+    kind        = models.CharField(max_length=10, choices=KIND_CHOICES)
+    # The due date notified about; a rescheduled task can be notified again
+    due_date    = models.DateTimeField()
+    created_at  = models.DateTimeField(auto_now_add=True)
+    read_at     = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at']),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['task', 'kind', 'due_date'],
+                                    name='tasks_notification_once'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()}: {self.task_id} for {self.user_id}"
+
+
+class ScannerWatermark(models.Model):
+    """How far a named scanner (or one shard of it) has processed."""
+    name          = models.CharField(max_length=100, unique=True)
+    scanned_until = models.DateTimeField()
+    updated_at    = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.scanned_until:%Y-%m-%d %H:%M:%S}"
+
+
+class TaskDependency(models.Model):
+    """``blocker`` must be finished before ``blocked`` can start; both in ``project``."""
+    project     = models.ForeignKey(
+        Project,
+        on_delete=models.CASCADE,
+        related_name='task_dependencies'
+    )
+    blocker     = models.ForeignKey(
+        Task,
+        on_delete=models.CASCADE,
+        related_name='blocking'
+    )
+    blocked     = models.ForeignKey(
+        Task,
+        on_delete=models.CASCADE,
+        related_name='blocked_by'
+    )
+    created_at  = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['project']),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['blocker', 'blocked'],
+                                    name='tasks_dependency_unique_edge'),
+            models.CheckConstraint(condition=~models.Q(blocker=models.F('blocked')),
+                                   name='tasks_dependency_no_self_edge'),
+        ]
+
+    def __str__(self):
+        return f"{self.blocker_id} blocks {self.blocked_id}"
+
+
+class TaskAttachmentQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        """Attachments of the tasks ``user`` can see."""
+        if user.is_admin():
+            return self
+        return self.filter(task__in=Task.objects.visible_to(user))
+
+    def with_project_permission(self, user):
+        """Annotate ``project_permission`` on each attachment's task's project."""
+        if user.is_admin():
+            return self.annotate(project_permission=models.Value(ProjectAccess.PERMISSION_MANAGE))
+        return self.annotate(
+            project_permission=ProjectAccess.objects.level(user, models.OuterRef('task__project'))
+        )
+
+
+class TaskAttachment(models.Model):
+    """
+    A file attached to a task. It is created empty with its declared size
+    and filled by resumable uploads (see tasks.attachments); only complete
+    attachments can be downloaded.
+    """
+    STATUS_UPLOADING = 'uploading'
+    STATUS_COMPLETE  = 'complete'
+
+    STATUS_CHOICES = [
+        (STATUS_UPLOADING, 'Uploading'),
+        (STATUS_COMPLETE,  'Complete'),
+    ]
+
+    task         = models.ForeignKey(
+        Task,
+        on_delete=models.CASCADE,
+        related_name='attachments'
+    )
+    uploaded_by  = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='task_attachments'
+    )
+    filename     = models.CharField(max_length=255)
+    content_type = models.CharField(max_length=255)
+    file         = models.FileField(upload_to='attachments/%Y/%m/', max_length=255)
+    size         = models.BigIntegerField()
+    # Bytes stored so far; the offset the next chunk must start at
+    received     = models.BigIntegerField(default=0)
+    # Hex SHA-256 of the content: as declared by the client while uploading
+    # (if it was), then as computed from the stored file
+    sha256       = models.CharField(max_length=64, blank=True)
+    status       = models.CharField(max_length=10, choices=STATUS_CHOICES,
+                                    default=STATUS_UPLOADING)
+    created_at   = models.DateTimeField(auto_now_add=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    objects = TaskAttachmentQuerySet.as_manager()
+
+    class Meta:
+        # The task foreign key's index serves lookups and the task list's prefetch
+        ordering = ['id']
+
+    @property
+    def is_complete(self):
+        return self.status == self.STATUS_COMPLETE
+
+    def __str__(self):
+        return f"{self.filename} on task {self.task_id}"
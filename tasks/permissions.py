@@ -1,9 +1,14 @@
 from rest_framework import permissions
+from projects.models import ProjectAccess
 
 class IsAdminOrOwner(permissions.BasePermission):
     """
     Admins have full access.
-    Regular users have access only to objects they own.
+    Regular users may change tasks assigned to them, or in projects where
+    they are owner, editor or manager.
+
+    Read visibility is enforced by ``Task.objects.visible_to`` on the view's
+    queryset, so only write access is decided here.
     """
 
     def has_permission(self, request, view):
@@ -19,5 +24,23 @@ class IsAdminOrOwner(permissions.BasePermission):
         if request.method in permissions.SAFE_METHODS:
             return True
 
-        # Others: only if the user “owns” the object
-        return obj.assigned_to_id == request.user.id
+        return self.can_edit(request.user, obj)
+
+    @staticmethod
+    def can_edit(user, task, project_permission=None):
+        # Only if the task is the user's or they may edit its project. The
+        # view annotates ``project_permission``, so this needs no query.
+        if user.is_admin() or task.assigned_to_id == user.id:
+            return True
+        if project_permission is None:
+            project_permission = getattr(task, 'project_permission', None)
+        return (project_permission or 0) >= ProjectAccess.PERMISSION_EDIT
+
+
+class CanEditAttachedTask(IsAdminOrOwner):
+    """Attachments may be changed by whoever may change their task."""
+
+    def has_object_permission(self, request, view, obj):
+        if request.method in permissions.SAFE_METHODS:
+            return True
+        return self.can_edit(request.user, obj.task, getattr(obj, 'project_permission', None))
@@ -0,0 +1,144 @@
+"""
+Manual ordering of tasks within a board column.
+
+A column is a project's tasks in one status; tasks without a project sit on
+their assignee's board. Each task carries a float ``rank``, and a move gives
+the task the midpoint of its new neighbours, so only the moved row is
+written. Repeated moves into the same gap halve it each time; once it drops
+below RANK_MIN_GAP a background job re-spaces the column, and if there is
+no room left at all (ties from bulk inserts, or float precision running
+out) the column is re-spaced inline before placing the task.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Max
+from django.db.models.signals import pre_save
+from django.dispatch import receiver
+
+from jobs.queue import enqueue
+from .models import Task
+
+RANK_STEP = 1.0
+# Gaps narrower than this are still usable, but the column is due a rebalance
+RANK_MIN_GAP = 1e-6
+# How long an enqueued rebalance suppresses further requests for its column
+REBALANCE_DEBOUNCE = 60
+BATCH_SIZE = 1000
+
+
+def column_lookup(project_id, assigned_to_id, status):
+    if project_id is not None:
+        return {'project_id': project_id, 'status': status}
+    return {'project__isnull': True, 'assigned_to_id': assigned_to_id, 'status': status}
+
+
+def column_of(task):
+    """The tasks sharing ``task``'s column, including ``task`` itself."""
+    return Task.objects.filter(**column_lookup(task.project_id, task.assigned_to_id, task.status))
+
+
+def _column_key(task):
+    return {'project_id': task.project_id,
+            'assigned_to_id': None if task.project_id else task.assigned_to_id,
+            'status': task.status}
+
+
+def _between(lower, upper):
+    """A rank strictly between ``lower`` and ``upper`` (None is open-ended), or None."""
+    if lower is None and upper is None:
+        return RANK_STEP
+    if upper is None:
+        return lower + RANK_STEP
+    if lower is None:
+        return upper - RANK_STEP
+    rank = (lower + upper) / 2
+    return rank if lower < rank < upper else None
+
+
+def _neighbours(task, after, before):
+    """The ranks the moved task must fall between, or None if they are tied."""
+    others = column_of(task).exclude(pk=task.pk)
+    if after is not None:
+        upper = (others.exclude(pk=after.pk).filter(rank__gte=after.rank)
+                 .order_by('rank').values_list('rank', flat=True).first())
+        if upper == after.rank:
+            return None
+        return after.rank, upper
+    if before is not None:
+        lower = (others.exclude(pk=before.pk).filter(rank__lte=before.rank)
+                 .order_by('-rank').values_list('rank', flat=True).first())
+        if lower == before.rank:
+            return None
+        return lower, before.rank
+    return others.aggregate(last=Max('rank'))['last'], None
+
+
+def place(task, after=None, before=None):
+    """
+    Set ``task.rank`` (without saving) to put it right after ``after``, right
+    before ``before``, or at the end of its column if neither is given. The
+    neighbours must already be in the task's target column.
+    """
+    bounds = _neighbours(task, after, before)
+    rank = _between(*bounds) if bounds else None
+    if rank is None:
+        rebalance_column(**_column_key(task))
+        for neighbour in (after, before):
+            if neighbour is not None:
+                neighbour.refresh_from_db(fields=['rank'])
+        rank = _between(*_neighbours(task, after, before))
+    elif None not in bounds and bounds[1] - bounds[0] < RANK_MIN_GAP:
+        request_rebalance(task)
+    task.rank = rank
+    return rank
+
+
+def request_rebalance(task):
+    """Queue a rebalance of ``task``'s column, at most once per debounce window."""
+    key = _column_key(task)
+    if cache.add('rank-rebalance:{project_id}:{assigned_to_id}:{status}'.format(**key),
+                 True, REBALANCE_DEBOUNCE):
+        transaction.on_commit(lambda: enqueue('tasks.rebalance_ranks', key))
+
+
+def rebalance_column(project_id, assigned_to_id, status):
+    """Re-space a column's ranks RANK_STEP apart, keeping its order. Returns the row count."""
+    with transaction.atomic():
+        ids = list(Task.objects.filter(**column_lookup(project_id, assigned_to_id, status))
+                   .select_for_update().order_by('rank', 'pk').values_list('pk', flat=True))
+        for start in range(0, len(ids), BATCH_SIZE):
+            Task.objects.bulk_update(
+                [Task(pk=pk, rank=(start + i + 1) * RANK_STEP)
+                 for i, pk in enumerate(ids[start:start + BATCH_SIZE])],
+                ['rank'],
+            )
+    return len(ids)
+
+
+def _changed_column(task):
+    """Whether a loaded task now belongs to another column without a new rank."""
+    loaded = getattr(task, '_loaded_board', None)
+    if loaded is None or loaded[2] is None:
+        return False
+    project_id, assigned_to_id, status, rank = loaded
+    if task.rank != rank:
+        return False
+    return (task.project_id != project_id or task.status != status
+            or (task.project_id is None and task.assigned_to_id != assigned_to_id))
+
+
+@receiver(pre_save, sender=Task)
+def sync_board(sender, instance, **kwargs):
+    """
+    Keep ``status`` in step with ``completed``, and put new tasks, or tasks
+    moved to another column without a position, at the end of the column.
+    """
+    if instance.completed:
+        instance.status = Task.STATUS_COMPLETED
+    elif instance.status == Task.STATUS_COMPLETED:
+        instance.status = Task.STATUS_TODO
+    # bulk_create() skips this, leaving rank 0; the first move into a tied
+    # column re-spaces it.
+    if (instance._state.adding and not instance.rank) or _changed_column(instance):
+        place(instance)
+    instance._loaded_board = tuple(getattr(instance, f) for f in Task.BOARD_FIELDS)
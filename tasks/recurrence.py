@@ -0,0 +1,101 @@
+import calendar
+from datetime import timedelta
+
+from django.db.models import Q
+
+from .archive import ordering_key
+from .models import Task
+
+
+def _add_months(value, months, day):
+    """Shift ``value`` by ``months``, clamping ``day`` to the month's length."""
+    month_index = value.month - 1 + months
+    year, month = value.year + month_index // 12, month_index % 12 + 1
+    return value.replace(year=year, month=month,
+                         day=min(day, calendar.monthrange(year, month)[1]))
+
+
+def occurrence_dates(series, start, end):
+    """
+    Yield the occurrences of ``series`` falling in ``[start, end)``.
+
+    Jumps straight to the first occurrence inside the window, so the cost
+    depends on the window size rather than on how old the series is.
+    """
+    first = series.due_date
+    interval = max(1, series.recurrence_interval)
+    until = series.recurrence_until
+    if until is not None and until < end:
+        end = until + timedelta(microseconds=1)
+
+    if series.recurrence == Task.RECURRENCE_MONTHLY:
+        months = (start.year - first.year) * 12 + start.month - first.month
+        n = max(0, months // interval - 1)
+        while True:
+            value = _add_months(first, n * interval, first.day)
+            if value >= end:
+                return
+            if value >= start:
+                yield value
+            n += 1
+    else:
+        days = 1 if series.recurrence == Task.RECURRENCE_DAILY else 7
+        step = timedelta(days=days * interval)
+        n = max(0, -((first - start) // step))
+        value = first + n * step
+        while value < end:
+            yield value
+            value += step
+
+
+def is_occurrence(series, value):
+    window = occurrence_dates(series, value, value + timedelta(microseconds=1))
+    return next(window, None) == value
+
+
+def virtual_occurrence(series, when):
+    """An unsaved ``Task`` standing in for one occurrence of ``series``."""
+    return Task(
+        title=series.title,
+        description=series.description,
+        due_date=when,
+        priority=series.priority,
+        assigned_to=series.assigned_to,
+        project=series.project,
+        completed=False,
+        recurrence_parent=series,
+        occurrence_date=when,
+        created_at=series.created_at,
+        updated_at=series.updated_at,
+    )
+
+
+def expand_window(queryset, start, end, ordering=('due_date',)):
+    """
+    Plain tasks due in ``[start, end)`` plus the virtual occurrences of every
+    series in ``queryset`` that overlaps the window.
+
+    Costs three queries however many series there are: plain rows, series
+    rows (through the partial series index) and stored overrides, plus any
+    prefetches for the plain rows.
+    """
+    plain = list(queryset.filter(recurrence=Task.RECURRENCE_NONE,
+                                 due_date__gte=start, due_date__lt=end))
+    # Series rows only stand in as templates for unsaved occurrences
+    series = list(
+        queryset.prefetch_related(None).exclude(recurrence=Task.RECURRENCE_NONE)
+        .filter(due_date__lt=end)
+        .filter(Q(recurrence_until__isnull=True) | Q(recurrence_until__gte=start))
+    )
+    overridden = set(
+        Task.objects.filter(recurrence_parent__in=[s.pk for s in series],
+                            occurrence_date__gte=start, occurrence_date__lt=end)
+        .values_list('recurrence_parent_id', 'occurrence_date')
+    )
+    occurrences = [
+        virtual_occurrence(s, when)
+        for s in series
+        for when in occurrence_dates(s, start, end)
+        if (s.pk, when) not in overridden
+    ]
+    return sorted(plain + occurrences, key=ordering_key(list(ordering) + ['pk']))
@@ -0,0 +1,137 @@
+import heapq
+from datetime import timedelta
+from itertools import groupby
+
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.functions import Mod
+from django.utils import timezone
+
+from .models import Notification, ScannerWatermark, Task
+from .recurrence import occurrence_dates
+
+DEFAULT_REMINDER_LEAD = timedelta(hours=24)
+# How far back a scanner with no watermark yet starts looking.
+DEFAULT_INITIAL_LOOKBACK = timedelta(days=7)
+
+
+def watermark_name(shard, shards):
+    return f'due-scanner:{shard}/{shards}'
+
+
+def scan_due_tasks(shard=0, shards=1, now=None, lead=DEFAULT_REMINDER_LEAD,
+                   initial_lookback=DEFAULT_INITIAL_LOOKBACK):
+    """
+    Create reminders for open tasks whose due date came within ``lead`` and
+    flag open tasks that became overdue, since this shard's last run.
+
+    Only the slice of due dates that crossed a threshold since the stored
+    watermark is read, through the (completed, due_date) index, plus tasks
+    created or rescheduled since then straight into the reminder window.
+    A shard's first run also flags every open task already past due, with
+    no notices for those older than ``initial_lookback``.
+
+    Occurrences of open series are expanded over the same windows and
+    notified against the series row, with the occurrence's date; edited or
+    completed occurrences are stored rows and scanned as plain tasks.
+    Unstored occurrences have no row to flag ``overdue`` on. Shards split
+    work by assignee, so each user's notifications come from one scanner.
+    Notifications and the new watermark commit together and are unique per
+    task, kind and due date, so a crashed or repeated run never duplicates.
+
+    Returns a dict with the window scanned and counts created.
+    """
+    now = now or timezone.now()
+    name = watermark_name(shard, shards)
+    with transaction.atomic():
+        mark, first_run = (ScannerWatermark.objects.select_for_update()
+                           .get_or_create(name=name,
+                                          defaults={'scanned_until': now - initial_lookback}))
+        since = mark.scanned_until
+        if since >= now:
+            return {'since': since, 'until': now, 'reminders': 0, 'overdue': 0}
+
+        unfinished = Task.objects.filter(completed=False)
+        if shards > 1:
+            unfinished = (unfinished.alias(shard=Mod('assigned_to_id', shards))
+                          .filter(shard=shard))
+        open_tasks = unfinished.filter(recurrence=Task.RECURRENCE_NONE)
+
+        # Tasks already past due get an overdue notice instead of a reminder.
+        # A task changed since the last run may have been given a due date
+        # that was inside the lead time already, so the window never crossed it
+        due_soon = (open_tasks.filter(due_date__gt=now, due_date__lte=now + lead)
+                    .filter(Q(due_date__gt=since + lead) | Q(updated_at__gt=since)))
+        past_due = open_tasks.filter(due_date__gt=since, due_date__lte=now)
+
+        series = _series_occurrences(unfinished.exclude(recurrence=Task.RECURRENCE_NONE),
+                                     since, now, lead)
+
+        reminders = _notify(_rows(due_soon, series['reminder']), Notification.KIND_REMINDER)
+        overdue = _notify(_rows(past_due, series['overdue']), Notification.KIND_OVERDUE)
+        flag = open_tasks.filter(due_date__lte=now) if first_run else past_due
+        flag.filter(overdue=False).update(overdue=True)
+
+        mark.scanned_until = now
+        mark.save(update_fields=['scanned_until', 'updated_at'])
+    return {'since': since, 'until': now, 'reminders': reminders, 'overdue': overdue}
+
+
+def _series_occurrences(series, since, now, lead):
+    """
+    ``(user, series id, date)`` of the unstored occurrences of ``series``
+    that crossed a threshold in ``(since, now]``, by kind, sorted like
+    ``_rows``. Series edited since then get reminders for their whole lead
+    window, like rescheduled tasks.
+    """
+    # Through the partial series index; only series that can reach the window
+    series = (series.filter(due_date__lte=now + lead)
+              .filter(Q(recurrence_until__isnull=True) | Q(recurrence_until__gt=since)))
+    overridden = set(
+        Task.objects.filter(recurrence_parent__in=series.values('pk'),
+                            occurrence_date__gt=since, occurrence_date__lte=now + lead)
+        .values_list('recurrence_parent_id', 'occurrence_date')
+    )
+    # occurrence_dates covers [start, end); thresholds are crossed in (start, end]
+    tick = timedelta(microseconds=1)
+    found = {Notification.KIND_REMINDER: [], Notification.KIND_OVERDUE: []}
+    for s in series.iterator(chunk_size=2000):
+        reminder_from = now if s.updated_at > since else max(now, since + lead)
+        for kind, start, end in ((Notification.KIND_REMINDER, reminder_from, now + lead),
+                                 (Notification.KIND_OVERDUE, since, now)):
+            found[kind].extend((s.assigned_to_id, s.pk, when)
+                               for when in occurrence_dates(s, start + tick, end + tick)
+                               if (s.pk, when) not in overridden)
+    for rows in found.values():
+        rows.sort(key=lambda row: (row[0], row[2]))
+    return found
+
+
+def _rows(tasks, occurrences):
+    """``(user, task id, due date)`` of ``tasks`` and ``occurrences``, by user and date."""
+    rows = (tasks.order_by('assigned_to_id', 'due_date')
+            .values_list('assigned_to_id', 'id', 'due_date')
+            .iterator(chunk_size=2000))
+    return heapq.merge(rows, occurrences, key=lambda row: (row[0], row[2]))
+
+
+def _notify(rows, kind):
+    """
+    Bulk-insert one batch of notifications per user from ``rows`` (see
+    ``_rows``), skipping those sent before. Returns how many were new.
+    """
+    created = 0
+    for user_id, group in groupby(rows, key=lambda row: row[0]):
+        group = list(group)
+        sent = set(Notification.objects.filter(
+            task_id__in=[task_id for _, task_id, _ in group], kind=kind,
+        ).values_list('task_id', 'due_date'))
+        batch = [
+            Notification(user_id=user_id, task_id=task_id, kind=kind, due_date=due_date)
+            for _, task_id, due_date in group
+            if (task_id, due_date) not in sent
+        ]
+        # The unique constraint still catches a concurrent run's inserts
+        Notification.objects.bulk_create(batch, ignore_conflicts=True)
+        created += len(batch)
+    return created
@@ -1,5 +1,13 @@
+import hashlib
+import mimetypes
+import ntpath
+
+from django.conf import settings
+from django.utils import timezone
 from rest_framework import serializers
-from .models import Task
+from .models import ArchivedTask, Task, TaskAttachment, TaskDependency
+from .metrics import MAX_BUCKETS, PERIODS, periods_between
+from .permissions import IsAdminOrOwner
 from projects.models import Project
 
 class ProjectNameField(serializers.ReadOnlyField):
@@ -7,19 +15,171 @@ class ProjectNameField(serializers.ReadOnlyField):
         return instance.project.name if instance.project else None
 
 
+BASE_TASK_FIELDS = [
+    'id', 'title', 'description',
+    'due_date', 'priority',
+    'assigned_to', 'assigned_to_username',
+    'project', 'project_name',
+    'completed', 'completed_at', 'created_at', 'updated_at',
+]
+
+
+class TaskAttachmentSerializer(serializers.ModelSerializer):
+    """
+    Attachment metadata. Creating one reserves the file; its content is then
+    uploaded in chunks (see tasks.attachments).
+    """
+    sha256 = serializers.RegexField(r'^[0-9a-fA-F]{64}$', required=False, allow_blank=True)
+
+    class Meta:
+        model = TaskAttachment
+        fields = [
+            'id', 'task', 'filename', 'content_type', 'size', 'received', 'sha256',
+            'status', 'uploaded_by', 'created_at', 'completed_at',
+        ]
+        read_only_fields = [
+            'id', 'received', 'status', 'uploaded_by', 'created_at', 'completed_at',
+        ]
+        extra_kwargs = {'content_type': {'required': False}}
+
+    def validate_task(self, value):
+        user = self.context['request'].user
+        task = (Task.objects.visible_to(user).with_project_permission(user)
+                .filter(pk=value.pk).first())
+        if task is None or not IsAdminOrOwner.can_edit(user, task):
+            raise serializers.ValidationError('You cannot attach files to this task.')
+        return value
+
+    def validate_filename(self, value):
+        # Browsers on Windows may send the full client-side path
+        value = ntpath.basename(value).strip()
+        if not value:
+            raise serializers.ValidationError('A file name is required.')
+        return value
+
+    def validate_size(self, value):
+        if not 0 <= value <= settings.ATTACHMENT_MAX_SIZE:
+            raise serializers.ValidationError(
+                f'Must be between 0 and {settings.ATTACHMENT_MAX_SIZE} bytes.'
+            )
+        return value
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        # An empty file is complete on creation, so check its digest up front
+        if (attrs['size'] == 0 and attrs.get('sha256')
+                and attrs['sha256'].lower() != hashlib.sha256(b'').hexdigest()):
+            raise serializers.ValidationError({'sha256': 'Does not match an empty file.'})
+        if not attrs.get('content_type'):
+            attrs['content_type'] = (mimetypes.guess_type(attrs['filename'])[0]
+                                     or 'application/octet-stream')
+        return attrs
+
+
 class TaskSerializer(serializers.ModelSerializer):
     assigned_to_username = serializers.CharField(
         source='assigned_to.username', read_only=True
     )
     project_name = ProjectNameField(source='project', read_only=True)
+    # From the view's prefetch, so a page of tasks costs one extra query
+    attachments = serializers.SerializerMethodField()
 
     class Meta:
         model = Task
-        fields = [
-            'id', 'title', 'description',
-            'due_date', 'priority',
-            'assigned_to', 'assigned_to_username',
-            'project', 'project_name',
-            'completed', 'created_at', 'updated_at',
+        fields = BASE_TASK_FIELDS + [
+            'recurrence', 'recurrence_interval', 'recurrence_until',
+            'recurrence_parent', 'occurrence_date', 'overdue', 'estimate',
+            'status', 'rank', 'attachments',
+        ]
+        read_only_fields = [
+            'id', 'completed_at', 'created_at', 'updated_at',
+            'recurrence_parent', 'occurrence_date', 'overdue', 'rank',
         ]
-        read_only_fields = ['id', 'created_at', 'updated_at']
+
+    def get_attachments(self, obj):
+        if obj.pk is None:
+            # A virtual occurrence of a recurring series
+            return []
+        return TaskAttachmentSerializer(obj.attachments.all(), many=True).data
+
+    def validate_project(self, value):
+        user = self.context['request'].user
+        if (value is not None and value.pk != getattr(self.instance, 'project_id', None)
+                and not Project.objects.editable_by(user).filter(pk=value.pk).exists()):
+            raise serializers.ValidationError('You cannot add tasks to this project.')
+        return value
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        # The board column and the completed flag describe the same thing
+        if 'status' in attrs:
+            attrs['completed'] = attrs['status'] == Task.STATUS_COMPLETED
+        elif 'completed' in attrs:
+            status = getattr(self.instance, 'status', Task.STATUS_TODO)
+            if attrs['completed']:
+                attrs['status'] = Task.STATUS_COMPLETED
+            elif status == Task.STATUS_COMPLETED:
+                attrs['status'] = Task.STATUS_TODO
+        # Keep the scanner's overdue flag right when a task is completed or
+        # rescheduled, rather than waiting for the next scan.
+        if 'completed' in attrs or 'due_date' in attrs:
+            completed = attrs.get('completed', getattr(self.instance, 'completed', False))
+            due_date = attrs.get('due_date', getattr(self.instance, 'due_date', None))
+            attrs['overdue'] = bool(
+                not completed and due_date is not None and due_date <= timezone.now()
+            )
+        return attrs
+
+
+class ArchivedTaskSerializer(TaskSerializer):
+    """Read-only representation of a task moved to cold storage."""
+
+    class Meta(TaskSerializer.Meta):
+        model = ArchivedTask
+        fields = BASE_TASK_FIELDS + ['archived_at']
+        read_only_fields = fields
+
+
+class TaskDependencySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TaskDependency
+        fields = ['id', 'project', 'blocker', 'blocked', 'created_at']
+        read_only_fields = ['id', 'project', 'created_at']
+
+    def validate(self, attrs):
+        blocker, blocked = attrs['blocker'], attrs['blocked']
+        if blocker.project_id is None or blocker.project_id != blocked.project_id:
+            raise serializers.ValidationError('Both tasks must belong to the same project.')
+        user = self.context['request'].user
+        if not Project.objects.editable_by(user).filter(pk=blocker.project_id).exists():
+            raise serializers.ValidationError('You cannot edit dependencies in this project.')
+        return attrs
+
+
+class MoveTaskSerializer(serializers.Serializer):
+    """Body of the board move action; ``after`` wins if both neighbours are given."""
+    status = serializers.ChoiceField(choices=Task.STATUS_CHOICES)
+    after  = serializers.IntegerField(required=False, allow_null=True)
+    before = serializers.IntegerField(required=False, allow_null=True)
+
+
+class ChartParamsSerializer(serializers.Serializer):
+    """Query parameters of the burndown, burnup and velocity endpoints."""
+    period = serializers.ChoiceField(choices=PERIODS, default='week')
+    start  = serializers.DateField(required=False)
+    end    = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        # Charts stop at today, so compare against the end actually charted
+        today = timezone.localdate()
+        start, end = attrs.get('start'), min(attrs.get('end') or today, today)
+        if start is not None:
+            if start > today:
+                raise serializers.ValidationError({'start': 'Must not be in the future.'})
+            if start > end:
+                raise serializers.ValidationError({'start': 'Must not be after end.'})
+            if len(periods_between(start, end, attrs['period'])) > MAX_BUCKETS:
+                raise serializers.ValidationError(
+                    {'start': f'At most {MAX_BUCKETS} periods can be charted at once.'}
+                )
+        return attrs
@@ -0,0 +1,79 @@
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from users.models import User
+from tasks.archive import archive_tasks
+from tasks.models import ArchivedTask, Task
+
+
+class TaskArchiveTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = User.objects.create_user(
+            username='alice', email='alice@x.com', password='pass', role='user'
+        )
+        cls.bob = User.objects.create_user(
+            username='bob', email='bob@x.com', password='pass', role='user'
+        )
+        cls.old_done = Task.objects.create(
+            title='Old done', due_date='2000-01-02T00:00:00Z',
+            completed=True, assigned_to=cls.alice,
+        )
+        cls.old_open = Task.objects.create(
+            title='Old open', due_date='2000-01-01T00:00:00Z',
+            completed=False, assigned_to=cls.alice,
+        )
+        cls.current = Task.objects.create(
+            title='Current', due_date='2100-01-01T00:00:00Z',
+            completed=True, assigned_to=cls.alice,
+        )
+        Task.objects.create(
+            title='Bob old', due_date='2000-01-01T00:00:00Z',
+            completed=True, assigned_to=cls.bob,
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.alice)
+
+    def test_mover_only_moves_old_completed_tasks(self):
+        self.assertEqual(archive_tasks(batch_size=1), 2)
+        self.assertEqual(set(ArchivedTask.objects.values_list('title', flat=True)),
+                         {'Old done', 'Bob old'})
+        self.assertTrue(ArchivedTask.objects.filter(pk=self.old_done.pk).exists())
+        self.assertFalse(Task.objects.filter(pk=self.old_done.pk).exists())
+        # Re-running finds nothing left to do
+        self.assertEqual(archive_tasks(), 0)
+
+    def test_default_list_reads_hot_data_only(self):
+        archive_tasks()
+        resp = self.client.get(reverse('task-list'))
+        self.assertEqual([t['title'] for t in resp.data], ['Old open', 'Current'])
+
+    def test_include_archived_merges_in_order(self):
+        archive_tasks()
+        url = reverse('task-list')
+        resp = self.client.get(url, {'include_archived': 'true'})
+        self.assertEqual([t['title'] for t in resp.data],
+                         ['Old open', 'Old done', 'Current'])
+
+        resp = self.client.get(url, {'include_archived': 'true', 'completed': 'true',
+                                     'ordering': '-due_date'})
+        self.assertEqual([t['title'] for t in resp.data], ['Current', 'Old done'])
+
+    def test_retrieve_archived_task(self):
+        archive_tasks()
+        url = reverse('task-detail', args=[self.old_done.pk])
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        resp = self.client.get(url, {'include_archived': 'true'})
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertIsNotNone(resp.data['archived_at'])
+
+    def test_export_reads_both_tiers(self):
+        archive_tasks()
+        resp = self.client.get(reverse('task-export'))
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        lines = b''.join(resp.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertTrue(lines[0].startswith('id,title'))
+        self.assertIn('Old done', lines[2])
+        self.assertTrue(lines[2].endswith('True'))
@@ -0,0 +1,154 @@
+import base64
+import hashlib
+import shutil
+import tempfile
+
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from projects.models import Project, ProjectMembership
+from users.models import User
+from tasks.archive import archivable_tasks
+from tasks.models import Task, TaskAttachment
+
+CONTENT = bytes(range(256)) * 1000
+
+
+class TaskAttachmentTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = User.objects.create_user(
+            username='alice', email='alice@x.com', password='pass', role='user'
+        )
+        cls.bob = User.objects.create_user(
+            username='bob', email='bob@x.com', password='pass', role='user'
+        )
+        cls.project = Project.objects.create(name='Files', due_date='2025-02-01', owner=cls.alice)
+        ProjectMembership.objects.create(project=cls.project, user=cls.bob,
+                                         role=ProjectMembership.ROLE_VIEWER)
+        cls.task = Task.objects.create(title='Spec', due_date='2000-01-01T00:00:00Z',
+                                       assigned_to=cls.alice, project=cls.project,
+                                       completed=True)
+
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings = override_settings(MEDIA_ROOT=media_root)
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.client.force_authenticate(user=self.alice)
+
+    def create(self, content=CONTENT, **extra):
+        response = self.client.post(reverse('attachment-list'), {
+            'task': self.task.pk, 'filename': 'C:\\specs\\spec.bin', 'size': len(content),
+            **extra,
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED, response.data)
+        return response.data
+
+    def upload(self, pk, offset, chunk, **headers):
+        return self.client.patch(reverse('attachment-upload', args=[pk]), chunk,
+                                 content_type='application/offset+octet-stream',
+                                 HTTP_UPLOAD_OFFSET=str(offset), **headers)
+
+    def download(self, pk, **headers):
+        response = self.client.get(reverse('attachment-download', args=[pk]), **headers)
+        body = b''.join(response.streaming_content) if response.streaming else response.content
+        return response, body
+
+    def test_chunked_upload_resumes_and_downloads(self):
+        data = self.create(sha256=hashlib.sha256(CONTENT).hexdigest())
+        self.assertEqual((data['filename'], data['status']), ('spec.bin', 'uploading'))
+
+        self.assertEqual(self.upload(data['id'], 0, CONTENT[:100000]).status_code, 200)
+        # A retried chunk from the wrong offset is told where to continue
+        response = self.upload(data['id'], 0, CONTENT[:100000])
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response['Upload-Offset'], '100000')
+        head = self.client.head(reverse('attachment-upload', args=[data['id']]))
+        self.assertEqual((head['Upload-Offset'], head['Upload-Length']), ('100000', '256000'))
+
+        response, _ = self.download(data['id'])
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        response = self.upload(data['id'], 100000, CONTENT[100000:])
+        self.assertEqual(response.data['status'], TaskAttachment.STATUS_COMPLETE)
+
+        response, body = self.download(data['id'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(body, CONTENT)
+        self.assertEqual(response['Content-Length'], str(len(CONTENT)))
+        self.assertIn('filename="spec.bin"', response['Content-Disposition'])
+
+    def test_checksums_reject_corrupt_chunks_and_files(self):
+        data = self.create(sha256=hashlib.sha256(CONTENT).hexdigest())
+        chunk = CONTENT[:1000]
+        digest = base64.b64encode(hashlib.sha256(chunk[::-1]).digest()).decode()
+        response = self.upload(data['id'], 0, chunk, HTTP_UPLOAD_CHECKSUM=f'sha256 {digest}')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response['Upload-Offset'], '0')
+
+        # Every chunk arrives but the whole doesn't match: start over
+        response = self.upload(data['id'], 0, CONTENT[::-1])
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response['Upload-Offset'], '0')
+        self.assertEqual(self.upload(data['id'], 0, CONTENT).status_code, 200)
+
+        # An empty file is complete at once, so its digest is checked on creation
+        response = self.client.post(reverse('attachment-list'), {
+            'task': self.task.pk, 'filename': 'empty.txt', 'size': 0, 'sha256': '0' * 64,
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(TaskAttachment.objects.count(), 1)
+        empty = self.create(b'', sha256=hashlib.sha256(b'').hexdigest())
+        self.assertEqual(empty['status'], TaskAttachment.STATUS_COMPLETE)
+
+    def test_range_requests(self):
+        pk = self.create()['id']
+        self.upload(pk, 0, CONTENT)
+
+        response, body = self.download(pk, HTTP_RANGE='bytes=1000-1999')
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(body, CONTENT[1000:2000])
+        self.assertEqual(response['Content-Range'], f'bytes 1000-1999/{len(CONTENT)}')
+        self.assertEqual(self.download(pk, HTTP_RANGE='bytes=-10')[1], CONTENT[-10:])
+        self.assertEqual(self.download(pk, HTTP_RANGE='bytes=255990-')[1], CONTENT[255990:])
+
+        response, _ = self.download(pk, HTTP_RANGE=f'bytes={len(CONTENT)}-')
+        self.assertEqual(response.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(CONTENT)}')
+        # Several ranges, or a stale If-Range, get the whole file
+        self.assertEqual(self.download(pk, HTTP_RANGE='bytes=0-1,5-6')[1], CONTENT)
+        self.assertEqual(self.download(pk, HTTP_RANGE='bytes=0-1', HTTP_IF_RANGE='"x"')[1],
+                         CONTENT)
+
+        etag = self.download(pk)[0]['ETag']
+        response, _ = self.download(pk, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_metadata_on_tasks_and_permissions(self):
+        for _ in range(2):
+            self.upload(self.create(b'abc')['id'], 0, b'abc')
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('task-list'))
+        self.assertEqual([a['size'] for a in response.data[0]['attachments']], [3, 3])
+        self.assertFalse(archivable_tasks().exists())
+
+        # Viewers of the project may download but not attach or delete
+        self.client.force_authenticate(user=self.bob)
+        pk = response.data[0]['attachments'][0]['id']
+        self.assertEqual(self.download(pk)[1], b'abc')
+        response = self.client.post(reverse('attachment-list'), {
+            'task': self.task.pk, 'filename': 'x.txt', 'size': 1,
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.upload(pk, 3, b'x').status_code, status.HTTP_403_FORBIDDEN)
+        url = reverse('attachment-detail', args=[pk])
+        self.assertEqual(self.client.delete(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(user=self.alice)
+        path = TaskAttachment.objects.get(pk=pk).file.path
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(self.client.delete(url).status_code, status.HTTP_204_NO_CONTENT)
+        with self.assertRaises(FileNotFoundError):
+            open(path, 'rb')
@@ -0,0 +1,46 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from projects.models import Project
+from tasks.benchmarks import BENCH_PASSWORD, percentile, run_benchmark
+from tasks.models import Task
+from users.models import User
+
+
+class BenchmarkToolsTest(TestCase):
+    def test_seed_data_creates_requested_rows(self):
+        call_command('seed_data', users=3, projects_per_user=2,
+                     tasks_per_project=5, stdout=StringIO())
+        self.assertEqual(User.objects.filter(username__startswith='bench_user_').count(), 3)
+        self.assertEqual(Project.objects.count(), 6)
+        self.assertEqual(Task.objects.count(), 30)
+
+    def test_percentile_nearest_rank(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 50), 50)
+        self.assertEqual(percentile(values, 99), 99)
+        self.assertIsNone(percentile([], 95))
+
+    def test_run_benchmark_reports_latency_and_queries(self):
+        call_command('seed_data', users=2, projects_per_user=1,
+                     tasks_per_project=3, stdout=StringIO())
+        # More logins than the per-username budget allows
+        results = run_benchmark('bench_user_000001', BENCH_PASSWORD,
+                                iterations=6, warmup=0,
+                                only=['login', 'task_list', 'profile'],
+                                host='testserver')
+        self.assertEqual(set(results), {'login', 'task_list', 'profile'})
+        for stats in results.values():
+            self.assertEqual(stats['status_codes'], {'200': 6})
+            self.assertGreater(stats['queries_mean'], 0)
+            self.assertLessEqual(stats['p50_ms'], stats['p99_ms'])
+
+    def test_benchmark_startup_profiles_api_settings(self):
+        out = StringIO()
+        call_command('benchmark_startup', settings_modules=['config.settings_api'],
+                     entries=['wsgi', 'asgi'], runs=1, stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertIn('config.settings_api   wsgi', lines[1])
+        self.assertIn('config.settings_api   asgi', lines[3])
+        self.assertNotIn('admin', out.getvalue())
@@ -0,0 +1,148 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from projects.models import Project, ProjectMembership
+from users.models import User
+from tasks.dependencies import DependencyCycleError, _order_key, compute_schedule
+from tasks.models import Task
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=dt_timezone.utc)
+
+
+def spec(day, days):
+    return {'due_date': utc(2025, 1, day), 'estimate': timedelta(days=days)}
+
+
+class ComputeScheduleTest(SimpleTestCase):
+    def test_longest_chain_is_critical(self):
+        # 1 -> 2 -> 4 takes five days, 1 -> 3 -> 4 only three
+        tasks = {1: spec(2, 1), 2: spec(5, 3), 3: spec(5, 1), 4: spec(6, 1)}
+        schedule = compute_schedule(tasks, [(1, 2), (1, 3), (2, 4), (3, 4)])
+
+        self.assertEqual(schedule['critical_path'], [1, 2, 4])
+        self.assertEqual(schedule['tasks'][4]['earliest_finish'], utc(2025, 1, 6))
+        self.assertEqual(schedule['tasks'][3]['slack_hours'], 48)
+        self.assertEqual(schedule['tasks'][4]['slack_hours'], 0)
+
+    def test_missed_due_date_has_negative_slack(self):
+        schedule = compute_schedule({1: spec(2, 1), 2: spec(2, 2)}, [(1, 2)])
+        self.assertEqual(schedule['tasks'][2]['slack_hours'], -48)
+        self.assertEqual(schedule['critical_path'], [1, 2])
+
+    def test_cycle_is_rejected(self):
+        with self.assertRaises(DependencyCycleError):
+            compute_schedule({1: spec(2, 1), 2: spec(3, 1)}, [(1, 2), (2, 1)])
+
+
+class DependencyAPITest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = User.objects.create_user(
+            username='alice', email='alice@x.com', password='pass', role='user'
+        )
+        cls.bob = User.objects.create_user(
+            username='bob', email='bob@x.com', password='pass', role='user'
+        )
+        cls.project = Project.objects.create(name='Launch', due_date='2025-02-01',
+                                             owner=cls.alice)
+        cls.other = Project.objects.create(name='Other', due_date='2025-02-01',
+                                           owner=cls.alice)
+        cls.a, cls.b, cls.c = [
+            Task.objects.create(title=title, due_date=utc(2025, 1, day), assigned_to=cls.alice,
+                                project=cls.project, estimate=timedelta(days=1))
+            for title, day in (('Design', 3), ('Build', 4), ('Ship', 5))
+        ]
+        cls.stray = Task.objects.create(title='Elsewhere', due_date=utc(2025, 1, 9),
+                                        assigned_to=cls.alice, project=cls.other)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(user=self.alice)
+
+    def link(self, blocker, blocked):
+        return self.client.post(reverse('dependency-list'),
+                                {'blocker': blocker.pk, 'blocked': blocked.pk})
+
+    def schedule(self):
+        return self.client.get(reverse('project-schedule', args=[self.project.pk]))
+
+    def test_create_and_reject_cycle(self):
+        self.assertEqual(self.link(self.a, self.b).status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.link(self.b, self.c).status_code, status.HTTP_201_CREATED)
+
+        response = self.link(self.c, self.a)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.link(self.a, self.stray).status_code,
+                         status.HTTP_400_BAD_REQUEST)
+
+    def test_other_users_cannot_link_or_see(self):
+        self.link(self.a, self.b)
+        self.client.force_authenticate(user=self.bob)
+        self.assertEqual(self.link(self.b, self.c).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(reverse('dependency-list')).data, [])
+
+    def test_cycles_are_checked_against_stored_edges(self):
+        self.link(self.a, self.b)
+        # An order cached by another process, before A -> B existed
+        cache.set(_order_key(self.project.pk), [self.b.pk, self.a.pk, self.c.pk])
+        self.assertEqual(self.link(self.b, self.a).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_moving_a_task_drops_its_edges(self):
+        self.link(self.a, self.b)
+        self.link(self.b, self.c)
+        self.assertEqual(len(self.schedule().data['critical_path']), 3)
+
+        self.b.project = self.other
+        self.b.save()
+        self.assertEqual(self.client.get(reverse('dependency-list')).data, [])
+        self.assertEqual(len(self.schedule().data['critical_path']), 1)
+
+    def test_viewers_cannot_delete_edges(self):
+        edge = self.link(self.a, self.b).data['id']
+        ProjectMembership.objects.create(project=self.project, user=self.bob,
+                                         role=ProjectMembership.ROLE_VIEWER)
+        self.client.force_authenticate(user=self.bob)
+        self.assertEqual(len(self.client.get(reverse('dependency-list')).data), 1)
+        url = reverse('dependency-detail', args=[edge])
+        self.assertEqual(self.client.delete(url).status_code, status.HTTP_404_NOT_FOUND)
+
+        self.client.force_authenticate(user=self.alice)
+        self.assertEqual(self.client.delete(url).status_code, status.HTTP_204_NO_CONTENT)
+
+    def test_schedule_is_cached_until_a_change(self):
+        self.link(self.a, self.b)
+        self.link(self.b, self.c)
+        response = self.schedule()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['critical_path'], [self.a.pk, self.b.pk, self.c.pk])
+
+        with self.assertNumQueries(1):  # the project lookup; the schedule is cached
+            self.schedule()
+
+        self.b.estimate = timedelta(days=10)
+        self.b.save()
+        rows = {row['id']: row for row in self.schedule().data['tasks']}
+        self.assertEqual(rows[self.c.pk]['earliest_finish'], utc(2025, 1, 14))
+        self.assertLess(rows[self.c.pk]['slack_hours'], 0)
+
+    def test_only_schedule_fields_invalidate(self):
+        self.link(self.a, self.b)
+        self.schedule()
+        task = Task.objects.get(pk=self.c.pk)
+        task.title = 'Ship it'
+        task.status = 'in-progress'
+        task.save()
+        with self.assertNumQueries(1):
+            self.schedule()
+
+        task.due_date = utc(2025, 1, 20)
+        task.save()
+        self.assertIsNotNone(cache.get(_order_key(self.project.pk)))
+        rows = {row['id']: row for row in self.schedule().data['tasks']}
+        self.assertEqual(rows[self.c.pk]['latest_finish'], utc(2025, 1, 20))
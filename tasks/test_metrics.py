@@ -0,0 +1,102 @@
+from datetime import date, datetime, time, timedelta
+
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from projects.models import Project
+from users.models import User
+from tasks.metrics import chart, period_start
+from tasks.models import ArchivedTask, Task
+
+
+def noon(day):
+    return timezone.make_aware(datetime.combine(day, time(12)))
+
+
+class CompletionChartTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='alice', email='alice@x.com', password='pass', role='user'
+        )
+        cls.project = Project.objects.create(name='Launch', due_date='2025-02-01', owner=cls.user)
+        cls.week = period_start(timezone.localdate(), 'week')
+        weeks_ago = lambda n: cls.week - timedelta(weeks=n)
+        cls.first = cls.make(weeks_ago(3), weeks_ago(2))
+        cls.second = cls.make(weeks_ago(3), weeks_ago(1))
+        cls.make(weeks_ago(2))
+        ArchivedTask.objects.create(
+            id=999, title='Old', due_date=noon(weeks_ago(4)), assigned_to=cls.user,
+            project=cls.project, completed_at=noon(weeks_ago(4)),
+            created_at=noon(weeks_ago(5)), updated_at=noon(weeks_ago(4)),
+        )
+
+    @classmethod
+    def make(cls, created, completed=None):
+        task = Task.objects.create(title='Task', due_date=noon(created), assigned_to=cls.user,
+                                   project=cls.project, completed=completed is not None)
+        Task.objects.filter(pk=task.pk).update(
+            created_at=noon(created), completed_at=completed and noon(completed),
+        )
+        return task
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(user=self.user)
+        self.start = self.week - timedelta(weeks=3)
+
+    def series(self, kind, key, **params):
+        response = self.client.get(reverse(f'project-{kind}', args=[self.project.pk]),
+                                   {'start': self.start.isoformat(), **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data, [point[key] for point in response.data['series']]
+
+    def test_completion_is_stamped_and_cleared(self):
+        url = reverse('task-detail', args=[self.first.pk])
+        self.client.patch(url, {'completed': False}, format='json')
+        self.assertIsNone(Task.objects.get(pk=self.first.pk).completed_at)
+        before = timezone.now()
+        response = self.client.patch(url, {'completed': True}, format='json')
+        self.assertGreaterEqual(Task.objects.get(pk=self.first.pk).completed_at, before)
+        self.assertIsNotNone(response.data['completed_at'])
+
+    def test_burnup_burndown_and_velocity(self):
+        data, scope = self.series('burnup', 'scope')
+        self.assertEqual(scope, [3, 4, 4, 4])
+        self.assertEqual([p['completed'] for p in data['series']], [1, 2, 3, 3])
+        self.assertEqual(data['series'][0]['date'], self.start)
+        self.assertEqual(self.series('burndown', 'remaining')[1], [2, 2, 1, 1])
+        data, completed = self.series('velocity', 'completed')
+        self.assertEqual(completed, [0, 1, 1, 0])
+        self.assertEqual(data['average'], 0.67)
+
+    def test_closed_periods_are_cached_until_history_changes(self):
+        scope = ('project', self.project.pk)
+        chart('burnup', scope, start=self.start)
+        # Only the current week is counted again, in each tier
+        with self.assertNumQueries(4):
+            chart('burnup', scope, start=self.start)
+
+        # Reopening a task finished two weeks ago rewrites closed periods
+        task = Task.objects.get(pk=self.first.pk)
+        task.completed = False
+        task.save()
+        done = [p['completed'] for p in chart('burnup', scope, start=self.start)['series']]
+        self.assertEqual(done, [1, 1, 2, 2])
+
+    def test_user_charts(self):
+        url = reverse('user-chart', args=['velocity'])
+        response = self.client.get(url, {'start': self.start.isoformat()})
+        self.assertEqual([p['completed'] for p in response.data['series']], [0, 1, 1, 0])
+        self.assertEqual(self.client.get(url, {'user': self.user.pk}).status_code,
+                         status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.client.get(url, {'period': 'year'}).status_code,
+                         status.HTTP_400_BAD_REQUEST)
+        future = {'start': '2999-01-01', 'end': '2999-02-01'}
+        self.assertEqual(self.client.get(url, future).status_code, status.HTTP_400_BAD_REQUEST)
+        series = chart('burndown', ('user', self.user.pk), start=date(2999, 1, 1))['series']
+        self.assertEqual(series, [])
+        self.assertEqual(self.client.get(reverse('user-chart', args=['pie'])).status_code,
+                         status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,264 @@
+"""
+Query plan regression tests.
+
+Every TaskViewSet filter x ordering x search combination, the
+ProjectViewSet filters, orderings and search, and the profile endpoint are
+requested against a seeded dataset. Each SELECT they run is EXPLAINed, and
+the normalised plans are compared with the golden file for the database
+vendor in ``tasks/query_plans/``. A changed plan fails with a unified diff.
+Run with ``UPDATE_QUERY_PLANS=1`` to accept the new plans and rewrite the
+golden file.
+
+Plans are also checked directly. No request may read a whole large table,
+whether by a table scan or by walking an entire index, nor sort rows it
+hasn't narrowed down by an equality search on a large table; and the
+listed scenarios must use one of their expected indexes. On PostgreSQL
+sequential scans, hash joins and merge joins are disabled for the EXPLAIN,
+so reading a whole table means that no usable index exists, however small
+the test tables are.
+"""
+import difflib
+import os
+import re
+from pathlib import Path
+
+from django.core.management.color import no_style
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from projects.models import Project, ProjectAccess
+from projects.views import ProjectViewSet
+from tasks.benchmarks import BENCH_USER_PREFIX, User, generate_dataset
+from tasks.models import Task
+from tasks.ranking import column_of
+from tasks.views import TaskViewSet
+
+GOLDEN_DIR = Path(__file__).resolve().parent / 'query_plans'
+LARGE_TABLES = ['tasks_task', 'projects_projectaccess', 'users_user']
+
+
+def leading_indexes(field, foreign_key_index=None):
+    """Task indexes whose first column is ``field``, plus its FK index if any."""
+    names = tuple(index.name for index in Task._meta.indexes
+                  if index.fields[0] == field and index.condition is None)
+    return names + ((foreign_key_index,) if foreign_key_index else ())
+
+
+# Scenario name prefix -> indexes, one of which must appear in its plan. Any
+# index leading with the filtered column serves the filter, and which one
+# the planner picks depends on table sizes. FK indexes are named by the
+# schema editor, alike on every backend; SQLite names the index behind the
+# (user, project) unique constraint itself.
+EXPECTED_INDEXES = {
+    'tasks filter=due_date ': leading_indexes('due_date'),
+    'tasks filter=assigned_to__username ': leading_indexes(
+        'assigned_to', 'tasks_task_assigned_to_id_e8821f61'),
+    'tasks filter=project ': leading_indexes('project', 'tasks_task_project_id_a2815f0c'),
+    'tasks board': ('tasks_task_board_idx',),
+    'tasks user board': ('tasks_task_user_board_idx',),
+    'projects': ('projects_access_unique', 'sqlite_autoindex_projects_projectaccess_1',
+                 'projects_access_user_idx'),
+    'profile': leading_indexes('assigned_to', 'tasks_task_assigned_to_id_e8821f61'),
+}
+
+
+def task_filter_params(project_id):
+    samples = {
+        'due_date': '2025-01-15T00:00:00Z',
+        'priority': 3,
+        'assigned_to__username': f'{BENCH_USER_PREFIX}000002',
+        'completed': 'false',
+        'project': project_id,
+        'status': 'in-progress',
+    }
+    params = [None]
+    for field, lookups in TaskViewSet.filterset_fields.items():
+        for lookup in lookups:
+            name = field if lookup == 'exact' else f'{field}__{lookup}'
+            if lookup == 'isnull':
+                value = 'true'
+            else:
+                value = samples[field] if lookup != 'icontains' else samples[field][-6:]
+            params.append((name, value))
+    return params
+
+
+def scenarios(project_id):
+    orderings = [None] + [prefix + field for field in TaskViewSet.ordering_fields
+                          for prefix in ('', '-')]
+    for task_filter in task_filter_params(project_id):
+        for ordering in orderings:
+            for search in (None, 'review'):
+                params = dict([task_filter] if task_filter else [])
+                if ordering:
+                    params['ordering'] = ordering
+                if search:
+                    params['search'] = search
+                name = (f'tasks filter={task_filter[0] if task_filter else "-"} '
+                        f'ordering={ordering or "-"} search={search or "-"}')
+                yield name, reverse('task-list'), params
+    # A Kanban column in manual order
+    yield ('tasks board', reverse('task-list'),
+           {'project': project_id, 'status': 'todo', 'ordering': 'rank'})
+    # A column of the user's own tasks without a project
+    yield ('tasks user board', reverse('task-list'),
+           {'project__isnull': 'true', 'status': 'todo', 'ordering': 'rank'})
+
+    project_params = [
+        ('status', 'completed'), ('priority', 'urgent'),
+        ('task_count_min', 10), ('completion_percentage_min', 50),
+        ('next_due_date_after', '2025-01-01T00:00:00Z'), ('search', 'review'),
+    ] + [('ordering', prefix + field) for field in ProjectViewSet.ordering_fields
+         for prefix in ('', '-')]
+    yield 'projects', reverse('project-list'), {}
+    for key, value in project_params:
+        yield f'projects {key}={value}', reverse('project-list'), {key: value}
+    yield 'profile', reverse('profile'), {}
+
+
+def explain(sql):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute('SET LOCAL enable_hashjoin = off')
+            cursor.execute('SET LOCAL enable_mergejoin = off')
+            cursor.execute('EXPLAIN (COSTS OFF) ' + sql)
+            return [row[0] for row in cursor.fetchall()]
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql)
+        depth, lines = {0: -1}, []
+        for node, parent, _, detail in cursor.fetchall():
+            depth[node] = depth.get(parent, -1) + 1
+            lines.append('  ' * depth[node] + detail)
+        return lines
+
+
+def normalise(line):
+    """Drop values that vary between runs: literals, ids and counts."""
+    line = re.sub(r"'[^']*'", "'?'", line)
+    return re.sub(r'\b\d+(\.\d+)?\b', 'N', line)
+
+
+def full_scans(lines):
+    """Reads of every row of a large table: table scans and whole-index walks."""
+    scans = []
+    for n, line in enumerate(lines):
+        text = line.strip()
+        for table in LARGE_TABLES:
+            # An index scan without an Index Cond walks the whole index
+            index_walk = (re.match(rf'(-> +)?Index (Only )?Scan (Backward )?using \w+ on {table}\b',
+                                   text)
+                          and not (n + 1 < len(lines) and 'Index Cond:' in lines[n + 1]))
+            if re.match(rf'(-> +)?Seq Scan on {table}\b', text) or index_walk \
+                    or re.fullmatch(rf'SCAN {table}( AS \w+)?( USING (COVERING )?INDEX \w+)?', text):
+                scans.append(text)
+    return scans
+
+
+def unbounded_sorts(lines):
+    """
+    Top-level sorts (SQLite's temp B-tree) of one query whose driving loop
+    reads a large table without an equality bound, so the sort grows with
+    the table rather than with the user's share of it.
+    """
+    if 'USE TEMP B-TREE FOR ORDER BY' not in lines:
+        return []
+    driving = next((line for line in lines if not line.startswith(' ')), '')
+    for table in LARGE_TABLES:
+        if re.match(rf'(SCAN|SEARCH) {table}\b', driving) and not re.search(r'\w=\?', driving):
+            return [driving]
+    return []
+
+
+class QueryPlanRegressionTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        if connection.vendor == 'postgresql':
+            # Rolled-back runs on a reused test database leave dead rows
+            # behind and ANALYZE's table sizes survive the rollback, so start
+            # the seeded tables from new, empty files (TRUNCATE is rolled back
+            # with the test)
+            tables = [model._meta.db_table for model in (User, Project, ProjectAccess, Task)]
+            with connection.cursor() as cursor:
+                for sql in connection.ops.sql_flush(no_style(), tables, allow_cascade=True):
+                    cursor.execute(sql)
+        generate_dataset(users=200, projects_per_user=3, tasks_per_project=40, seed=7)
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                # Flush rows parked in GIN pending lists, as autovacuum would;
+                # otherwise the planner prices every trigram probe as a scan
+                cursor.execute(
+                    "SELECT gin_clean_pending_list(c.oid) FROM pg_class c "
+                    "JOIN pg_am am ON am.oid = c.relam WHERE am.amname = 'gin'"
+                )
+            cursor.execute('ANALYZE')
+        cls.user = User.objects.get(username=f'{BENCH_USER_PREFIX}000001')
+        cls.project = Project.objects.filter(owner=cls.user).order_by('pk').first()
+
+    def capture_plans(self):
+        client = APIClient()
+        client.force_authenticate(user=self.user)
+        plans = {}
+        for name, url, params in scenarios(self.project.pk):
+            with CaptureQueriesContext(connection) as ctx:
+                response = client.get(url, params)
+            self.assertEqual(response.status_code, 200, name)
+            plans[name] = [
+                [normalise(line) for line in explain(query['sql'])]
+                for query in ctx.captured_queries
+                if query['sql'].lstrip().upper().startswith('SELECT')
+            ]
+        return plans
+
+    def render(self, plans):
+        out = []
+        for name, queries in plans.items():
+            out.append(f'### {name}')
+            for n, lines in enumerate(queries, 1):
+                out.append(f'query {n}:')
+                out.extend('  ' + line for line in lines)
+            out.append('')
+        return out
+
+    def test_column_without_project_uses_its_index(self):
+        # Ranking reads a column of tasks without a project by assignee
+        task = Task(assigned_to=self.user, status=Task.STATUS_TODO)
+        with CaptureQueriesContext(connection) as ctx:
+            list(column_of(task).order_by('rank').values('pk', 'rank'))
+        lines = explain(ctx.captured_queries[0]['sql'])
+        self.assertTrue(any('tasks_task_user_board_idx' in line for line in lines), lines)
+        self.assertFalse(full_scans(lines) or unbounded_sorts(lines), lines)
+
+    def test_plans(self):
+        plans = self.capture_plans()
+
+        problems = []
+        for name, queries in plans.items():
+            lines = [line for query in queries for line in query]
+            for scan in full_scans(lines):
+                problems.append(f'{name}: full scan "{scan}"')
+            for query in queries:
+                for driving in unbounded_sorts(query):
+                    problems.append(f'{name}: temp B-tree sorts rows from "{driving}"')
+            for prefix, indexes in EXPECTED_INDEXES.items():
+                if name.startswith(prefix) and not any(
+                        re.search(rf'\b{index}\b', line) for index in indexes for line in lines):
+                    problems.append(f'{name}: none of the indexes {", ".join(indexes)} is used')
+        self.assertFalse(problems, 'Plan problems:\n' + '\n'.join(problems))
+
+        golden = GOLDEN_DIR / f'{connection.vendor}.txt'
+        actual = self.render(plans)
+        if os.environ.get('UPDATE_QUERY_PLANS'):
+            GOLDEN_DIR.mkdir(exist_ok=True)
+            golden.write_text('\n'.join(actual) + '\n')
+            return
+        if not golden.exists():
+            self.fail(f'No golden plans for {connection.vendor}; '
+                      f'run with UPDATE_QUERY_PLANS=1 and commit {golden.name}.')
+        expected = golden.read_text().splitlines()
+        if expected != actual:
+            diff = difflib.unified_diff(expected, actual, f'{golden.name} (expected)',
+                                        'actual', lineterm='')
+            self.fail('Query plans changed (rerun with UPDATE_QUERY_PLANS=1 if intended):\n'
+                      + '\n'.join(diff))
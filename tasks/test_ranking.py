@@ -0,0 +1,109 @@
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from jobs.models import Job
+from projects.models import Project
+from users.models import User
+from tasks import ranking
+from tasks.models import Task
+
+
+class BoardRankTest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username='alice', email='alice@x.com', password='pass', role='user'
+        )
+        cls.other = User.objects.create_user(
+            username='bob', email='bob@x.com', password='pass', role='user'
+        )
+        cls.project = Project.objects.create(name='Board', due_date='2025-02-01', owner=cls.user)
+        cls.a, cls.b, cls.c = (
+            Task.objects.create(title=title, due_date='2025-01-01T00:00:00Z',
+                                assigned_to=cls.user, project=cls.project)
+            for title in 'ABC'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(user=self.user)
+
+    def column(self, status_=Task.STATUS_TODO):
+        response = self.client.get(reverse('task-list'), {
+            'project': self.project.pk, 'status': status_, 'ordering': 'rank',
+        })
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [task['title'] for task in response.data]
+
+    def move(self, task, status_=Task.STATUS_TODO, **neighbours):
+        return self.client.post(reverse('task-move', args=[task.pk]),
+                                {'status': status_, **neighbours}, format='json')
+
+    def test_new_tasks_are_appended(self):
+        self.assertEqual([self.a.rank, self.b.rank, self.c.rank], [1.0, 2.0, 3.0])
+        self.assertEqual(self.column(), ['A', 'B', 'C'])
+
+    def test_move_writes_only_the_moved_row(self):
+        task = Task.objects.get(pk=self.c.pk)
+        task.status = Task.STATUS_TODO
+        with self.assertNumQueries(1):
+            ranking.place(task, after=self.a)
+        self.assertEqual(task.rank, 1.5)
+
+        response = self.move(self.c, after=self.a.pk)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.column(), ['A', 'C', 'B'])
+        self.move(self.b, before=self.a.pk)
+        self.assertEqual(self.column(), ['B', 'A', 'C'])
+        self.assertEqual(Task.objects.get(pk=self.a.pk).rank, 1.0)
+
+    def test_moving_across_columns_keeps_completed_in_step(self):
+        response = self.move(self.a, Task.STATUS_COMPLETED)
+        self.assertTrue(response.data['completed'])
+        self.assertEqual(self.column(Task.STATUS_COMPLETED), ['A'])
+        self.move(self.b, Task.STATUS_COMPLETED, before=self.a.pk)
+        self.assertEqual(self.column(Task.STATUS_COMPLETED), ['B', 'A'])
+
+        # Reopening through a plain update puts the task at the end of To Do
+        self.client.patch(reverse('task-detail', args=[self.a.pk]), {'completed': False},
+                          format='json')
+        self.assertEqual(self.column(), ['C', 'A'])
+
+    def test_tasks_without_a_project_form_their_assignees_columns(self):
+        own = [Task.objects.create(title=title, due_date='2025-01-01T00:00:00Z',
+                                   assigned_to=self.user) for title in 'DE']
+        Task.objects.create(title='F', due_date='2025-01-01T00:00:00Z', assigned_to=self.other)
+        self.assertEqual([own[0].rank, own[1].rank], [1.0, 2.0])
+        self.move(own[1], before=own[0].pk)
+
+        response = self.client.get(reverse('task-list'), {
+            'project__isnull': 'true', 'status': Task.STATUS_TODO, 'ordering': 'rank',
+        })
+        self.assertEqual([task['title'] for task in response.data], ['E', 'D'])
+
+    def test_neighbours_must_be_in_the_target_column(self):
+        response = self.move(self.a, Task.STATUS_REVIEW, after=self.b.pk)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.client.force_authenticate(user=self.other)
+        self.assertEqual(self.move(self.a).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_narrow_gaps_queue_a_rebalance_and_ties_rebalance_inline(self):
+        # Each move halves the gap after A; below the minimum, one job is queued
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(24):
+                self.move((self.c, self.b)[i % 2], after=self.a.pk)
+        jobs = Job.objects.filter(name='tasks.rebalance_ranks')
+        self.assertEqual(jobs.count(), 1)
+        self.assertEqual(jobs.get().payload, {'project_id': self.project.pk,
+                                              'assigned_to_id': None, 'status': 'todo'})
+        ranking.rebalance_column(**jobs.get().payload)
+        self.assertEqual(list(Task.objects.filter(project=self.project).order_by('rank')
+                              .values_list('title', 'rank')),
+                         [('A', 1.0), ('B', 2.0), ('C', 3.0)])
+
+        # bulk_create() leaves ranks tied at 0
+        Task.objects.filter(project=self.project).update(rank=0)
+        self.move(self.a, after=self.c.pk)
+        self.assertEqual(len(set(Task.objects.values_list('rank', flat=True))), 3)
+        self.assertEqual(self.column()[-1], 'A')
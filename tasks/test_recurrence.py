@@ -0,0 +1,104 @@
+from datetime import datetime, timezone as dt_timezone
+
+from django.test import SimpleTestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from users.models import User
+from tasks.models import Task
+from tasks.recurrence import occurrence_dates
+
+
+def utc(*args):
+    return datetime(*args, tzinfo=dt_timezone.utc)
+
+
+class OccurrenceDatesTest(SimpleTestCase):
+    def dates(self, start, end, **fields):
+        return list(occurrence_dates(Task(**fields), start, end))
+
+    def test_weekly_jumps_into_window(self):
+        dates = self.dates(utc(2025, 3, 1), utc(2025, 3, 20),
+                           due_date=utc(2024, 1, 1, 9), recurrence='weekly')
+        self.assertEqual(dates, [utc(2025, 3, 3, 9), utc(2025, 3, 10, 9), utc(2025, 3, 17, 9)])
+
+    def test_daily_interval_and_until(self):
+        dates = self.dates(utc(2025, 1, 1), utc(2025, 2, 1),
+                           due_date=utc(2025, 1, 1), recurrence='daily',
+                           recurrence_interval=10, recurrence_until=utc(2025, 1, 21))
+        self.assertEqual(dates, [utc(2025, 1, 1), utc(2025, 1, 11), utc(2025, 1, 21)])
+
+    def test_monthly_clamps_to_month_end(self):
+        dates = self.dates(utc(2025, 1, 1), utc(2025, 5, 1),
+                           due_date=utc(2024, 1, 31), recurrence='monthly')
+        self.assertEqual(dates, [utc(2025, 1, 31), utc(2025, 2, 28),
+                                 utc(2025, 3, 31), utc(2025, 4, 30)])
+
+
+class RecurringTaskAPITest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = User.objects.create_user(
+            username='alice', email='alice@x.com', password='pass', role='user'
+        )
+        cls.series = Task.objects.create(
+            title='Standup notes', due_date='2025-01-06T09:00:00Z',
+            assigned_to=cls.alice, recurrence='weekly',
+        )
+        Task.objects.create(title='One-off', due_date='2025-02-05T12:00:00Z',
+                            assigned_to=cls.alice)
+
+    def setUp(self):
+        self.client.force_authenticate(user=self.alice)
+        self.url = reverse('task-list')
+        self.window = {'start': '2025-02-01T00:00:00Z', 'end': '2025-02-15T00:00:00Z'}
+
+    def test_window_expands_series(self):
+        resp = self.client.get(self.url, self.window)
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(t['title'], t['due_date'], t['id']) for t in resp.data],
+            [('Standup notes', '2025-02-03T09:00:00Z', None),
+             ('One-off', '2025-02-05T12:00:00Z', Task.objects.get(title='One-off').id),
+             ('Standup notes', '2025-02-10T09:00:00Z', None)],
+        )
+        self.assertEqual(resp.data[0]['recurrence_parent'], self.series.id)
+
+    def test_window_requires_both_bounds(self):
+        resp = self.client.get(self.url, {'start': '2025-02-01T00:00:00Z'})
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_completed_occurrence_is_stored_and_replaces_virtual_one(self):
+        occurrences = reverse('task-occurrences', args=[self.series.id])
+        resp = self.client.post(occurrences, {
+            'occurrence_date': '2025-02-10T09:00:00Z', 'completed': True,
+        }, format='json')
+        self.assertEqual(resp.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(resp.data['completed'])
+        self.assertEqual(Task.objects.filter(recurrence_parent=self.series).count(), 1)
+
+        # Editing again updates the same row
+        resp = self.client.post(occurrences, {
+            'occurrence_date': '2025-02-10T09:00:00Z', 'title': 'Standup (moved)',
+            'due_date': '2025-02-11T09:00:00Z',
+        }, format='json')
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+
+        resp = self.client.get(self.url, self.window)
+        self.assertEqual([t['title'] for t in resp.data],
+                         ['Standup notes', 'One-off', 'Standup (moved)'])
+        self.assertIsNotNone(resp.data[2]['id'])
+
+    def test_rejects_dates_off_the_series(self):
+        resp = self.client.post(reverse('task-occurrences', args=[self.series.id]),
+                                {'occurrence_date': '2025-02-11T09:00:00Z'}, format='json')
+        self.assertEqual(resp.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_query_count_does_not_grow_with_series(self):
+        for n in range(20):
+            Task.objects.create(title=f'Series {n}', due_date='2025-01-01T08:00:00Z',
+                                assigned_to=self.alice, recurrence='daily')
+        # Plain rows, series, overrides, and the plain rows' attachments
+        with self.assertNumQueries(4):
+            resp = self.client.get(self.url, self.window)
+        self.assertEqual(len(resp.data), 1 + 2 + 20 * 14)
@@ -0,0 +1,57 @@
+from unittest import skipUnless
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.test import SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITransactionTestCase
+from config.db_router import ReplicaRouter, reading_from_replica
+from tasks.models import Task
+from users.models import User
+
+
+@override_settings(DATABASE_REPLICAS=['replica_1'])
+class ReplicaRouterTest(SimpleTestCase):
+    def test_reads_use_primary_unless_opted_in(self):
+        router = ReplicaRouter()
+        self.assertIsNone(router.db_for_read(Task))
+        with reading_from_replica():
+            self.assertEqual(router.db_for_read(Task), 'replica_1')
+            self.assertEqual(router.db_for_write(Task), 'default')
+        self.assertIsNone(router.db_for_read(Task))
+
+    def test_replicas_are_not_migrated(self):
+        router = ReplicaRouter()
+        self.assertTrue(router.allow_migrate('default', 'tasks'))
+        self.assertFalse(router.allow_migrate('replica_1', 'tasks'))
+
+
+@skipUnless(settings.DATABASE_REPLICAS, 'set DB_REPLICA_HOSTS to run against a replica alias')
+class ReplicaRoutingViewTest(APITransactionTestCase):
+    # Mirrored aliases use separate connections, so test data must be committed
+    databases = {'default', *settings.DATABASE_REPLICAS}
+
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create_user(
+            username='alice', email='alice@x.com', password='pass', role='user'
+        )
+        self.client.force_authenticate(user=self.alice)
+        self.replica = connections[settings.DATABASE_REPLICAS[0]]
+
+    def test_list_reads_from_replica(self):
+        with CaptureQueriesContext(self.replica) as ctx:
+            self.client.get(reverse('task-list'))
+        self.assertEqual(len(ctx.captured_queries), 1)
+
+    def test_reads_stick_to_primary_after_a_write(self):
+        self.client.post(reverse('task-list'), {
+            'title': 'New', 'due_date': '2030-01-01T00:00:00Z',
+            'assigned_to': self.alice.id,
+        }, format='json')
+        with CaptureQueriesContext(self.replica) as ctx:
+            resp = self.client.get(reverse('task-list'))
+        self.assertEqual(len(ctx.captured_queries), 0)
+        self.assertEqual(len(resp.data), 1)
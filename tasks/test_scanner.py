@@ -0,0 +1,122 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from users.models import User
+from tasks.models import Notification, ScannerWatermark, Task
+from tasks.scanner import scan_due_tasks
+
+
+class DueDateScannerTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.now = timezone.now()
+        cls.alice = User.objects.create_user(
+            username='alice', email='alice@x.com', password='pass', role='user'
+        )
+        cls.bob = User.objects.create_user(
+            username='bob', email='bob@x.com', password='pass', role='user'
+        )
+
+    def task(self, user, hours, **fields):
+        return Task.objects.create(title='t', assigned_to=user,
+                                   due_date=self.now + timedelta(hours=hours), **fields)
+
+    def test_scans_only_the_window_since_the_watermark(self):
+        soon = self.task(self.alice, 5)
+        late = self.task(self.alice, -2)
+        self.task(self.alice, -3, completed=True)
+        self.task(self.bob, 48)  # not due within the lead time yet
+        # Past due before the initial lookback: flagged, but no notice
+        ancient = self.task(self.bob, -24 * 30)
+
+        result = scan_due_tasks(now=self.now)
+        self.assertEqual((result['reminders'], result['overdue']), (1, 1))
+        self.assertEqual(
+            set(Notification.objects.values_list('task_id', 'kind')),
+            {(soon.id, 'reminder'), (late.id, 'overdue')},
+        )
+        late.refresh_from_db()
+        ancient.refresh_from_db()
+        self.assertTrue(late.overdue)
+        self.assertTrue(ancient.overdue)
+
+        # The next run only sees what crossed a threshold since
+        later = self.task(self.bob, 30)
+        result = scan_due_tasks(now=self.now + timedelta(hours=7))
+        self.assertEqual((result['reminders'], result['overdue']), (1, 1))
+        self.assertTrue(Notification.objects.filter(task=later, kind='reminder').exists())
+        self.assertTrue(Notification.objects.filter(task=soon, kind='overdue').exists())
+
+    def test_rerunning_a_window_is_idempotent(self):
+        self.task(self.alice, -1)
+        scan_due_tasks(now=self.now)
+        ScannerWatermark.objects.update(scanned_until=self.now - timedelta(days=1))
+        result = scan_due_tasks(now=self.now)
+        self.assertEqual(Notification.objects.count(), 1)
+        self.assertEqual(result['overdue'], 0)
+
+    def test_tasks_changed_into_the_lead_time_get_reminders(self):
+        scan_due_tasks(now=self.now)
+        # Created after the last run, due sooner than the lead time away
+        task = self.task(self.alice, 2)
+        Task.objects.filter(pk=task.pk).update(updated_at=self.now + timedelta(minutes=5))
+        untouched = self.task(self.bob, 3)
+        Task.objects.filter(pk=untouched.pk).update(updated_at=self.now - timedelta(hours=1))
+
+        result = scan_due_tasks(now=self.now + timedelta(minutes=10))
+        self.assertEqual(result['reminders'], 1)
+        self.assertEqual(list(Notification.objects.values_list('task_id', 'kind')),
+                         [(task.id, 'reminder')])
+
+    def test_series_occurrences_are_notified(self):
+        hour = timedelta(hours=1)
+        series = self.task(self.alice, -71, recurrence=Task.RECURRENCE_DAILY)
+        Task.objects.filter(pk=series.pk).update(updated_at=self.now - 80 * hour)
+        # A completed occurrence is a stored row of its own
+        self.task(self.alice, -23, completed=True, recurrence_parent=series,
+                  occurrence_date=self.now - 23 * hour)
+
+        result = scan_due_tasks(now=self.now)
+        self.assertEqual((result['reminders'], result['overdue']), (1, 2))
+        self.assertEqual(
+            sorted(Notification.objects.filter(task=series).values_list('kind', 'due_date')),
+            [('overdue', self.now - 71 * hour), ('overdue', self.now - 47 * hour),
+             ('reminder', self.now + hour)],
+        )
+
+        result = scan_due_tasks(now=self.now + 2 * hour)
+        self.assertEqual((result['reminders'], result['overdue']), (1, 1))
+        self.assertTrue(Notification.objects.filter(task=series, kind='reminder',
+                                                    due_date=self.now + 25 * hour).exists())
+
+    def test_shards_split_users_disjointly(self):
+        for user in (self.alice, self.bob):
+            self.task(user, -1)
+        scan_due_tasks(shard=0, shards=2, now=self.now)
+        scan_due_tasks(shard=1, shards=2, now=self.now)
+        self.assertEqual(
+            sorted(Notification.objects.values_list('user_id', flat=True)),
+            sorted([self.alice.id, self.bob.id]),
+        )
+        self.assertEqual(ScannerWatermark.objects.count(), 2)
+
+
+class OverdueFlagTest(APITestCase):
+    def test_completing_or_rescheduling_clears_overdue(self):
+        alice = User.objects.create_user(
+            username='alice', email='alice@x.com', password='pass', role='user'
+        )
+        task = Task.objects.create(title='t', assigned_to=alice, overdue=True,
+                                   due_date=timezone.now() - timedelta(days=1))
+        self.client.force_authenticate(user=alice)
+        url = reverse('task-detail', args=[task.id])
+        resp = self.client.patch(url, {'due_date': '2100-01-01T00:00:00Z'}, format='json')
+        self.assertFalse(resp.data['overdue'])
+
+        resp = self.client.patch(url, {'due_date': '2000-01-01T00:00:00Z'}, format='json')
+        self.assertTrue(resp.data['overdue'])
+        resp = self.client.patch(url, {'completed': True}, format='json')
+        self.assertFalse(resp.data['overdue'])
@@ -90,6 +90,6 @@ class TaskAPITest(APITestCase):
         t1 = Task.objects.get(title='T1')
         self.auth(self.bob)
 
-        # Bob cannot delete Alice’s task
+        # Bob cannot see, and so cannot delete, Alice’s task
         resp = self.client.delete(reverse('task-detail', args=[t1.id]))
-        self.assertEqual(resp.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,81 @@
+from unittest import mock, skipUnless
+
+from django.db import connection
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from projects.models import Project
+from users.models import User
+from tasks import typeahead
+from tasks.models import Task
+
+
+class TypeaheadAPITest(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.alice = User.objects.create_user(
+            username='alice', email='alice@x.com', password='pass', role='user'
+        )
+        cls.albert = User.objects.create_user(
+            username='albert', email='albert@x.com', password='pass', role='user'
+        )
+        cls.alfred = User.objects.create_user(
+            username='alfred', email='alfred@x.com', password='pass', role='user'
+        )
+        cls.launch = Project.objects.create(name='Release train', due_date='2025-02-01',
+                                            owner=cls.alice)
+        Project.objects.create(name='Refactor billing', due_date='2025-02-01', owner=cls.alfred)
+        for title in ('Review budget', 'Refactor the release pipeline', 'Refund', 'Deploy'):
+            Task.objects.create(title=title, due_date='2025-01-10T09:00:00Z',
+                                assigned_to=cls.alice)
+        # albert works in alice's project, so each can find the other
+        Task.objects.create(title='Release notes', due_date='2025-01-10T09:00:00Z',
+                            assigned_to=cls.albert, project=cls.launch)
+        Task.objects.create(title='Refill coffee', due_date='2025-01-10T09:00:00Z',
+                            assigned_to=cls.alfred)
+
+    def setUp(self):
+        typeahead.cache.clear()
+        self.client.force_authenticate(user=self.alice)
+
+    def suggest(self, q, **params):
+        return self.client.get(reverse('typeahead'), {'q': q, **params})
+
+    def labels(self, response, kind):
+        return [row['label'] for row in response.data[kind]]
+
+    def test_prefix_matches_ranked_and_scoped(self):
+        response = self.suggest('re')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.labels(response, 'task'),
+                         ['Refund', 'Release notes', 'Review budget',
+                          'Refactor the release pipeline'])
+        self.assertEqual(self.labels(response, 'project'), ['Release train'])
+
+    def test_users_limited_to_shared_projects(self):
+        response = self.suggest('al', types='user')
+        self.assertEqual(self.labels(response, 'user'), ['alice', 'albert'])
+        self.assertNotIn('task', response.data)
+
+    def test_limit_and_unknown_types(self):
+        self.assertEqual(len(self.suggest('re', types='task', limit=2).data['task']), 2)
+        self.assertEqual(self.suggest('re', types='task,comment').status_code,
+                         status.HTTP_400_BAD_REQUEST)
+
+    def test_hot_prefixes_are_cached(self):
+        self.suggest('ref', types='task')
+        with self.assertNumQueries(0):
+            response = self.suggest('Ref', types='task')
+        self.assertEqual(self.labels(response, 'task'),
+                         ['Refund', 'Refactor the release pipeline'])
+
+    @skipUnless(connection.vendor == 'postgresql', 'trigram ranking needs pg_trgm')
+    def test_most_similar_candidates_are_kept(self):
+        for n in range(5):
+            Task.objects.create(title=f'Write up what the budget review #{n} found',
+                                due_date='2025-01-10T09:00:00Z', assigned_to=self.alice)
+        Task.objects.create(title='Budget', due_date='2025-01-10T09:00:00Z',
+                            assigned_to=self.alice)
+        with mock.patch.object(typeahead, 'CANDIDATES', 2):
+            response = self.suggest('budget', types='task')
+        self.assertEqual(self.labels(response, 'task')[0], 'Budget')
@@ -6,6 +6,7 @@ from rest_framework import status
 from rest_framework.test import APITestCase
 from django.contrib.auth import get_user_model
 from tasks.models import Task
+from projects.models import Project
 
 User = get_user_model()
 
@@ -103,10 +104,11 @@ class TaskPermissionsTest(APITestCase):
         self.assertEqual(resp.status_code, status.HTTP_204_NO_CONTENT)
 
     def test_regular_user_cannot_delete_others_task(self):
+        # Tasks outside the user's visibility are not found at all
         self.authenticate(self.user1)
         url = reverse('task-detail', args=[self.task2.id])
         resp = self.client.delete(url)
-        self.assertEqual(resp.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
 
     def test_regular_user_can_update_own_task(self):
         self.authenticate(self.user2)
@@ -124,17 +126,44 @@ class TaskPermissionsTest(APITestCase):
         resp = self.client.patch(url,
                                  {'completed': True},
                                  format='json')
-        self.assertEqual(resp.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(resp.status_code, status.HTTP_404_NOT_FOUND)
 
-    def test_any_authenticated_user_can_list_tasks(self):
-        # Listing isn’t object‐restricted, only actions are
+    def test_regular_user_lists_only_visible_tasks(self):
+        # Listing is scoped in the queryset: own tasks only
         self.authenticate(self.user1)
         url = reverse('task-list')
         resp = self.client.get(url)
         self.assertEqual(resp.status_code, status.HTTP_200_OK)
-        # Should see both tasks (permission is at object level)
+        self.assertEqual([t['id'] for t in resp.data], [self.task1.id])
+
+    def test_admin_lists_all_tasks(self):
+        self.authenticate(self.admin)
+        resp = self.client.get(reverse('task-list'))
+        self.assertEqual(len(resp.data), 2)
+
+    def test_project_owner_sees_and_edits_tasks_in_project(self):
+        project = Project.objects.create(
+            name='Alice’s Project', due_date='2025-09-01', owner=self.user1
+        )
+        self.task2.project = project
+        self.task2.save()
+
+        self.authenticate(self.user1)
+        resp = self.client.get(reverse('task-list'))
         self.assertEqual(len(resp.data), 2)
 
+        url = reverse('task-detail', args=[self.task2.id])
+        resp = self.client.patch(url, {'completed': True}, format='json')
+        self.assertEqual(resp.status_code, status.HTTP_200_OK)
+
+    def test_visibility_is_a_single_query(self):
+        self.authenticate(self.user1)
+        url = reverse('task-list')
+        # Permission filtering and related rows come back in one query, and
+        # every listed task's attachments in one more
+        with self.assertNumQueries(2):
+            self.client.get(url)
+
     def test_task_str_representation(self):
         self.assertEqual(str(self.task1), "Alice’s Task (Low)")
         self.assertEqual(str(self.task2), "Bob’s Task (Medium)")
@@ -0,0 +1,123 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.db import connections
+from django.db.models import Case, Exists, IntegerField, OuterRef, Q, Value, When
+from django.db.models.functions import Collate, Length
+
+from projects.models import Project, ProjectAccess
+from users.models import User
+from .models import Task
+
+DEFAULT_LIMIT = 8
+MAX_LIMIT = 25
+# Below this many characters trigrams can't narrow anything; match prefixes
+MIN_TRIGRAM_LENGTH = 3
+# Rows read from the index per kind before ranking; on PostgreSQL the most
+# similar ones, so the best matches are never cut off
+CANDIDATES = 200
+
+
+class LRUCache:
+    """A small thread-safe LRU whose entries also expire after ``ttl`` seconds."""
+
+    def __init__(self, maxsize=1024, ttl=30):
+        self.maxsize, self.ttl = maxsize, ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                self._data.pop(key, None)
+                return None
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+# Hot prefixes per requester; short-lived, since new rows should show up soon
+cache = LRUCache()
+
+
+def visible_users(user):
+    """The requester, plus users they share a project with; admins see everyone."""
+    if user.is_admin():
+        return User.objects.all()
+    projects = ProjectAccess.objects.granting(user, ProjectAccess.PERMISSION_VIEW)
+    co_members = ProjectAccess.objects.filter(user=OuterRef('pk'), project__in=projects)
+    shared = Task.objects.filter(
+        Q(project__in=projects, assigned_to=OuterRef('pk'))
+        | Q(assigned_to=user, project__owner=OuterRef('pk'))
+    )
+    return User.objects.filter(Q(pk=user.pk) | Exists(co_members) | Exists(shared))
+
+
+SOURCES = {
+    'task': (lambda user: Task.objects.visible_to(user), 'title'),
+    'project': (lambda user: Project.objects.visible_to(user), 'name'),
+    'user': (visible_users, 'username'),
+}
+
+
+def _matches(queryset, field, q, limit):
+    """
+    Rows of ``queryset`` whose ``field`` matches ``q``, best first.
+
+    Work is bounded by reading at most CANDIDATES rows off an index before
+    ranking. PostgreSQL matches substrings through the pg_trgm indexes and
+    takes the CANDIDATES most similar in trigram distance order (which the
+    GiST trigram indexes serve nearest first); elsewhere prefixes are read
+    in NOCASE index order. Prefix matches and shorter values rank first.
+    """
+    vendor = connections[queryset.db].vendor
+    if vendor == 'postgresql' and len(q) >= MIN_TRIGRAM_LENGTH:
+        from django.contrib.postgres.search import TrigramDistance, TrigramSimilarity
+
+        candidates = (queryset.filter(**{f'{field}__icontains': q})
+                      .order_by(TrigramDistance(field, q)).values('pk')[:CANDIDATES])
+        prefix = Case(When(**{f'{field}__istartswith': q}, then=Value(1)),
+                      default=Value(0), output_field=IntegerField())
+        rows = (queryset.model.objects.filter(pk__in=candidates)
+                .annotate(prefix=prefix, score=TrigramSimilarity(field, q))
+                .order_by('-prefix', '-score', Length(field), field)
+                .values_list('pk', field, 'score')[:limit])
+        return [{'id': pk, 'label': label, 'score': round(score, 3)}
+                for pk, label, score in rows]
+
+    rows = (queryset.filter(**{f'{field}__istartswith': q})
+            .order_by(Collate(field, 'nocase') if vendor == 'sqlite' else field)
+            .values_list('pk', field)[:CANDIDATES])
+    ranked = sorted(rows, key=lambda row: (len(row[1]), row[1].lower()))[:limit]
+    return [{'id': pk, 'label': label, 'score': 1.0} for pk, label in ranked]
+
+
+def search(user, q, kinds=tuple(SOURCES), limit=DEFAULT_LIMIT):
+    """Typeahead suggestions for ``q`` per kind, limited to what ``user`` can see."""
+    q = q.strip()
+    limit = max(1, min(limit, MAX_LIMIT))
+    results = {}
+    for kind in kinds:
+        if not q:
+            results[kind] = []
+            continue
+        key = (user.pk, kind, q.lower(), limit)
+        hit = cache.get(key)
+        if hit is None:
+            source, field = SOURCES[kind]
+            hit = _matches(source(user), field, q, limit)
+            cache.set(key, hit)
+        results[kind] = hit
+    return results
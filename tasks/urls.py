@@ -1,10 +1,16 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import TaskViewSet
+from .views import (
+    TaskAttachmentViewSet, TaskDependencyViewSet, TaskViewSet, TypeaheadView, UserChartView,
+)
 
 router = DefaultRouter()
 router.register('tasks', TaskViewSet, basename='task')
+router.register('dependencies', TaskDependencyViewSet, basename='dependency')
+router.register('attachments', TaskAttachmentViewSet, basename='attachment')
 
 urlpatterns = [
+    path('typeahead/', TypeaheadView.as_view(), name='typeahead'),
+    path('metrics/<str:kind>/', UserChartView.as_view(), name='user-chart'),
     path('', include(router.urls)),
 ]
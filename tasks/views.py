@@ -1,16 +1,58 @@
-from rest_framework import viewsets
+import csv
+
+from django.db import transaction
+from django.http import Http404, StreamingHttpResponse
+from rest_framework import mixins, serializers, status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.generics import get_object_or_404
+from rest_framework.negotiation import BaseContentNegotiation
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from django_filters.rest_framework import DjangoFilterBackend
+from django_filters.widgets import BooleanWidget
 from rest_framework import filters
-from rest_framework.permissions import IsAuthenticated
-from .models import Task
-from .serializers import TaskSerializer
-from .permissions import IsAdminOrOwner
+from rest_framework.permissions import SAFE_METHODS, IsAuthenticated
+from config.db_router import ReplicaReadMixin
+from config.idempotency import IdempotencyMixin
+from projects.models import Project
+from .archive import merge_ordered
+from .attachments import UploadError, create_attachment, parse_checksum, serve, write_chunk
+from .dependencies import DependencyCycleError, add_dependency
+from .models import ArchivedTask, Task, TaskAttachment, TaskDependency
+from .recurrence import expand_window, is_occurrence, virtual_occurrence
+from .metrics import CHARTS, chart
+from .serializers import (
+    ArchivedTaskSerializer, ChartParamsSerializer, MoveTaskSerializer, TaskAttachmentSerializer,
+    TaskDependencySerializer, TaskSerializer,
+)
+from .permissions import CanEditAttachedTask, IsAdminOrOwner
+from . import ranking, typeahead
+
+
+class _Echo:
+    """File-like object that hands csv.writer rows straight back."""
+    def write(self, value):
+        return value
+
 
-class TaskViewSet(viewsets.ModelViewSet):
+class IgnoreClientContentNegotiation(BaseContentNegotiation):
+    """Raw file transfers answer with the first renderer whatever ``Accept`` says."""
+    def select_parser(self, request, parsers):
+        return parsers[0]
+
+    def select_renderer(self, request, renderers, format_suffix=None):
+        return renderers[0], renderers[0].media_type
+
+
+class TaskViewSet(IdempotencyMixin, ReplicaReadMixin, viewsets.ModelViewSet):
     """
     list, create, retrieve, update, partial_update, destroy
+
+    Reads only touch hot data unless ``?include_archived=true`` is passed;
+    ``export`` always covers both tiers. Writes accept an Idempotency-Key.
     """
-    queryset = Task.objects.select_related('assigned_to').all()
+    queryset = Task.objects.select_related('assigned_to', 'project').all()
     serializer_class = TaskSerializer
     permission_classes = [IsAuthenticated, IsAdminOrOwner]
 
@@ -26,11 +68,327 @@ class TaskViewSet(viewsets.ModelViewSet):
         'priority': ['exact'],
         'assigned_to__username': ['exact', 'icontains'],
         'completed': ['exact'],
-        'project': ['exact'],
+        'project': ['exact', 'isnull'],
+        'status': ['exact'],
     }
 
-    # Allow clients to order by these fields
-    ordering_fields = ['due_date', 'priority', 'created_at', 'updated_at']
+    # Allow clients to order by these fields; ``rank`` is the board order
+    ordering_fields = ['due_date', 'priority', 'created_at', 'updated_at', 'rank']
 
     # Full‑text search on these fields
     search_fields = ['title', 'description']
+
+    export_fields = [
+        'id', 'title', 'description', 'due_date', 'priority',
+        'assigned_to_id', 'project_id', 'completed', 'status', 'rank', 'created_at',
+        'updated_at', 'recurrence_parent_id', 'occurrence_date',
+    ]
+
+    def get_queryset(self):
+        # Visibility is enforced in SQL; objects outside it simply 404.
+        queryset = super().get_queryset().visible_to(self.request.user)
+        if self.action == 'list':
+            # Attachments of a whole page in one query, not one per task
+            queryset = queryset.prefetch_related('attachments')
+        if self.request.method not in SAFE_METHODS:
+            # Lets IsAdminOrOwner decide writes without another query
+            queryset = queryset.with_project_permission(self.request.user)
+        return queryset
+
+    def get_archived_queryset(self):
+        return (ArchivedTask.objects.select_related('assigned_to', 'project')
+                .visible_to(self.request.user))
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        without_project = BooleanWidget().value_from_datadict(
+            self.request.query_params, None, 'project__isnull')
+        if without_project and not self.request.user.is_admin():
+            # Only their assignee sees tasks without a project; saying so
+            # lets the assignee's columns be read through their own index
+            queryset = queryset.filter(assigned_to=self.request.user)
+        return queryset
+
+    def include_archived(self):
+        value = self.request.query_params.get('include_archived', '')
+        return value.lower() in ('1', 'true', 'yes')
+
+    def get_ordering(self, queryset):
+        ordering = filters.OrderingFilter().get_ordering(self.request, queryset, self)
+        return ordering or Task._meta.ordering
+
+    def get_window(self):
+        """The ``[start, end)`` window from ``?start=&end=``, or None."""
+        start = self.request.query_params.get('start')
+        end = self.request.query_params.get('end')
+        if start is None and end is None:
+            return None
+        if not (start and end):
+            raise ValidationError({'detail': 'Both "start" and "end" are required for a window.'})
+        field = serializers.DateTimeField()
+        try:
+            return field.to_internal_value(start), field.to_internal_value(end)
+        except ValidationError as exc:
+            raise ValidationError({'start': exc.detail})
+
+    def iter_tasks(self, include_archived=False):
+        """
+        Filtered tasks in the requested order. With a window, recurring series
+        are expanded into their occurrences; with ``include_archived`` cold
+        rows are merged in.
+        """
+        hot = self.filter_queryset(self.get_queryset())
+        ordering = self.get_ordering(hot)
+        window = self.get_window()
+        sources = [expand_window(hot, *window, ordering) if window else hot]
+        if include_archived:
+            cold = self.filter_queryset(self.get_archived_queryset())
+            if window:
+                cold = cold.filter(due_date__gte=window[0], due_date__lt=window[1])
+            sources.append(cold)
+        return merge_ordered(sources, ordering)
+
+    def list(self, request, *args, **kwargs):
+        include_archived = self.include_archived()
+        if not include_archived and self.get_window() is None:
+            return super().list(request, *args, **kwargs)
+        context = self.get_serializer_context()
+        data = [
+            (ArchivedTaskSerializer if isinstance(task, ArchivedTask) else TaskSerializer)(
+                task, context=context
+            ).data
+            for task in self.iter_tasks(include_archived)
+        ]
+        return Response(data)
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            return super().retrieve(request, *args, **kwargs)
+        except Http404:
+            if not self.include_archived():
+                raise
+        task = get_object_or_404(self.get_archived_queryset(), pk=kwargs['pk'])
+        return Response(ArchivedTaskSerializer(task, context=self.get_serializer_context()).data)
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Stream visible tasks from both tiers as CSV, honouring filters.
+        With ``?start=&end=`` recurring series are expanded in the window.
+        """
+        writer = csv.writer(_Echo())
+
+        def rows():
+            yield writer.writerow(self.export_fields + ['archived'])
+            for task in self.iter_tasks(include_archived=True):
+                yield writer.writerow(
+                    [getattr(task, f, None) for f in self.export_fields]
+                    + [isinstance(task, ArchivedTask)]
+                )
+
+        response = StreamingHttpResponse(rows(), content_type='text/csv')
+        response['Content-Disposition'] = 'attachment; filename="tasks.csv"'
+        return response
+
+    @action(detail=True, methods=['post'])
+    def occurrences(self, request, pk=None):
+        """
+        Store an edited or completed occurrence of a recurring series.
+
+        Takes ``occurrence_date`` plus any task fields to change; the stored
+        row replaces the virtual occurrence from then on.
+        """
+        series = self.get_object()
+        if not series.is_series:
+            raise ValidationError({'detail': 'Task is not a recurring series.'})
+        when = serializers.DateTimeField().to_internal_value(
+            request.data.get('occurrence_date', '')
+        )
+        if not is_occurrence(series, when):
+            raise ValidationError({'occurrence_date': 'Not an occurrence of this series.'})
+
+        instance = (Task.objects.filter(recurrence_parent=series, occurrence_date=when).first()
+                    or virtual_occurrence(series, when))
+        created = instance.pk is None
+        serializer = self.get_serializer(instance, data=request.data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save(recurrence=Task.RECURRENCE_NONE)
+        return Response(serializer.data,
+                        status=status.HTTP_201_CREATED if created else status.HTTP_200_OK)
+
+    @action(detail=True, methods=['post'])
+    def move(self, request, pk=None):
+        """
+        Drop a task into a board column: ``{"status", "after", "before"}``.
+
+        ``after`` and ``before`` are the ids of the cards it lands between in
+        the target column; with neither it goes to the end. Only the moved
+        task is written (see tasks.ranking).
+        """
+        task = self.get_object()
+        params = MoveTaskSerializer(data=request.data)
+        params.is_valid(raise_exception=True)
+        target = params.validated_data['status']
+
+        column = (self.get_queryset()
+                  .filter(**ranking.column_lookup(task.project_id, task.assigned_to_id, target))
+                  .exclude(pk=task.pk))
+        neighbours = {}
+        for side in ('after', 'before'):
+            if params.validated_data.get(side) is not None:
+                try:
+                    neighbours[side] = column.get(pk=params.validated_data[side])
+                except Task.DoesNotExist:
+                    raise ValidationError({side: 'Not a task in the target column.'})
+
+        serializer = self.get_serializer(task, data={'status': target}, partial=True)
+        serializer.is_valid(raise_exception=True)
+        with transaction.atomic():
+            task.status = target
+            serializer.save(rank=ranking.place(task, **neighbours))
+        return Response(serializer.data)
+
+
+class TaskDependencyViewSet(mixins.CreateModelMixin, mixins.DestroyModelMixin,
+                            viewsets.ReadOnlyModelViewSet):
+    """
+    list, create, retrieve, destroy
+
+    Edges between tasks of projects the user can see; filter with
+    ``?project=``. An edge that would close a cycle is rejected. Only
+    editors of the project may delete its edges.
+    """
+    serializer_class = TaskDependencySerializer
+    permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['project', 'blocker', 'blocked']
+
+    def get_queryset(self):
+        projects = (Project.objects.visible_to(self.request.user)
+                    if self.request.method in SAFE_METHODS
+                    else Project.objects.editable_by(self.request.user)).values('pk')
+        return TaskDependency.objects.filter(project__in=projects).order_by('id')
+
+    def perform_create(self, serializer):
+        data = serializer.validated_data
+        try:
+            serializer.instance = add_dependency(data['blocker'], data['blocked'])
+        except DependencyCycleError as exc:
+            raise ValidationError({'detail': str(exc)})
+
+
+class TaskAttachmentViewSet(mixins.CreateModelMixin, mixins.DestroyModelMixin,
+                            viewsets.ReadOnlyModelViewSet):
+    """
+    list, create, retrieve, destroy, upload, download
+
+    Files attached to the tasks the user can see; filter with ``?task=``.
+    Creating ``{"task", "filename", "size"}`` (plus optional
+    ``content_type`` and hex ``sha256``) reserves the attachment, whose
+    content is then sent to ``upload`` in one or more chunks.
+    """
+    serializer_class = TaskAttachmentSerializer
+    permission_classes = [IsAuthenticated, CanEditAttachedTask]
+    filter_backends = [DjangoFilterBackend]
+    filterset_fields = ['task', 'status']
+
+    def get_queryset(self):
+        queryset = TaskAttachment.objects.visible_to(self.request.user).select_related('task')
+        if self.request.method not in SAFE_METHODS:
+            # Lets CanEditAttachedTask decide writes without another query
+            queryset = queryset.with_project_permission(self.request.user)
+        return queryset
+
+    def perform_create(self, serializer):
+        serializer.instance = create_attachment(uploaded_by=self.request.user,
+                                                **serializer.validated_data)
+
+    @action(detail=True, methods=['head', 'patch'],
+            content_negotiation_class=IgnoreClientContentNegotiation)
+    def upload(self, request, pk=None):
+        """
+        ``HEAD`` reports the offset to continue from in ``Upload-Offset``.
+        ``PATCH`` stores its raw body at ``Upload-Offset``, which must match;
+        an ``Upload-Checksum: <algorithm> <base64 digest>`` header makes the
+        chunk all-or-nothing. Bodies are streamed to disk, never parsed.
+        """
+        attachment = self.get_object()
+        if request.method == 'HEAD':
+            response = Response(status=status.HTTP_200_OK)
+        else:
+            offset = request.headers.get('Upload-Offset', '')
+            length = request.META.get('CONTENT_LENGTH', '')
+            if not offset.isdigit():
+                raise ValidationError({'detail': 'An Upload-Offset header is required.'})
+            if not length.isdigit():
+                return Response({'detail': 'A Content-Length header is required.'},
+                                status=status.HTTP_411_LENGTH_REQUIRED)
+            try:
+                checksum = request.headers.get('Upload-Checksum')
+                write_chunk(attachment, int(offset), request.stream, int(length),
+                            parse_checksum(checksum) if checksum else None)
+            except UploadError as exc:
+                response = Response({'detail': str(exc)}, status=exc.status)
+            else:
+                response = Response(self.get_serializer(attachment).data)
+        response['Upload-Offset'] = attachment.received
+        response['Upload-Length'] = attachment.size
+        response['Cache-Control'] = 'no-store'
+        return response
+
+    @action(detail=True, methods=['get'],
+            content_negotiation_class=IgnoreClientContentNegotiation)
+    def download(self, request, pk=None):
+        """The file, or the single byte range asked for with ``Range``."""
+        attachment = self.get_object()
+        if not attachment.is_complete:
+            return Response({'detail': 'The upload is not complete.'},
+                            status=status.HTTP_409_CONFLICT)
+        return serve(request, attachment)
+
+
+class TypeaheadView(APIView):
+    """
+    GET ?q=<text>[&types=task,project,user][&limit=8]
+
+    Suggestions for task titles, project names and usernames the user can
+    see, best match first.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        kinds = request.query_params.get('types', ','.join(typeahead.SOURCES)).split(',')
+        unknown = set(kinds) - set(typeahead.SOURCES)
+        if unknown:
+            raise ValidationError({'types': f'Unknown types: {", ".join(sorted(unknown))}.'})
+        try:
+            limit = int(request.query_params.get('limit', typeahead.DEFAULT_LIMIT))
+        except ValueError:
+            raise ValidationError({'limit': 'Must be an integer.'})
+        return Response(typeahead.search(request.user, request.query_params.get('q', ''),
+                                         kinds, limit))
+
+
+class UserChartView(APIView):
+    """
+    GET /api/metrics/<burndown|burnup|velocity>/[?period=week&start=&end=&user=<id>]
+
+    Completion charts over the tasks assigned to the requesting user. Admins
+    may chart any user with ``?user=``.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, kind):
+        if kind not in CHARTS:
+            raise Http404
+        params = ChartParamsSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        user_id = request.user.pk
+        if 'user' in request.query_params:
+            if not request.user.is_admin():
+                raise PermissionDenied('Only admins can chart other users.')
+            try:
+                user_id = int(request.query_params['user'])
+            except ValueError:
+                raise ValidationError({'user': 'Must be an integer.'})
+        return Response(chart(kind, ('user', user_id), **params.validated_data))
@@ -1,10 +1,21 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from config.admin_paging import LargeTableAdminMixin
+from jobs.queue import enqueue
 from .models import User
 
 @admin.register(User)
-class CustomUserAdmin(UserAdmin):
+class CustomUserAdmin(LargeTableAdminMixin, UserAdmin):
     fieldsets = UserAdmin.fieldsets + (
         ('Role & Profile', {'fields': ('role',)}),
     )
     list_display = ('username', 'email', 'role', 'is_staff', 'is_active')
+    # Username prefixes only, so search uses the username index
+    search_fields = ('^username',)
+    actions = ['delete_in_background']
+
+    @admin.action(description='Delete selected users in the background')
+    def delete_in_background(self, request, queryset):
+        for user in queryset:
+            enqueue('users.delete_user', {'user_id': user.pk}, created_by=request.user)
+        self.message_user(request, f'Queued deletion of {queryset.count()} users.')
@@ -0,0 +1,25 @@
+from django.db import transaction
+from jobs.registry import register
+from tasks.models import ArchivedTask, Task
+from .models import User
+
+
+@register('users.delete_user')
+def delete_user(job):
+    """Delete a user's tasks in batches before deleting the user itself."""
+    user_id = job.payload['user_id']
+    batch_size = job.payload.get('batch_size', 1000)
+    total = Task.objects.filter(assigned_to_id=user_id).count() or 1
+    deleted = 0
+    for model in (Task, ArchivedTask):
+        while True:
+            ids = list(model.objects.filter(assigned_to_id=user_id)
+                       .values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                break
+            with transaction.atomic():
+                model.objects.filter(pk__in=ids).delete()
+            deleted += len(ids)
+            job.set_progress(min(99, deleted * 100 / total), f'Deleted {deleted} tasks')
+    User.objects.filter(pk=user_id).delete()
+    return {'deleted_tasks': deleted}
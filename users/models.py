@@ -31,6 +31,6 @@ class User(AbstractUser):
     
     def get_task_count(self):
         """Get total number of tasks assigned to this user"""
-        return self.assigned_tasks.count()
+        return self.tasks.count()
 
 
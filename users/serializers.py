@@ -22,12 +22,12 @@ class UserSerializer(serializers.ModelSerializer):
     
     def get_completed_tasks(self, obj):
         if self.context.get('include_stats'):
-            return obj.assigned_tasks.filter(status='completed').count()
+            return obj.tasks.filter(completed=True).count()
         return None
     
     def get_pending_tasks(self, obj):
         if self.context.get('include_stats'):
-            return obj.assigned_tasks.filter(status__in=['todo', 'in_progress']).count()
+            return obj.tasks.filter(completed=False).count()
         return None
 
     def create(self, validated_data):
@@ -1,8 +1,12 @@
+from unittest import mock
+
+from django.test import override_settings
 from django.urls import reverse
 from rest_framework.test import APITestCase
 from rest_framework import status
 from .models import User
 from rest_framework_simplejwt.tokens import RefreshToken
+from .throttling import hashing_slots, local_buckets
 
 class UserProfileAPITests(APITestCase):
     def setUp(self):
@@ -38,7 +42,7 @@ class UserProfileAPITests(APITestCase):
             'last_name': 'Name',
             'avatar': '😊'
         }
-        response = self.client.put(self.url, payload)
+        response = self.client.patch(self.url, payload)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.user.refresh_from_db()
         self.assertEqual(self.user.first_name, 'Updated')
@@ -49,3 +53,55 @@ class UserProfileAPITests(APITestCase):
         payload = {'first_name': 'NoAuth'}
         response = self.client.put(self.url, payload)
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+@override_settings(AUTH_THROTTLE_RATES={
+    'login': {'ip': '8/min', 'username': '3/min'},
+    'signup': {'ip': '2/hour'},
+})
+class AuthThrottleTests(APITestCase):
+    def setUp(self):
+        local_buckets.clear()
+        self.url = reverse('login')
+
+    def login(self, username, **extra):
+        return self.client.post(self.url, {'username': username, 'password': 'wrong'},
+                                format='json', **extra)
+
+    def test_username_budget(self):
+        for _ in range(3):
+            self.assertEqual(self.login('victim').status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.login('Victim')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn('Retry-After', response)
+        # Other accounts from the same address still have budget
+        self.assertEqual(self.login('someone').status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_ip_budget_is_per_address_and_endpoint(self):
+        for n in range(8):
+            self.login(f'user{n}')
+        self.assertEqual(self.login('user9').status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertEqual(self.login('user9', REMOTE_ADDR='10.0.0.2').status_code,
+                         status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(reverse('signup'), {}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(AUTH_MAX_CONCURRENT_HASHES=1, AUTH_HASH_WAIT_SECONDS=0.01)
+    def test_concurrent_hashing_is_capped(self):
+        slots = hashing_slots()
+        slots.acquire()
+        try:
+            response = self.login('busy')
+        finally:
+            slots.release()
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertEqual(self.login('busy').status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(AUTH_MAX_CONCURRENT_HASHES=1, AUTH_HASH_WAIT_SECONDS=0.01)
+    def test_server_error_releases_hashing_slot(self):
+        self.client.raise_request_exception = False
+        with mock.patch('users.views.LoginSerializer.is_valid', side_effect=RuntimeError):
+            response = self.login('crash')
+        self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
+        self.assertEqual(self.login('crash').status_code, status.HTTP_400_BAD_REQUEST)
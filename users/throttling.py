@@ -0,0 +1,168 @@
+"""
+Rate limiting and CPU protection for the anonymous authentication endpoints.
+
+Every login, token or signup request hashes a password, which is
+deliberately expensive. ``TokenBucketThrottle`` gives each endpoint its own
+budgets per client IP and per submitted username (AUTH_THROTTLE_RATES), and
+``AuthProtectionMixin`` additionally caps how many requests may be hashing
+at once, so a flood is turned away before it takes every worker's CPU.
+
+Buckets live in process memory by default; set AUTH_THROTTLE_BACKEND to
+``'cache'`` to share them between processes through Django's cache.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {'s': 1, 'sec': 1, 'min': 60, 'hour': 3600, 'day': 86400}
+
+
+def parse_rate(rate):
+    """``'5/min'`` -> (capacity 5, refilled at 5/60 tokens per second)."""
+    count, period = rate.split('/')
+    return int(count), int(count) / PERIODS[period]
+
+
+class LocalBuckets:
+    """Token buckets in this process, least recently used dropped past ``max_keys``."""
+
+    def __init__(self, max_keys=100_000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, capacity, refill, now):
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated) * refill)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, tokens
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class CacheBuckets:
+    """
+    Token buckets in Django's cache, shared by every process using it.
+
+    Read-modify-write isn't atomic, so concurrent requests for one key can
+    occasionally both get the last token; the limit still holds within a
+    request or two.
+    """
+    prefix = 'auth-throttle:'
+
+    def take(self, key, capacity, refill, now):
+        tokens, updated = cache.get(self.prefix + key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * refill)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        # Expire once the bucket would be full again anyway
+        cache.set(self.prefix + key, (tokens, now), int((capacity - tokens) / refill) + 1)
+        return allowed, tokens
+
+
+local_buckets = LocalBuckets()
+cache_buckets = CacheBuckets()
+
+
+def get_buckets():
+    return cache_buckets if settings.AUTH_THROTTLE_BACKEND == 'cache' else local_buckets
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Per-endpoint budgets keyed by client IP and by submitted username.
+
+    The view's ``throttle_scope`` picks the budgets from AUTH_THROTTLE_RATES.
+    Limiting by username stops one account being guessed from many
+    addresses; limiting by IP stops one address trying many accounts.
+    """
+
+    def allow_request(self, request, view):
+        rates = settings.AUTH_THROTTLE_RATES.get(view.throttle_scope, {})
+        keys = {'ip': self.get_ident(request)}
+        username = request.data.get('username') if hasattr(request.data, 'get') else None
+        if isinstance(username, str) and username:
+            keys['username'] = username.strip().lower()
+
+        # Wall-clock time, since the cache backend compares it across processes
+        buckets, now = get_buckets(), time.time()
+        self.delay = None
+        for kind, ident in keys.items():
+            if kind not in rates:
+                continue
+            capacity, refill = parse_rate(rates[kind])
+            allowed, tokens = buckets.take(f'{view.throttle_scope}:{kind}:{ident}',
+                                           capacity, refill, now)
+            if not allowed:
+                self.delay = (1 - tokens) / refill
+                return False
+        return True
+
+    def wait(self):
+        return self.delay
+
+
+class AuthenticationBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'Too many sign-ins in progress, try again shortly.'
+    default_code = 'authentication_busy'
+
+    def __init__(self, wait=1):
+        super().__init__()
+        self.wait = wait  # sent as Retry-After by DRF's exception handler
+
+
+_slots = {}
+_slots_lock = threading.Lock()
+
+
+def hashing_slots():
+    """The process-wide semaphore sized by AUTH_MAX_CONCURRENT_HASHES."""
+    size = settings.AUTH_MAX_CONCURRENT_HASHES
+    with _slots_lock:
+        if size not in _slots:
+            _slots[size] = threading.BoundedSemaphore(size)
+        return _slots[size]
+
+
+class AuthProtectionMixin:
+    """
+    For views that hash a password: throttle with ``throttle_scope`` and
+    allow only AUTH_MAX_CONCURRENT_HASHES requests to hash at once. Others
+    wait up to AUTH_HASH_WAIT_SECONDS for a slot, then get a 503.
+    """
+    throttle_classes = [TokenBucketThrottle]
+    throttle_scope = None
+
+    def dispatch(self, request, *args, **kwargs):
+        self._hash_slot = None
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        finally:
+            # Also when the handler raised something DRF re-raises as a 500
+            if self._hash_slot is not None:
+                self._hash_slot.release()
+                self._hash_slot = None
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)  # throttles run here first
+        if request.method == 'POST':
+            slots = hashing_slots()
+            if not slots.acquire(timeout=settings.AUTH_HASH_WAIT_SECONDS):
+                raise AuthenticationBusy(wait=max(1, round(settings.AUTH_HASH_WAIT_SECONDS)))
+            self._hash_slot = slots
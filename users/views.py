@@ -3,14 +3,17 @@ from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from rest_framework.views import APIView
 from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.views import TokenObtainPairView
 from .serializers import UserSerializer, LoginSerializer
 from .permissions import IsAdminUser, IsOwnerOrAdmin
 from .models import User
+from .throttling import AuthProtectionMixin
 
 # Create your views here.
 
-class LoginView(APIView):
+class LoginView(AuthProtectionMixin, APIView):
     permission_classes = (permissions.AllowAny,)
+    throttle_scope = 'login'
 
     def post(self, request, *args, **kwargs):
         serializer = LoginSerializer(data=request.data, context={'request': request})
@@ -23,10 +26,15 @@ class LoginView(APIView):
             'refresh': str(refresh),
         })
 
-class UserRegistrationView(generics.CreateAPIView):
+class UserRegistrationView(AuthProtectionMixin, generics.CreateAPIView):
     queryset = User.objects.all()
     permission_classes = (permissions.AllowAny,)
     serializer_class = UserSerializer
+    throttle_scope = 'signup'
+
+
+class TokenObtainView(AuthProtectionMixin, TokenObtainPairView):
+    throttle_scope = 'token'
 
 
 